@@ -0,0 +1,127 @@
+import os
+from datetime import date, datetime, time
+import numpy as np
+import pandas as pd
+from movimientos import DIA_NULO, a_dias
+
+# 📌 Tramos de antigüedad de la deuda vencida, en días (por defecto 0-30, 31-60, 61-90, 90+)
+ANTIGUEDAD_TRAMOS = tuple(int(dias) for dias in os.getenv("ANTIGUEDAD_TRAMOS", "30,60,90").split(","))
+
+CREDITO = "credito_a_favor"
+VENCIDO = "vencido"
+A_VENCER = "a_vencer"
+CATEGORIAS = [CREDITO, VENCIDO, A_VENCER]
+
+_EPOCA = date(1970, 1, 1).toordinal()
+
+
+def etiquetas_tramos(tramos=ANTIGUEDAD_TRAMOS):
+    """Nombres de los tramos: ["0-30", "31-60", "61-90", "90+"] para (30, 60, 90)"""
+    limites = [-1] + list(tramos)
+    etiquetas = [f"{limites[i] + 1}-{limites[i + 1]}" for i in range(len(tramos))]
+    return etiquetas + [f"{tramos[-1]}+"]
+
+
+def clasificar_dias(saldo, vencimiento, hoy=None, tramos=ANTIGUEDAD_TRAMOS):
+    """
+    Clasifica movimientos dados como columnas de numpy (ver `movimientos`), sin DataFrames.
+
+    Parámetros:
+    - saldo (array): Saldo de cada movimiento (en centavos o en pesos: sólo importa el signo).
+    - vencimiento (array): Vencimiento en días desde 1970-01-01 (int32, `DIA_NULO` si falta).
+    - hoy (datetime): Fecha de referencia (por defecto, ahora).
+    - tramos (tuple): Límites en días de los tramos de deuda vencida.
+
+    Retorna:
+    - (categorias, dias, tramos_vencidos): códigos de `CATEGORIAS` (-1 si el saldo es 0),
+      días desde el vencimiento y código del tramo (-1 si el movimiento no está vencido).
+
+    🔹 El vencimiento se compara por día: vence al comenzar ese día, igual que una fecha
+    sin hora comparada contra `hoy` (salvo justo a la medianoche, cuando todavía no venció).
+    """
+    hoy = hoy or datetime.now()
+    hoy_dia = (hoy.date() if isinstance(hoy, datetime) else hoy).toordinal() - _EPOCA
+    a_medianoche = not isinstance(hoy, datetime) or hoy == datetime.combine(hoy.date(), time.min)
+    limite = hoy_dia if a_medianoche else hoy_dia + 1
+
+    saldo = np.asarray(saldo)
+    vencimiento = np.asarray(vencimiento)
+    vencido = (vencimiento != DIA_NULO) & (vencimiento < limite)
+    categorias = np.select([saldo < 0, (saldo > 0) & vencido, saldo > 0], [0, 1, 2], default=-1)
+
+    dias = hoy_dia - vencimiento.astype(np.int64)
+    tramos_vencidos = np.where(categorias == 1, np.searchsorted(np.asarray(tramos), dias, side="left"), -1)
+    return categorias, dias, tramos_vencidos
+
+
+def clasificar(df, hoy=None, tramos=ANTIGUEDAD_TRAMOS):
+    """
+    Clasifica cada movimiento en una sola pasada vectorizada (ver `clasificar_dias`).
+
+    Parámetros:
+    - df (DataFrame): Movimientos con `Saldo_Loc` y `Fecha_vto` (texto YYYY-MM-DD o fecha).
+    - hoy (datetime): Fecha de referencia (por defecto, ahora).
+    - tramos (tuple): Límites en días de los tramos de deuda vencida.
+
+    Retorna:
+    - Copia de `df` con las columnas:
+      - `Categoria` (categórica): "credito_a_favor" (saldo < 0), "vencido" / "a_vencer"
+        (saldo > 0, según `Fecha_vto` y hoy) o nulo si el saldo es 0.
+      - `DiasVencido`: días desde el vencimiento (sólo para vencidos).
+      - `Tramo`: tramo de antigüedad de los vencidos.
+    """
+    df = df.copy()
+    saldo = pd.to_numeric(df["Saldo_Loc"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    categorias, dias, tramos_vencidos = clasificar_dias(saldo, a_dias(df["Fecha_vto"].to_numpy()), hoy, tramos)
+
+    df["Categoria"] = pd.Categorical.from_codes(categorias, categories=CATEGORIAS)
+    df["DiasVencido"] = np.where(categorias == 1, dias, np.nan)
+    df["Tramo"] = pd.Categorical.from_codes(tramos_vencidos, categories=etiquetas_tramos(tramos))
+    return df
+
+
+def resumir_clasificados(clasificados, clave="RazonSocial"):
+    """
+    Totales de antigüedad de deuda por cliente, para muchos clientes a la vez
+    (lo usa el resumen de toda la cartera, ver `cartera.calcular_resumen`).
+
+    Parámetros:
+    - clasificados (DataFrame): Movimientos de uno o varios clientes ya pasados por
+      `clasificar`, con la columna `clave` y opcionalmente `Vendedor`.
+    - clave (str): Columna que identifica al cliente.
+
+    Retorna:
+    - DataFrame indexado por `clave` con `credito_a_favor`, `total_vencidos`,
+      `total_a_vencer`, `total_global` (redondeado a 2 decimales), una columna por
+      tramo de vencidos y `Vendedor` (el primero no vacío de cada cliente).
+    """
+    # 🔹 La clave se factoriza una sola vez y cada total es un `bincount` sobre (cliente, categoría)
+    codigos_cliente, clientes = pd.factorize(clasificados[clave], use_na_sentinel=False)
+    cantidad = len(clientes)
+    saldo = pd.to_numeric(clasificados["Saldo_Loc"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+
+    def totales(codigos, columnas):
+        validos = codigos >= 0
+        indices = codigos_cliente[validos] * len(columnas) + codigos[validos]
+        sumas = np.bincount(indices, weights=saldo[validos], minlength=cantidad * len(columnas))
+        return pd.DataFrame(sumas.reshape(cantidad, len(columnas)), columns=columnas)
+
+    tramo = clasificados["Tramo"]
+    resumen = pd.concat([
+        totales(clasificados["Categoria"].cat.codes.to_numpy(), ["credito_a_favor", "total_vencidos", "total_a_vencer"]),
+        totales(tramo.cat.codes.to_numpy(), [str(etiqueta) for etiqueta in tramo.cat.categories]),
+    ], axis=1)
+    resumen.index = pd.Index(clientes, name=clave)
+    resumen.insert(3, "total_global",
+                   resumen[["credito_a_favor", "total_vencidos", "total_a_vencer"]].sum(axis=1).round(2))
+
+    if "Vendedor" in clasificados.columns:
+        # 🔹 Primer vendedor no vacío de cada cliente
+        vendedores = clasificados["Vendedor"].to_numpy(dtype=object)
+        con_vendedor = np.flatnonzero(pd.notna(vendedores) & (vendedores != ""))
+        primeros, posiciones = np.unique(codigos_cliente[con_vendedor], return_index=True)
+        columna = np.full(cantidad, "", dtype=object)
+        columna[primeros] = vendedores[con_vendedor[posiciones]]
+        resumen["Vendedor"] = columna
+
+    return resumen
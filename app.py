@@ -1,7 +1,12 @@
-from flask import Flask
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 import os
+from logs import configurar_logs
 from routes import uploads_bp  # Importamos el Blueprint correctamente
+import metricas
+
+# 📌 Nivel y formato de los logs desde el entorno (LOG_LEVEL, LOG_FORMATO)
+configurar_logs()
 
 app = Flask(__name__)
 
@@ -20,5 +25,24 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 1800  # 15 minutos
 # 📌 Registrar el Blueprint `uploads_bp`
 app.register_blueprint(uploads_bp, url_prefix="/api")  # Prefijo opcional
 
+
+# 📌 Tiempos por etapa: histogramas en /metrics y resumen por solicitud en el encabezado Server-Timing
+if metricas.METRICAS_HABILITADAS:
+    @app.before_request
+    def iniciar_metricas():
+        g.metricas = metricas.iniciar_solicitud()
+
+    @app.after_request
+    def agregar_server_timing(response):
+        estado = g.pop("metricas", None)
+        if estado is not None:
+            response.headers["Server-Timing"] = metricas.finalizar_solicitud(estado, request.endpoint)
+        return response
+
+
+@app.route("/metrics", methods=["GET"])
+def get_metricas():
+    return Response(metricas.registro.exportar(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,156 @@
+"""
+Micro-benchmark: formato de importes y fechas celda por celda vs. por columna
+(`movimientos.Movimientos` + `estado_cuenta.filas_movimientos`, el camino de la app).
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_formato.py [cantidad_filas]
+
+Antes de medir verifica que las filas de ambos caminos sean idénticas, incluyendo
+nulos, ceros, -0.0, Decimal, texto no numérico y valores en el límite del redondeo.
+Las fechas se comparan sólo en el camino del JSON: el del Excel las imprimía tal
+como venían en la celda.
+"""
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+from decimal import Decimal
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from estado_cuenta import filas_movimientos  # noqa: E402
+from movimientos import Movimientos  # noqa: E402
+from plantilla_pdf import COLUMNAS_PDF  # noqa: E402
+
+# 🔹 Queda afuera a propósito 1e15 + 0.3: no entra en float64 con centavos exactos
+IMPORTES_BORDE = [0, -0.0, 0.001, -0.001, 0.004, -0.004, Decimal("-0.001"), 0.005, 0.015, 0.125, 0.375, 1.005,
+                  2.675, -1234.565, 999999.995, float("nan"), None, Decimal("1234.565"), "12,5", "abc"]
+
+
+# 📌 Implementación anterior, copiada tal cual para comparar
+
+def format_money_anterior(val, imprimir=False):
+    try:
+        num = round(float(val), 2)
+        s = f"{num:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+        if imprimir:
+            print(f"📌 Valor original: {val} | Convertido: {num} | Formateado: {s}")
+        return s
+    except Exception:
+        return "0,00"
+
+
+def filas_json_anterior(df_source, hide_saldo=False):
+    for col in ["Femision", "FechaVto"]:
+        df_source[col] = pd.to_datetime(df_source[col], errors='coerce').dt.strftime("%d/%m/%Y")
+    for col in ["Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]:
+        df_source[col] = pd.to_numeric(df_source[col], errors="coerce")
+    data_rows = df_source[COLUMNAS_PDF].values.tolist()
+    for row in data_rows:
+        for i in [4, 5, 6]:
+            if i == 6 and hide_saldo:
+                row[i] = ""
+            if i == 6 and (row[i] == 0 or pd.isna(row[i])):
+                row[i] = "0,00"
+            else:
+                row[i] = format_money_anterior(row[i]) if row[i] and not pd.isna(row[i]) else ""
+    return data_rows
+
+
+def filas_excel_anterior(df_source, imprimir=False):
+    data_rows = df_source[COLUMNAS_PDF].values.tolist()
+    for row in data_rows:
+        for i in [4, 5, 6]:
+            try:
+                if pd.isna(row[i]) or float(row[i]) == 0:
+                    row[i] = ""
+                else:
+                    row[i] = format_money_anterior(row[i], imprimir)
+            except Exception:
+                row[i] = "0,00"
+    return data_rows
+
+
+# 📌 Implementación nueva (la misma que usa `estado_cuenta`, con las reglas de cada diseño)
+
+def _movimientos(df_source):
+    return Movimientos.desde_columnas(*(df_source[col].to_numpy() for col in COLUMNAS_PDF))
+
+
+def filas_json(df_source, hide_saldo=False):
+    return filas_movimientos(_movimientos(df_source), "0,00", mostrar_saldo=not hide_saldo)
+
+
+def filas_excel(df_source):
+    return filas_movimientos(_movimientos(df_source), "")
+
+
+def movimientos(filas, semilla=0):
+    aleatorio = random.Random(semilla)
+    desde = date.today() - timedelta(days=30)
+    registros = []
+    for i in range(filas):
+        fecha = desde + timedelta(days=aleatorio.randint(0, 30))
+        registros.append({
+            "Femision": fecha.isoformat(),
+            "ComprobanteNro": f"FC 0001-{10000000 + i:08d}",
+            "FechaVto": (fecha + timedelta(days=30)).isoformat() if i % 50 else None,
+            "CondVta": "Cta Cte 30 días",
+            "Debe_Loc": aleatorio.choice([0, round(aleatorio.uniform(0, 5e6), 2)]),
+            "Haber_Loc": aleatorio.choice([0, 0, round(aleatorio.uniform(0, 5e6), 3)]),
+            "SaldoAcum_Loc": aleatorio.uniform(-1e7, 1e7),
+        })
+    for i, valor in enumerate(IMPORTES_BORDE):
+        for col in ["Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]:
+            registros[i][col] = valor
+    return pd.DataFrame(registros)
+
+
+def medir(funcion, *args, repeticiones=3):
+    mejor = None
+    for _ in range(repeticiones):
+        copias = [a.copy() if isinstance(a, pd.DataFrame) else a for a in args]
+        inicio = time.perf_counter()
+        funcion(*copias)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def _iguales(a, b, columnas=range(len(COLUMNAS_PDF))):
+    # 🔹 Las fechas nulas eran NaN en el camino anterior y ahora son ""
+    def celdas(fila):
+        return ["" if isinstance(fila[i], float) and fila[i] != fila[i] else fila[i] for i in columnas]
+    return len(a) == len(b) and all(celdas(x) == celdas(y) for x, y in zip(a, b))
+
+
+if __name__ == "__main__":
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = movimientos(filas)
+    df_excel = df.copy()
+    df_excel["Femision"] = pd.to_datetime(df_excel["Femision"])
+    for col in ["Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]:
+        df_excel[col] = pd.to_numeric(df_excel[col], errors="coerce")  # 🔹 Como quedaban en el camino del Excel
+
+    for oculto in (False, True):
+        assert _iguales(filas_json_anterior(df.copy(), oculto), filas_json(df.copy(), oculto)), "JSON distinto"
+    assert _iguales(filas_excel_anterior(df_excel.copy()), filas_excel(df_excel.copy()), [1, 3, 4, 5, 6]), \
+        "Excel distinto"
+    print(f"✅ Filas idénticas ({filas} filas, {len(IMPORTES_BORDE)} importes de borde)")
+
+    resultados = [
+        ("JSON (deuda)", medir(filas_json_anterior, df), medir(filas_json, df)),
+        ("Excel", medir(filas_excel_anterior, df_excel), medir(filas_excel, df_excel)),
+    ]
+    with contextlib.redirect_stdout(io.StringIO()):
+        con_print = medir(filas_excel_anterior, df_excel, True, repeticiones=1)
+    resultados.append(("Excel (anterior con print)", con_print, resultados[1][2]))
+
+    print(f"📊 {filas} filas")
+    for nombre, antes, despues in resultados:
+        print(f"   {nombre:<28} antes {antes:6.3f} s | después {despues:6.3f} s | x{antes / despues:.1f}")
@@ -0,0 +1,101 @@
+"""
+Memoria de los movimientos según su representación, por cada 100.000 movimientos.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_memoria.py [cantidad_movimientos]
+
+Compara lo que queda en memoria para un lote de /comprobantes-con-saldo:
+
+- antes: las tuplas del cursor pasaban a un diccionario por fila (`registros()`) y de
+  ahí a un DataFrame del lote, con objetos de Python en las columnas de texto y fecha.
+- después: las tuplas del cursor se pasan directo a `movimientos.Movimientos`
+  (columnas tipadas: días en int32, centavos en int64, textos como códigos).
+
+Antes de medir verifica que las filas del PDF armadas desde el modelo sean idénticas
+a las del formato celda por celda anterior (ver `bench_formato`).
+"""
+import os
+import sys
+import random
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos_sinteticos import movimientos_saldo_acum, COLUMNAS_SALDO_ACUM  # noqa: E402
+from cache_saldos import ResultadoSaldo  # noqa: E402
+from estado_cuenta import desde_saldos, filas_movimientos  # noqa: E402
+from formato import formatear_centavos  # noqa: E402
+from movimientos import a_centavos, a_subcentavos  # noqa: E402
+from bench_formato import filas_json_anterior, format_money_anterior  # noqa: E402
+
+POR = 100_000
+
+
+def lote(movimientos):
+    """{ClienteCod: ResultadoSaldo} con unos `movimientos` movimientos, como `obtener_saldos_ultimos_30_dias`"""
+    filas = movimientos_saldo_acum(max(1, movimientos // 30), semilla=7)[:movimientos]
+    por_cliente = {}
+    for fila in filas:
+        por_cliente.setdefault(fila["ClienteCod"], []).append(tuple(fila[col] for col in COLUMNAS_SALDO_ACUM))
+    return {codigo: ResultadoSaldo(COLUMNAS_SALDO_ACUM, tuplas) for codigo, tuplas in por_cliente.items()}
+
+
+def medir(construir):
+    """Bytes que siguen en memoria después de `construir()`, mientras se conserva su resultado"""
+    tracemalloc.start()
+    resultado = construir()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resultado
+    return actual
+
+
+def verificar(saldos):
+    """Las filas armadas desde el modelo son las mismas que con el formato celda por celda anterior"""
+    for estado in desde_saldos(saldos)[:50]:
+        df = pd.DataFrame(saldos[estado.clave].registros())
+        df = df[~df["ComprobanteNro"].str.startswith("RT R")]
+        esperadas = [[f[0], f[2], f[4], f[5], f[6]] for f in filas_json_anterior(df)]
+        obtenidas = [[f[0], f[2], f[4], f[5], f[6]] for f in filas_movimientos(estado.deuda)]
+        assert sorted(esperadas) == sorted(obtenidas), f"Filas distintas para {estado.clave}"
+
+    # 🔹 Importes de hasta 4 decimales (MONEY de SQL Server), incluidos los que quedan a medio centavo
+    aleatorio = random.Random(1)
+    importes = [round(aleatorio.uniform(-1e9, 1e9), aleatorio.choice([2, 3, 4])) for _ in range(100_000)]
+    importes += [0.005, 0.015, 0.125, 1.005, 2.675, -1234.565, 999999.995, 0.285, 1.115, None, float("nan"),
+                 0.001, -0.001, 0.004, -0.004, -0.0]
+    esperados = ["" if importe is None or importe != importe or importe == 0 else format_money_anterior(importe)
+                 for importe in importes]
+    obtenidos = formatear_centavos(a_centavos(importes), subcentavos=a_subcentavos(importes))
+    assert obtenidos == esperados, "Importes distintos"
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    saldos = lote(cantidad)
+    cantidad = sum(len(resultado.filas) for resultado in saldos.values())
+    verificar(saldos)
+    print(f"✅ Filas del PDF idénticas ({len(saldos)} clientes, {cantidad} movimientos)")
+
+    registros = {codigo: resultado.registros() for codigo, resultado in saldos.items()}
+    mediciones = [
+        ("tuplas del cursor", medir(lambda: [tuple(f.values()) for rs in registros.values() for f in rs])),
+        ("antes: diccionarios", medir(lambda: {c: r.registros() for c, r in saldos.items()})),
+        ("antes: DataFrame del lote", medir(lambda: pd.DataFrame([f for rs in registros.values() for f in rs]))),
+        ("después: Movimientos", medir(lambda: desde_saldos(saldos))),
+        ("filas del PDF (referencia)", medir(lambda: [filas_movimientos(e.movimientos) for e in desde_saldos(saldos)])),
+    ]
+    del registros
+    estados = desde_saldos(saldos)
+    columnas = sum(estado.movimientos.nbytes for estado in estados)
+
+    # 🔹 "Movimientos" incluye los textos abreviados del vocabulario y las vistas de cada cliente
+    escala = POR / cantidad
+    print(f"📊 Memoria por cada {POR:,} movimientos".replace(",", "."))
+    for nombre, bytes_ in mediciones[:4] + [("   de eso, columnas tipadas", columnas)] + mediciones[4:]:
+        print(f"   {nombre:<30} {bytes_ * escala / 1024 / 1024:6.1f} MB | {bytes_ / cantidad:6.1f} bytes/mov.")
+    antes = mediciones[1][1] + mediciones[2][1]
+    print(f"   diccionarios + DataFrame vs. Movimientos: x{antes / mediciones[3][1]:.1f} menos memoria")
@@ -0,0 +1,342 @@
+"""
+Benchmark de punta a punta del armado de estados de cuenta con datos sintéticos.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_pipeline.py [--clientes 300] [--mediana 25] [--renderer auto] [--paralelo]
+                                        [--escenarios arranque,comprobantes,upload,procesador]
+                                        [--guardar NOMBRE] [--comparar NOMBRE] [--tolerancia 0.10]
+
+Escenarios:
+- arranque: tiempo de `from app import app`, de la primera solicitud liviana (/api/estado-pool)
+  y del primer PDF en frío (incluye los imports diferidos de pandas y ReportLab), y qué
+  librerías pesadas quedaron cargadas sólo por importar la app.
+- comprobantes: POST /api/comprobantes-con-saldo con todos los clientes, contra una base
+  SQLite con `_DL_PBI_EstadoCtaCte_SaldoAcum` en lugar de SQL Server (`DATABASE_URL`).
+- upload: POST /api/upload con un Excel generado en el formato del export de Bejerman.
+- procesador: `procesar_resultados` por cliente sobre filas de `_Sta_PBI_DeudoresCtaCte_Historico`
+  (ninguna ruta lo expone todavía, se llama directo).
+
+Las rutas se llaman con el test client de Flask y cada escenario corre en un proceso nuevo,
+así el pico de memoria (RSS) y los imports no se mezclan entre escenarios. Los caches de
+saldos, PDFs y ZIPs se desactivan para medir siempre el armado completo.
+
+Por escenario informa clientes/s, latencia por PDF (p50/p95: tiempo entre un PDF entregado
+al ZIP y el siguiente, el primero incluye la lectura del Excel), pico de RSS y los segundos
+por etapa de `metricas`. `--guardar` escribe el resultado en benchmarks/baselines/NOMBRE.json
+y `--comparar` lo contrasta con uno guardado: sale con código 1 si clientes/s o la latencia
+p95 empeoran más que `--tolerancia`.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import platform
+import tempfile
+import resource
+import contextlib
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import datos_sinteticos  # noqa: E402
+
+DIRECTORIO_BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+ESCENARIOS = ("arranque", "comprobantes", "upload", "procesador")
+LIBRERIAS_PESADAS = ("pandas", "numpy", "reportlab", "openpyxl", "xlsxwriter")
+CLIENTES_CALENTAMIENTO = 5
+
+# 🔹 Métricas que se comparan contra la baseline y si "más" es mejor
+COMPARABLES = {
+    "clientes_por_segundo": True,
+    "latencia_p50_ms": False,
+    "latencia_p95_ms": False,
+    "rss_pico_mb": False,
+    "importar_app_ms": False,
+    "primera_solicitud_ms": False,
+    "primer_pdf_frio_ms": False,
+}
+REGRESIONES = ("clientes_por_segundo", "latencia_p95_ms", "importar_app_ms")
+
+
+# 📌 Datos compartidos por todos los escenarios (se generan una vez en el proceso principal)
+
+def preparar_datos(directorio, clientes, mediana, semilla):
+    saldo_acum = datos_sinteticos.movimientos_saldo_acum(clientes, mediana, semilla=semilla)
+    historico = datos_sinteticos.movimientos_historico(clientes, mediana, semilla=semilla)
+    base = os.path.join(directorio, "bejerman.db")
+    excel = os.path.join(directorio, "movimientos.xlsx")
+    datos_sinteticos.crear_base_sqlite(base, saldo_acum, historico)
+    datos_sinteticos.escribir_excel(excel, saldo_acum)
+    return {
+        "base": base,
+        "excel": excel,
+        "movimientos_saldo_acum": len(saldo_acum),
+        "movimientos_historico": sum(len(registros) for registros in historico.values()),
+    }
+
+
+# 📌 Ejecución de un escenario (en un proceso nuevo)
+
+def _cronometrado(funcion, latencias):
+    """Envuelve un generador de PDFs y anota cuánto tardó en producir cada uno"""
+    def envoltura(*args, **kwargs):
+        anterior = time.perf_counter()
+        for archivo in funcion(*args, **kwargs):
+            latencias.append(time.perf_counter() - anterior)
+            yield archivo
+            anterior = time.perf_counter()  # 🔹 No se cuenta el tiempo de comprimir y enviar
+    return envoltura
+
+
+def _percentil(valores, p):
+    import numpy as np  # 🔹 No se importa arriba: el escenario "arranque" verifica qué carga la app sola
+
+    return float(np.percentile(valores, p)) if valores else None
+
+
+def ejecutar_escenario(escenario, parametros, archivos, directorio):
+    """Importa la app con SQLite y los caches apagados, calienta y mide un escenario"""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{archivos['base']}?detect_types=1",
+        "CACHE_SALDOS_TTL": "0",
+        "CACHE_PDF_MAX_MB": "0",
+        "CACHE_ZIP_DIR": os.path.join(directorio, f"cache_zip_{escenario}"),
+        "METRICAS_HABILITADAS": "true",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),  # 🔹 Sólo el resumen de errores, salvo que se pida otro nivel
+    })
+    os.chdir(directorio)  # 🔹 Si la app escribiera en el directorio actual, queda en la carpeta temporal
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        from app import app
+        importar_app = time.perf_counter() - inicio
+        cargadas = [nombre for nombre in LIBRERIAS_PESADAS if nombre in sys.modules]
+
+    if escenario == "arranque":
+        return _medir_arranque(app, importar_app, cargadas)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import metricas
+        import jsonSaldoUltimos30DiasAPDF
+        import excelSaldoUltimos30DiasAPDF
+        from procesador import procesar_resultados
+
+    clientes = parametros["clientes"]
+    codigos = [f"{cliente:06d}" for cliente in range(clientes)]
+    razones = [datos_sinteticos.razon_social(cliente) for cliente in range(clientes)]
+    cliente_http = app.test_client()
+
+    def comprobantes(cantidad):
+        return cliente_http.post("/api/comprobantes-con-saldo", json={
+            "codigos": codigos[:cantidad], "renderer": parametros["renderer"], "paralelo": parametros["paralelo"],
+        })
+
+    def upload(cantidad):
+        with open(archivos["excel"], "rb") as f:
+            return cliente_http.post("/api/upload", content_type="multipart/form-data", data={
+                "file": (f, "movimientos.xlsx"),
+                "razonesSociales": json.dumps(razones[:cantidad]),
+                "renderer": parametros["renderer"],
+            })
+
+    latencias = []
+    if escenario == "procesador":
+        historico = datos_sinteticos.movimientos_historico(clientes, parametros["mediana"],
+                                                           semilla=parametros["semilla"])
+
+        def ejecutar(cantidad):
+            for razon_social, registros in list(historico.items())[:cantidad]:
+                inicio = time.perf_counter()
+                procesar_resultados(razon_social, registros)
+                latencias.append(time.perf_counter() - inicio)
+            return cantidad, 0
+    else:
+        # 🔹 Las rutas importan estas funciones al atenderse, así que toman la versión cronometrada
+        jsonSaldoUltimos30DiasAPDF.iterar_pdfs_json = _cronometrado(jsonSaldoUltimos30DiasAPDF.iterar_pdfs_json,
+                                                                     latencias)
+        excelSaldoUltimos30DiasAPDF.iterar_pdfs_excel = _cronometrado(excelSaldoUltimos30DiasAPDF.iterar_pdfs_excel,
+                                                                       latencias)
+        solicitud = comprobantes if escenario == "comprobantes" else upload
+
+        def ejecutar(cantidad):
+            respuesta = solicitud(cantidad)
+            contenido = respuesta.get_data()  # 🔹 Consume el ZIP en streaming hasta el final
+            respuesta.close()
+            if respuesta.status_code != 200:
+                raise RuntimeError(f"{escenario}: HTTP {respuesta.status_code} {contenido[:300]!r}")
+            return len(zipfile.ZipFile(io.BytesIO(contenido)).namelist()), len(contenido)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        ejecutar(CLIENTES_CALENTAMIENTO)  # Calentamiento (imports diferidos, fuentes, conexión)
+        latencias.clear()
+        etapas_antes = metricas.registro.sumas()
+
+        inicio = time.perf_counter()
+        pdfs, bytes_respuesta = ejecutar(clientes)
+        duracion = time.perf_counter() - inicio
+
+    etapas = {etapa: round(segundos - etapas_antes.get(etapa, 0.0), 3)
+              for etapa, segundos in metricas.registro.sumas().items()}
+    return {
+        "clientes": clientes,
+        "pdfs": pdfs,
+        "segundos": round(duracion, 3),
+        "clientes_por_segundo": round(clientes / duracion, 2),
+        "latencia_p50_ms": round(_percentil(latencias, 50) * 1000, 2),
+        "latencia_p95_ms": round(_percentil(latencias, 95) * 1000, 2),
+        "primer_pdf_ms": round(latencias[0] * 1000, 2),
+        "bytes_respuesta": bytes_respuesta,
+        # 🔹 ru_maxrss está en KB en Linux; los workers del modo paralelo sólo cuentan si ya terminaron
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_pico_hijos_mb": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1),
+        "etapas_segundos": etapas,
+    }
+
+
+def _medir_arranque(app, importar_app, cargadas):
+    """Primera solicitud liviana y primer PDF en un proceso que recién importó la app"""
+    cliente_http = app.test_client()
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        cliente_http.get("/api/estado-pool").close()
+        primera_solicitud = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        respuesta = cliente_http.post("/api/comprobantes-con-saldo", json={"codigos": ["000000"]})
+        respuesta.get_data()
+        respuesta.close()
+        primer_pdf = time.perf_counter() - inicio
+
+    return {
+        "importar_app_ms": round(importar_app * 1000, 1),
+        "primera_solicitud_ms": round(primera_solicitud * 1000, 1),
+        "primer_pdf_frio_ms": round(primer_pdf * 1000, 1),
+        "librerias_al_importar": cargadas,
+        "rss_pico_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def correr_en_proceso_nuevo(escenario, parametros, archivos, directorio):
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+        return executor.submit(ejecutar_escenario, escenario, parametros, archivos, directorio).result()
+
+
+# 📌 Baselines
+
+def guardar_baseline(nombre, resultado):
+    os.makedirs(DIRECTORIO_BASELINES, exist_ok=True)
+    ruta = os.path.join(DIRECTORIO_BASELINES, f"{nombre}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"💾 Baseline guardada en {ruta}")
+
+
+def comparar_baseline(nombre, resultado, tolerancia):
+    """Imprime las diferencias contra la baseline; retorna la lista de regresiones"""
+    ruta = os.path.join(DIRECTORIO_BASELINES, f"{nombre}.json")
+    with open(ruta, encoding="utf-8") as f:
+        base = json.load(f)
+    if base["parametros"] != resultado["parametros"]:
+        print(f"⚠️ Parámetros distintos a la baseline: {base['parametros']}")
+
+    regresiones = []
+    print(f"📏 Comparación con {nombre} ({base['fecha']})")
+    for escenario, actual in resultado["escenarios"].items():
+        anterior = base["escenarios"].get(escenario)
+        if anterior is None:
+            continue
+        print(f"   {escenario}")
+        for metrica, mas_es_mejor in COMPARABLES.items():
+            antes, despues = anterior.get(metrica), actual.get(metrica)
+            if not antes or despues is None:
+                continue
+            cambio = (despues - antes) / antes
+            peor = -cambio if mas_es_mejor else cambio
+            marca = "❌" if peor > tolerancia else "  "
+            print(f"   {marca} {metrica:<22} {antes:>10} -> {despues:>10} ({cambio * 100:+.1f} %)")
+            if peor > tolerancia and metrica in REGRESIONES:
+                regresiones.append(f"{escenario}.{metrica}")
+    return regresiones
+
+
+def imprimir(resultado):
+    parametros = resultado["parametros"]
+    print(f"📊 {parametros['clientes']} clientes (mediana {parametros['mediana']} movimientos), "
+          f"renderer={parametros['renderer']}, paralelo={parametros['paralelo']}")
+    for escenario, r in resultado["escenarios"].items():
+        if escenario == "arranque":
+            print(f"   {escenario:<13} importar app {r['importar_app_ms']:.1f} ms | "
+                  f"primera solicitud {r['primera_solicitud_ms']:.1f} ms | "
+                  f"primer PDF en frío {r['primer_pdf_frio_ms']:.1f} ms | RSS {r['rss_pico_mb']:.1f} MB | "
+                  f"cargadas al importar: {', '.join(r['librerias_al_importar']) or 'ninguna pesada'}")
+            continue
+        unidad = "resúmenes" if escenario == "procesador" else "PDFs"
+        print(f"   {escenario:<13} {r['clientes_por_segundo']:8.2f} clientes/s | "
+              f"p50 {r['latencia_p50_ms']:8.2f} ms | p95 {r['latencia_p95_ms']:8.2f} ms | "
+              f"primero {r['primer_pdf_ms']:8.2f} ms | RSS {r['rss_pico_mb']:7.1f} MB | "
+              f"{r['pdfs']} {unidad} en {r['segundos']:.2f} s")
+        if r["etapas_segundos"]:
+            etapas = ", ".join(f"{etapa} {segundos:.2f} s" for etapa, segundos in sorted(r["etapas_segundos"].items()))
+            print(f"   {'':<13} etapas: {etapas}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta con datos sintéticos")
+    parser.add_argument("--clientes", type=int, default=300)
+    parser.add_argument("--mediana", type=int, default=25, help="Mediana de movimientos por cliente")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--renderer", default="auto", choices=("auto", "platypus", "canvas"))
+    parser.add_argument("--paralelo", action="store_true", help="Renderizar /comprobantes-con-saldo en paralelo")
+    parser.add_argument("--escenarios", default=",".join(ESCENARIOS))
+    parser.add_argument("--guardar", metavar="NOMBRE", help="Guardar el resultado como baseline")
+    parser.add_argument("--comparar", metavar="NOMBRE", help="Comparar con una baseline guardada")
+    parser.add_argument("--tolerancia", type=float, default=0.10, help="Empeoramiento aceptado (0.10 = 10 %%)")
+    args = parser.parse_args()
+
+    escenarios = [e.strip() for e in args.escenarios.split(",") if e.strip()]
+    invalidos = [e for e in escenarios if e not in ESCENARIOS]
+    if invalidos:
+        parser.error(f"Escenarios inválidos: {', '.join(invalidos)} (opciones: {', '.join(ESCENARIOS)})")
+
+    parametros = {"clientes": args.clientes, "mediana": args.mediana, "semilla": args.semilla,
+                  "renderer": args.renderer, "paralelo": args.paralelo}
+    directorio = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        archivos = preparar_datos(directorio, args.clientes, args.mediana, args.semilla)
+        print(f"🧪 Datos: {archivos['movimientos_saldo_acum']} movimientos en SaldoAcum, "
+              f"{archivos['movimientos_historico']} en Historico")
+        resultado = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "parametros": parametros,
+            "datos": {k: v for k, v in archivos.items() if k.startswith("movimientos")},
+            "escenarios": {
+                escenario: correr_en_proceso_nuevo(escenario, parametros, archivos, directorio)
+                for escenario in escenarios
+            },
+        }
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    imprimir(resultado)
+    if args.guardar:
+        guardar_baseline(args.guardar, resultado)
+    if args.comparar:
+        regresiones = comparar_baseline(args.comparar, resultado, args.tolerancia)
+        if regresiones:
+            print(f"❌ Regresiones de más del {args.tolerancia * 100:.0f} %: {', '.join(regresiones)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Micro-benchmark: tiempo por PDF de /comprobantes-con-saldo, antes y después de reutilizar la plantilla.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_plantilla.py [cantidad_clientes] [mediana_movimientos]
+
+Mide tres casos sobre el mismo lote (ver `datos_sinteticos`):
+
+- anterior: el armado por cliente de antes, copiado tal cual (DataFrame, formato celda
+  por celda, hoja de estilos, títulos, tablas y `SimpleDocTemplate` nuevos en cada PDF).
+- plantilla por cliente: el renderer actual, armando una `PlantillaEstadoCuenta` por PDF.
+- plantilla por lote: el renderer actual con una sola plantilla para todo el lote.
+
+La diferencia entre los dos últimos es lo que aporta sólo reutilizar la plantilla;
+la del primero contra el último es la mejora completa.
+"""
+import io
+import os
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datos_sinteticos import movimientos_saldo_acum  # noqa: E402
+from estado_cuenta import desde_saldos, crear_plantilla, renderizar  # noqa: E402
+from plantilla_pdf import hoja_estilos  # noqa: E402
+
+
+def lote(clientes, mediana, semilla=0):
+    """Lote con la forma de `obtener_saldos_ultimos_30_dias`: {ClienteCod: [registros]}"""
+    datos = {}
+    for fila in movimientos_saldo_acum(clientes, mediana, semilla=semilla):
+        datos.setdefault(fila["ClienteCod"], []).append(fila)
+    return datos
+
+
+# 📌 Implementación anterior, copiada tal cual (el PDF va a memoria en lugar de a disco)
+
+def format_money(val):
+    try:
+        num = round(float(val), 2)
+        return f"{num:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    except Exception:
+        return "0,00"
+
+
+def replace_comprobante(value):
+    value = str(value).strip()
+    replacements = {
+        "FC A": "FC", "XFC X": "FC",
+        "RC R": "RC", "XRC": "RC",
+        "NC A": "NC", "XNC X": "NC",
+        "NDA A": "ND", "XND X": "ND"
+    }
+    for key, new_value in replacements.items():
+        if value.startswith(key):
+            return new_value + value[len(key):]
+    return value
+
+
+def pdf_anterior(cliente_cod, registros):
+    df = pd.DataFrame(registros)
+    df["ComprobanteNro"] = df["ComprobanteNro"].astype(str).apply(replace_comprobante)
+    df = df.sort_values(by=["Femision"])
+    df_deuda = df[~df["ComprobanteNro"].str.startswith("RT")]
+    df_remitos = df[df["ComprobanteNro"].str.startswith("RT")]
+
+    required_columns = ["Femision", "ComprobanteNro", "FechaVto", "CondVta", "Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+    column_mappings = {
+        "Femision": "Fecha", "ComprobanteNro": "Comprobante Nro", "FechaVto": "Vto.", "CondVta": "Cond. Venta",
+        "Debe_Loc": "Debe", "Haber_Loc": "Haber", "SaldoAcum_Loc": "Saldo"
+    }
+    new_header = [column_mappings[col] for col in required_columns]
+
+    def prepare_data_rows(df_source, hide_saldo=False):
+        for col in ["Femision", "FechaVto"]:
+            df_source[col] = pd.to_datetime(df_source[col], errors='coerce').dt.strftime("%d/%m/%Y")
+        for col in ["Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]:
+            df_source[col] = pd.to_numeric(df_source[col], errors="coerce")
+        data_rows = df_source[required_columns].values.tolist()
+        for row in data_rows:
+            for i in [4, 5, 6]:
+                if i == 6 and hide_saldo:
+                    row[i] = ""
+                if i == 6 and (row[i] == 0 or pd.isna(row[i])):
+                    row[i] = "0,00"
+                else:
+                    row[i] = format_money(row[i]) if row[i] and not pd.isna(row[i]) else ""
+        return data_rows
+
+    data_rows_deuda = prepare_data_rows(df_deuda)
+    data_rows_remitos = prepare_data_rows(df_remitos, hide_saldo=True)
+
+    razon_social = registros[0]["RazonSocial"] if registros else f"Cliente_{cliente_cod}"
+    styles = getSampleStyleSheet()
+    p_date = Paragraph(datetime.today().strftime("%d/%m/%Y"), styles["Normal"])
+    p_title = Paragraph(f"Estado de Cuenta - {razon_social}", styles["Title"])
+    p_deuda_title = Paragraph("<b>1. Deuda en Cta.Cte.</b>", styles["Heading2"])
+    p_remitos_title = Paragraph("<b>2. Remitos pendientes de Facturar - Valor Estimado</b>", styles["Heading2"])
+
+    column_widths = [80, 120, 80, 80, 80, 80, 80]
+    header_table = Table([new_header], colWidths=column_widths)
+    header_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ]))
+
+    data_table_deuda = Table(data_rows_deuda, colWidths=column_widths)
+    data_table_deuda.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+    if data_rows_deuda:
+        last_row_index = len(data_rows_deuda) - 1
+        saldo_column_index = new_header.index("Saldo")
+        data_table_deuda.setStyle(TableStyle([
+            ('BOX', (saldo_column_index, last_row_index), (saldo_column_index, last_row_index), 2, colors.red),
+            ('BACKGROUND', (saldo_column_index, last_row_index), (saldo_column_index, last_row_index), colors.yellow),
+            ('FONTNAME', (saldo_column_index, last_row_index), (saldo_column_index, last_row_index), 'Helvetica-Bold'),
+            ('TEXTCOLOR', (saldo_column_index, last_row_index), (saldo_column_index, last_row_index), colors.black),
+        ]))
+
+    data_table_remitos = Table(data_rows_remitos, colWidths=column_widths)
+    data_table_remitos.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ]))
+
+    salida = io.BytesIO()
+    doc = SimpleDocTemplate(salida, pagesize=landscape(letter))
+    doc.build([
+        p_date, Spacer(1, 12), p_title, Spacer(1, 12),
+        p_deuda_title, Spacer(1, 6), header_table, Spacer(1, 6), data_table_deuda, Spacer(1, 12),
+        p_remitos_title, Spacer(1, 6), header_table, Spacer(1, 6), data_table_remitos
+    ])
+    return salida.getvalue()
+
+
+# 📌 Casos medidos
+
+def medir_anterior(datos):
+    inicio = time.perf_counter()
+    for cliente_cod, registros in datos.items():
+        pdf_anterior(cliente_cod, registros)
+    return time.perf_counter() - inicio
+
+
+def medir(datos, compartida):
+    # 🔹 La preparación del lote (`desde_saldos`) queda adentro, igual que la del camino anterior
+    inicio = time.perf_counter()
+    estados = desde_saldos(datos)
+    plantilla = crear_plantilla("saldos") if compartida else None
+    for estado in estados:
+        if not compartida:
+            hoja_estilos.cache_clear()
+            plantilla = crear_plantilla("saldos")
+        renderizar(estado, "saldos", plantilla, renderer="platypus")
+    return time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    clientes = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    mediana = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    datos = lote(clientes, mediana)
+    movimientos = sum(len(registros) for registros in datos.values())
+
+    calentamiento = dict(list(datos.items())[:20])  # 🔹 Fuentes, imports
+    medir_anterior(calentamiento)
+    medir(calentamiento, compartida=True)
+
+    anterior = medir_anterior(datos)
+    por_cliente = medir(datos, compartida=False)
+    por_lote = medir(datos, compartida=True)
+
+    print(f"📊 {clientes} clientes, {movimientos} movimientos (mediana {mediana} por cliente)")
+    for nombre, segundos in (("Anterior (SimpleDocTemplate)", anterior), ("Plantilla por cliente", por_cliente),
+                             ("Plantilla por lote", por_lote)):
+        print(f"   {nombre:<30} {segundos:6.2f} s ({segundos / clientes * 1000:6.2f} ms/PDF)")
+    print(f"   Mejora completa (anterior vs. por lote):        {(1 - por_lote / anterior) * 100:5.1f} %")
+    print(f"   Sólo reutilizar la plantilla (por cliente vs. lote): {(1 - por_lote / por_cliente) * 100:5.1f} %")
@@ -0,0 +1,199 @@
+"""
+Datos sintéticos con la forma de las vistas de Bejerman, para los benchmarks.
+
+- `_DL_PBI_EstadoCtaCte_SaldoAcum`: movimientos con saldo acumulado (/comprobantes-con-saldo
+  y el export de Excel que recibe /upload).
+- `_Sta_PBI_DeudoresCtaCte_Historico`: comprobantes con saldo pendiente (antigüedad de deuda).
+
+La cantidad de movimientos por cliente sigue una distribución log-normal: la mayoría
+tiene pocas decenas y unos pocos tienen cientos, como en la cartera real. Todo depende
+de `semilla`, así dos corridas con los mismos parámetros usan exactamente los mismos datos.
+"""
+import math
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+COLUMNAS_SALDO_ACUM = ["ClienteCod", "RazonSocial", "Femision", "ComprobanteNro", "FechaVto",
+                       "CondVta", "Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+
+COLUMNAS_HISTORICO = ["ClienteCod", "RazonSocial", "Comp_tipo", "Comp_letra", "Comp_PtoVta", "Comp_Nro",
+                      "CompNro", "Fecha", "Fecha_vto", "CondVta_Cod", "CondVta", "VendedorCod", "Vendedor",
+                      "Total_Loc", "Saldo_Loc", "PuntoReg_cod", "PuntoReg", "CC_Por_LugEnt", "LugEnt_Id",
+                      "LugarEnt", "LugarEnt_RefClienteCod", "LugarEnt_Grupo", "LugarEnt_SubGrupo", "Habilitado"]
+
+# 📌 Tipos de comprobante (prefijo de ComprobanteNro) y su peso relativo; los X son los internos
+TIPOS_COMPROBANTE = [("FC A", 40), ("XFC X", 5), ("RC R", 25), ("XRC", 3), ("NC A", 8),
+                     ("XNC X", 2), ("NDA A", 4), ("XND X", 1), ("RT R", 12)]
+_DEBITOS = {"FC A", "XFC X", "NDA A", "XND X", "RT R"}
+
+CONDICIONES_VENTA = [("01", "Contado"), ("07", "Cta Cte 7 días"), ("15", "Cta Cte 15 días"),
+                     ("30", "Cta Cte 30 días"), ("60", "Cta Cte 60 días")]
+VENDEDORES = [(f"V{i:02d}", f"VENDEDOR {i:02d}") for i in range(1, 13)]
+
+
+def cantidad_movimientos(aleatorio, mediana=25, maximo=1500):
+    """Movimientos de un cliente: log-normal con la mediana pedida, al menos 2"""
+    return max(2, min(maximo, int(aleatorio.lognormvariate(math.log(mediana), 0.9))))
+
+
+def razon_social(cliente):
+    return f"CLIENTE SINTETICO {cliente:05d} S.A."
+
+
+def _tipo(aleatorio):
+    tipos, pesos = zip(*TIPOS_COMPROBANTE)
+    return aleatorio.choices(tipos, weights=pesos)[0]
+
+
+def movimientos_saldo_acum(clientes, mediana=25, dias=60, semilla=0, hoy=None):
+    """
+    Filas de `_DL_PBI_EstadoCtaCte_SaldoAcum` de `clientes` clientes, ordenadas por fecha.
+
+    Las fechas de emisión cubren los últimos `dias` días, así que sólo una parte entra
+    en la ventana de 30 días. Cada cliente tiene al menos una factura y un remito dentro
+    de esa ventana: el PDF por cliente espera las dos tablas con filas.
+
+    Retorna:
+    - Lista de diccionarios con las columnas de `COLUMNAS_SALDO_ACUM` (fechas como datetime).
+    """
+    aleatorio = random.Random(semilla)
+    hoy = (hoy or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    filas = []
+    for cliente in range(clientes):
+        codigo = f"{cliente:06d}"
+        nombre = razon_social(cliente)
+        cod_condicion, condicion = aleatorio.choice(CONDICIONES_VENTA)
+        cantidad = cantidad_movimientos(aleatorio, mediana)
+
+        movimientos = []
+        for i in range(cantidad):
+            tipo = ("FC A", "RT R")[i] if i < 2 else _tipo(aleatorio)
+            antiguedad = aleatorio.randint(0, 25) if i < 2 else aleatorio.randint(0, dias)
+            movimientos.append((hoy - timedelta(days=antiguedad), tipo, i))
+        movimientos.sort()
+
+        saldo = aleatorio.uniform(-50_000, 2_000_000)  # 🔹 Saldo arrastrado de antes de la ventana
+        for fecha, tipo, i in movimientos:
+            importe = round(aleatorio.uniform(1_000, 900_000), 2)
+            debe, haber = (importe, 0.0) if tipo in _DEBITOS else (0.0, importe)
+            saldo += debe - haber
+            letra_pto = "0002" if tipo.startswith("X") else "0001"
+            filas.append({
+                "ClienteCod": codigo,
+                "RazonSocial": nombre,
+                "Femision": fecha,
+                "ComprobanteNro": f"{tipo} {letra_pto}-{10_000_000 + cliente * 2_000 + i:08d}",
+                "FechaVto": fecha + timedelta(days=int(cod_condicion)) if tipo != "RT R" else None,
+                "CondVta": condicion,
+                "Debe_Loc": debe,
+                "Haber_Loc": haber,
+                "SaldoAcum_Loc": round(saldo, 2),
+            })
+    filas.sort(key=lambda fila: fila["Femision"])
+    return filas
+
+
+def movimientos_historico(clientes, mediana=25, semilla=0, hoy=None):
+    """
+    Filas de `_Sta_PBI_DeudoresCtaCte_Historico` de `clientes` clientes.
+
+    Mezcla comprobantes vencidos (hasta un año), a vencer, saldos a favor (recibos y notas
+    de crédito), saldos en cero y clientes deshabilitados, para cubrir todos los tramos.
+
+    Retorna:
+    - Diccionario {razon_social: [registros]} con las columnas de `COLUMNAS_HISTORICO`.
+    """
+    aleatorio = random.Random(semilla + 1)
+    hoy = hoy or datetime.now()
+    datos = {}
+    for cliente in range(clientes):
+        codigo = f"{cliente:06d}"
+        nombre = razon_social(cliente)
+        vendedor_cod, vendedor = aleatorio.choice(VENDEDORES)
+        habilitado = 0 if aleatorio.random() < 0.05 else 1
+        registros = []
+        for i in range(cantidad_movimientos(aleatorio, mediana)):
+            tipo = _tipo(aleatorio)
+            tipo_cod, _, letra = tipo.partition(" ")
+            cod_condicion, condicion = aleatorio.choice(CONDICIONES_VENTA)
+            fecha = hoy - timedelta(days=aleatorio.randint(0, 400), seconds=aleatorio.randint(0, 86_399))
+            total = round(aleatorio.uniform(1_000, 900_000), 2) * (1 if tipo in _DEBITOS else -1)
+            saldo = 0.0 if aleatorio.random() < 0.3 else round(total * aleatorio.choice([1, 1, 0.5, 0.1]), 2)
+            numero = f"{10_000_000 + cliente * 2_000 + i:08d}"
+            registros.append({
+                "ClienteCod": codigo,
+                "RazonSocial": nombre,
+                "Comp_tipo": tipo_cod,
+                "Comp_letra": letra or "X",
+                "Comp_PtoVta": "0001",
+                "Comp_Nro": numero,
+                "CompNro": f"{tipo} 0001-{numero}",
+                "Fecha": fecha,
+                "Fecha_vto": fecha + timedelta(days=int(cod_condicion)),
+                "CondVta_Cod": cod_condicion,
+                "CondVta": condicion,
+                "VendedorCod": vendedor_cod,
+                "Vendedor": vendedor,
+                "Total_Loc": total,
+                "Saldo_Loc": saldo,
+                "PuntoReg_cod": "01",
+                "PuntoReg": "CASA CENTRAL",
+                "CC_Por_LugEnt": 0,
+                "LugEnt_Id": 1,
+                "LugarEnt": "DOMICILIO FISCAL",
+                "LugarEnt_RefClienteCod": codigo,
+                "LugarEnt_Grupo": "1-Detalle",
+                "LugarEnt_SubGrupo": "",
+                "Habilitado": habilitado,
+            })
+        datos[nombre] = registros
+    return datos
+
+
+def crear_base_sqlite(ruta, saldo_acum, historico):
+    """
+    Crea una base SQLite con las dos vistas como tablas (mismos nombres y columnas).
+
+    Las fechas se declaran TIMESTAMP: con `?detect_types=1` en `DATABASE_URL` vuelven
+    como datetime, igual que con pyodbc.
+    """
+    tipos = {"Femision": "TIMESTAMP", "FechaVto": "TIMESTAMP", "Fecha": "TIMESTAMP", "Fecha_vto": "TIMESTAMP",
+             "Debe_Loc": "REAL", "Haber_Loc": "REAL", "SaldoAcum_Loc": "REAL", "Total_Loc": "REAL",
+             "Saldo_Loc": "REAL", "Habilitado": "INTEGER", "CC_Por_LugEnt": "INTEGER", "LugEnt_Id": "INTEGER"}
+
+    conexion = sqlite3.connect(ruta)
+    try:
+        for vista, columnas, filas in (
+            ("_DL_PBI_EstadoCtaCte_SaldoAcum", COLUMNAS_SALDO_ACUM, saldo_acum),
+            ("_Sta_PBI_DeudoresCtaCte_Historico", COLUMNAS_HISTORICO,
+             [fila for registros in historico.values() for fila in registros]),
+        ):
+            definicion = ", ".join(f"{col} {tipos.get(col, 'TEXT')}" for col in columnas)
+            conexion.execute(f"DROP TABLE IF EXISTS {vista}")
+            conexion.execute(f"CREATE TABLE {vista} ({definicion})")
+            conexion.executemany(
+                f"INSERT INTO {vista} VALUES ({', '.join('?' * len(columnas))})",
+                ([_valor_sqlite(fila[col]) for col in columnas] for fila in filas),
+            )
+        conexion.execute("CREATE INDEX ix_saldo_acum ON _DL_PBI_EstadoCtaCte_SaldoAcum (ClienteCod, Femision)")
+        conexion.commit()
+    finally:
+        conexion.close()
+
+
+def _valor_sqlite(valor):
+    # 🔹 Mismo texto que el adaptador de sqlite3 (deprecado desde Python 3.12)
+    return valor.isoformat(" ") if isinstance(valor, datetime) else valor
+
+
+def escribir_excel(ruta, saldo_acum):
+    """Escribe el export de movimientos que recibe /upload (una hoja, encabezado en la primera fila)"""
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Hoja1")
+    hoja.append(COLUMNAS_SALDO_ACUM)
+    for fila in saldo_acum:
+        hoja.append([fila[col] for col in COLUMNAS_SALDO_ACUM])
+    libro.save(ruta)
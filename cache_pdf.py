@@ -0,0 +1,152 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# 📌 PDFs ya renderizados de /upload y /comprobantes-con-saldo, uno por cliente e indexados por su contenido
+CACHE_PDF_DIR = os.getenv("CACHE_PDF_DIR") or os.path.join(tempfile.gettempdir(), "estado_cuenta_cache_pdf")
+CACHE_PDF_MAX_MB = int(os.getenv("CACHE_PDF_MAX_MB", 512))  # Tamaño máximo en disco (0 = cache deshabilitado)
+
+_EXTENSION = ".pdf"
+
+
+def huella(clave, version, partes):
+    """
+    Calcula la huella del estado de cuenta de un cliente.
+
+    Combina la clave del cliente (código o razón social), la versión de la plantilla
+    (y del motor de dibujo), la fecha de hoy, que se imprime en el PDF, y los bytes de
+    sus movimientos (`partes`, ver `EstadoCuenta.partes_huella`). Si cualquier
+    movimiento cambia, la huella cambia y el PDF se vuelve a generar.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{clave}|{version}|{date.today().isoformat()}".encode("utf-8", "surrogatepass"))
+    for parte in partes:
+        digest.update(len(parte).to_bytes(8, "little"))  # 🔹 Con el largo, dos cortes distintos nunca se confunden
+        digest.update(parte)
+    return digest.hexdigest()
+
+
+class CachePDF:
+    """
+    Cache en disco de los PDFs por cliente, con tamaño máximo y desalojo del menos usado.
+
+    Igual que `cache_zip`, el uso se marca con la fecha de modificación del archivo, así
+    que varios workers pueden compartir la misma carpeta. Los contadores son por proceso.
+    """
+
+    def __init__(self, directorio=CACHE_PDF_DIR, max_mb=CACHE_PDF_MAX_MB):
+        self.directorio = directorio
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._escrito_desde_poda = 0
+        self.hits = 0
+        self.misses = 0
+        self.escrituras = 0
+        self.desalojos = 0
+
+    @property
+    def habilitado(self):
+        return self.max_bytes > 0
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}{_EXTENSION}")
+
+    def obtener(self, clave):
+        """Bytes del PDF guardado para `clave`, o None si no está en cache"""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            os.utime(ruta)  # 🔹 Marca el uso para el desalojo por antigüedad
+        except FileNotFoundError:
+            contenido = None
+
+        with self._lock:
+            if contenido is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return contenido
+
+    def contiene(self, clave):
+        """Indica si `clave` está en cache sin leerla (si no está, cuenta como miss)"""
+        if os.path.exists(self._ruta(clave)):
+            return True
+        with self._lock:
+            self.misses += 1
+        return False
+
+    def guardar(self, clave, contenido):
+        """Guarda el PDF de `clave` (escritura atómica: otro worker nunca lee un archivo a medias)"""
+        os.makedirs(self.directorio, exist_ok=True)
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, self._ruta(clave))
+
+        with self._lock:
+            self.escrituras += 1
+            self._escrito_desde_poda += len(contenido)
+            # 🔹 Recorrer la carpeta en cada escritura sería cuadrático: se poda cada ~10% del máximo
+            podar = self._escrito_desde_poda > self.max_bytes // 10
+            if podar:
+                self._escrito_desde_poda = 0
+        if podar:
+            self.podar()
+
+    def podar(self):
+        """Elimina los PDFs usados hace más tiempo hasta quedar por debajo del tamaño máximo"""
+        try:
+            archivos = [
+                (entrada.stat().st_mtime, entrada.stat().st_size, entrada.path)
+                for entrada in os.scandir(self.directorio) if entrada.name.endswith(_EXTENSION)
+            ]
+        except FileNotFoundError:
+            return
+
+        total = sum(tamano for _, tamano, _ in archivos)
+        eliminados = 0
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+                eliminados += 1
+            except FileNotFoundError:
+                pass  # 🔹 Otro worker pudo haber borrado el mismo archivo
+            total -= tamano
+
+        if eliminados:
+            with self._lock:
+                self.desalojos += eliminados
+            logger.info("🧹 Cache de PDFs: %s PDFs desalojados (%.1f MB en disco)", eliminados, total / 1024 / 1024)
+
+    def estadisticas(self):
+        """Uso del cache en este proceso y ocupación actual de la carpeta"""
+        try:
+            tamanos = [entrada.stat().st_size for entrada in os.scandir(self.directorio)
+                       if entrada.name.endswith(_EXTENSION)]
+        except FileNotFoundError:
+            tamanos = []
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "habilitado": self.habilitado,
+                "archivos": len(tamanos),
+                "bytes": sum(tamanos),
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / consultas, 4) if consultas else None,
+                "escrituras": self.escrituras,
+                "desalojos": self.desalojos,
+            }
+
+
+# 📌 Cache compartido por todas las rutas del proceso
+cache_pdf = CachePDF()
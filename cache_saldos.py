@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# 📌 Resultados recientes de `_DL_PBI_EstadoCtaCte_SaldoAcum` (por proceso)
+CACHE_SALDOS_TTL = int(os.getenv("CACHE_SALDOS_TTL", 300))  # Segundos que vale un resultado
+CACHE_SALDOS_MAX_ENTRADAS = int(os.getenv("CACHE_SALDOS_MAX_ENTRADAS", 2000))  # Entradas antes de desalojar
+# 📌 Invalidaciones compartidas por todos los workers de gunicorn de la instancia (ver `CacheTTL`)
+CACHE_SALDOS_INVALIDACIONES = os.getenv("CACHE_SALDOS_INVALIDACIONES") or os.path.join(
+    tempfile.gettempdir(), "estado_cuenta_cache_saldos_invalidaciones")
+
+
+class ResultadoSaldo:
+    """Filas de un cliente tal como salen de la vista: nombres de columna + tuplas de valores"""
+
+    __slots__ = ("columnas", "filas")
+
+    def __init__(self, columnas, filas):
+        self.columnas = tuple(columnas)
+        self.filas = filas
+
+    def registros(self):
+        """Filas como diccionarios {columna: valor}"""
+        return [dict(zip(self.columnas, fila)) for fila in self.filas]
+
+
+class CacheTTL:
+    """
+    Cache en memoria con vencimiento por tiempo y desalojo del menos usado (LRU).
+
+    Las claves son tuplas (cliente, ventana); `invalidar` puede borrar todas las
+    ventanas de un cliente.
+
+    Los datos son de cada proceso, pero con `invalidaciones` (ruta de un archivo) las
+    invalidaciones se comparten: `invalidar` agrega una línea al archivo y cada proceso
+    aplica las líneas nuevas antes de leer o guardar. Una invalidación total reemplaza
+    el archivo, y un proceso que lo ve reemplazado vacía su cache completo.
+    """
+
+    def __init__(self, ttl=CACHE_SALDOS_TTL, max_entradas=CACHE_SALDOS_MAX_ENTRADAS, invalidaciones=None):
+        self.ttl = ttl
+        self.max_entradas = max_entradas
+        self.invalidaciones = invalidaciones
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self._leido = (None, 0)  # 🔹 (inodo, bytes) del archivo de invalidaciones ya aplicados
+        self.hits = 0
+        self.misses = 0
+
+    def obtener(self, clave):
+        """Valor guardado para `clave`, o None si no existe o venció"""
+        ahora = time.monotonic()
+        with self._lock:
+            self._sincronizar()
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] < ahora:
+                if entrada is not None:
+                    del self._datos[clave]
+                self.misses += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            self._sincronizar()
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clientes=None):
+        """
+        Borra las entradas de los clientes indicados (todas sus ventanas),
+        o todo el cache si no se indica ninguno. Con `invalidaciones`, el resto
+        de los procesos las borra en su próxima lectura.
+
+        Retorna:
+        - Cantidad de entradas eliminadas en este proceso.
+        """
+        if clientes is not None:
+            clientes = sorted({str(cliente).strip() for cliente in clientes})
+        with self._lock:
+            self._sincronizar()
+            eliminadas = self._borrar(clientes)
+            if self.invalidaciones:
+                self._publicar(clientes)
+            return eliminadas
+
+    def _borrar(self, clientes):
+        if clientes is None:
+            eliminadas = len(self._datos)
+            self._datos.clear()
+            return eliminadas
+
+        clientes = set(clientes)
+        claves = [clave for clave in self._datos if clave[0] in clientes]
+        for clave in claves:
+            del self._datos[clave]
+        return len(claves)
+
+    def _publicar(self, clientes):
+        """Agrega la invalidación al archivo compartido (una línea JSON: lista de clientes o null)"""
+        linea = (json.dumps(clientes, ensure_ascii=False) + "\n").encode("utf-8")
+        if clientes is None:
+            # 🔹 Invalidación total: el archivo nuevo reemplaza al anterior (los demás procesos ven otro inodo)
+            temporal = f"{self.invalidaciones}.{os.getpid()}.tmp"
+            with open(temporal, "wb") as f:
+                f.write(linea)
+            os.replace(temporal, self.invalidaciones)
+        elif clientes:
+            # 🔹 O_APPEND: las líneas de procesos distintos nunca se mezclan
+            descriptor = os.open(self.invalidaciones, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(descriptor, linea)
+            finally:
+                os.close(descriptor)
+        # 🔹 Marca como aplicada la línea propia (y las que hayan agregado otros procesos)
+        self._sincronizar()
+
+    def _sincronizar(self):
+        """Aplica las invalidaciones que otros procesos agregaron al archivo compartido (con el lock tomado)"""
+        if not self.invalidaciones:
+            return
+        try:
+            estado = os.stat(self.invalidaciones)
+            if (estado.st_ino, estado.st_size) == self._leido:
+                return  # 🔹 Caso habitual en cada lectura: un solo `stat`, sin abrir el archivo
+            with open(self.invalidaciones, "rb") as f:
+                estado = os.fstat(f.fileno())
+                inodo, leido = self._leido
+                if estado.st_ino != inodo or estado.st_size < leido:
+                    if inodo is not None:
+                        self._datos.clear()  # 🔹 Archivo reemplazado: hubo una invalidación total
+                    leido = 0
+                f.seek(leido)
+                nuevos = f.read()
+        except FileNotFoundError:
+            return
+
+        completos = nuevos[:nuevos.rfind(b"\n") + 1]  # 🔹 Una línea a medio escribir se lee la próxima vez
+        for linea in completos.splitlines():
+            try:
+                self._borrar(json.loads(linea))
+            except ValueError:
+                logger.warning("⚠️ Línea inválida en %s: %r", self.invalidaciones, linea)
+        self._leido = (estado.st_ino, leido + len(completos))
+
+    def estadisticas(self):
+        with self._lock:
+            self._sincronizar()
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / consultas, 4) if consultas else 0.0,
+            }
+
+
+# 📌 Cache compartido por /saldo-acumulado, /saldo-acumulado-excel y /comprobantes-con-saldo
+cache_saldos = CacheTTL(invalidaciones=CACHE_SALDOS_INVALIDACIONES)
@@ -0,0 +1,109 @@
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# 📌 ZIPs ya generados para /upload, indexados por el contenido del Excel y la selección
+CACHE_ZIP_DIR = os.getenv("CACHE_ZIP_DIR") or os.path.join(tempfile.gettempdir(), "estado_cuenta_cache_zip")
+CACHE_ZIP_MAX_ARCHIVOS = int(os.getenv("CACHE_ZIP_MAX_ARCHIVOS", 50))
+
+
+def clave_upload(excel_file_path, razones_sociales, version_plantilla):
+    """
+    Calcula la clave de cache de un /upload.
+
+    Combina el hash SHA-256 del Excel, las razones sociales elegidas (sin importar
+    el orden ni los duplicados), la versión de la plantilla de PDF y la fecha del día
+    (los PDFs imprimen la fecha en que se generan).
+    """
+    hash_excel = hashlib.sha256()
+    with open(excel_file_path, "rb") as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            hash_excel.update(bloque)
+
+    seleccion = json.dumps(sorted({str(razon) for razon in razones_sociales}), ensure_ascii=False)
+
+    clave = hashlib.sha256()
+    clave.update(hash_excel.hexdigest().encode())
+    clave.update(seleccion.encode("utf-8"))
+    clave.update(str(version_plantilla).encode())
+    clave.update(date.today().isoformat().encode())
+    return clave.hexdigest()
+
+
+def _ruta(clave):
+    return os.path.join(CACHE_ZIP_DIR, f"{clave}.zip")
+
+
+def obtener(clave):
+    """
+    ZIP guardado para `clave`, ya abierto en modo binario, o None si no está en cache.
+
+    Se devuelve el archivo abierto y no la ruta: otro worker puede podar la entrada
+    en cualquier momento y el archivo abierto se sigue pudiendo leer hasta cerrarlo.
+    Quien lo recibe debe cerrarlo (`send_file` lo cierra al terminar la respuesta).
+    """
+    ruta = _ruta(clave)
+    try:
+        archivo = open(ruta, "rb")
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(archivo.fileno())  # 🔹 Marca el uso para el desalojo por antigüedad
+    except OSError:
+        pass  # 🔹 Ya podado: igual se envía el archivo abierto
+    logger.info("♻️ ZIP encontrado en cache: %s", clave[:12])
+    return archivo
+
+
+def guardar_archivo(clave, zip_path):
+    """Copia un ZIP ya generado al cache"""
+    os.makedirs(CACHE_ZIP_DIR, exist_ok=True)
+    temporal = f"{_ruta(clave)}.{os.getpid()}.tmp"
+    shutil.copyfile(zip_path, temporal)
+    os.replace(temporal, _ruta(clave))
+    _podar()
+
+
+def guardar_stream(clave, bloques, descartar=None):
+    """
+    Reenvía los bloques de un ZIP en streaming y, a la vez, los guarda en cache.
+
+    El ZIP sólo queda disponible si el stream se completa; si se corta a mitad
+    de camino (error o cliente desconectado) se descarta. También se descarta
+    si `descartar()` (opcional) devuelve True al terminar, p. ej. si faltó algún PDF.
+    """
+    os.makedirs(CACHE_ZIP_DIR, exist_ok=True)
+    temporal = f"{_ruta(clave)}.{os.getpid()}.{id(bloques)}.tmp"
+    completo = False
+    try:
+        with open(temporal, "wb") as f:
+            for bloque in bloques:
+                f.write(bloque)
+                yield bloque
+        completo = not (descartar and descartar())
+    finally:
+        if completo:
+            os.replace(temporal, _ruta(clave))
+            _podar()
+        elif os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def _podar():
+    """Elimina los ZIPs usados hace más tiempo si se supera `CACHE_ZIP_MAX_ARCHIVOS`"""
+    try:
+        archivos = [
+            os.path.join(CACHE_ZIP_DIR, nombre)
+            for nombre in os.listdir(CACHE_ZIP_DIR) if nombre.endswith(".zip")
+        ]
+        archivos.sort(key=os.path.getmtime)
+        for ruta in archivos[:max(0, len(archivos) - CACHE_ZIP_MAX_ARCHIVOS)]:
+            os.remove(ruta)
+    except FileNotFoundError:
+        pass  # 🔹 Otro worker pudo haber borrado el mismo archivo
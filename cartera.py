@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+import pandas as pd
+from database import session_scope, lotes_cursor
+from queries import cartera_saldos_abiertos
+from antiguedad import clasificar, resumir_clasificados, etiquetas_tramos
+from metricas import medir
+
+logger = logging.getLogger(__name__)
+
+# 📌 Cada cuánto se recalcula el resumen de antigüedad de toda la cartera (por proceso)
+CARTERA_REFRESCO_SEGUNDOS = int(os.getenv("CARTERA_REFRESCO_SEGUNDOS", 600))
+
+COLUMNAS_TOTALES = ["credito_a_favor", "total_vencidos", "total_a_vencer", "total_global"]
+
+
+def calcular_resumen(df, hoy=None):
+    """
+    Arma el resumen de cartera a partir de los saldos abiertos.
+
+    Parámetros:
+    - df (DataFrame): Filas de `cartera_saldos_abiertos` (ClienteCod, RazonSocial,
+      Vendedor, Fecha_vto, Saldo_Deudor, Saldo_Acreedor).
+
+    Retorna:
+    - Diccionario con los totales de la cartera, por cliente y por vendedor.
+    """
+    # 🔹 Deudor y acreedor pasan a ser movimientos separados para que `clasificar` los distinga
+    base = df[["ClienteCod", "RazonSocial", "Vendedor", "Fecha_vto"]]
+    movimientos = pd.concat([
+        base.assign(Saldo_Loc=pd.to_numeric(df["Saldo_Deudor"]).astype("float64")),
+        base.assign(Saldo_Loc=pd.to_numeric(df["Saldo_Acreedor"]).astype("float64")),
+    ], ignore_index=True)
+    movimientos = movimientos[movimientos["Saldo_Loc"] != 0]
+    movimientos["Vendedor"] = movimientos["Vendedor"].fillna("")
+
+    clasificados = clasificar(movimientos, hoy)
+    tramos = etiquetas_tramos()
+    columnas = COLUMNAS_TOTALES + tramos
+
+    por_cliente = resumir_clasificados(clasificados, clave="ClienteCod")
+    razones = clasificados.groupby("ClienteCod", sort=False)["RazonSocial"].first()
+    por_cliente.insert(0, "RazonSocial", razones.reindex(por_cliente.index).fillna(""))
+    por_cliente = por_cliente.sort_values("total_global", ascending=False)
+
+    por_vendedor = resumir_clasificados(clasificados, clave="Vendedor")[columnas]
+    clientes_por_vendedor = clasificados.groupby("Vendedor")["ClienteCod"].nunique()
+    por_vendedor["clientes"] = clientes_por_vendedor.reindex(por_vendedor.index).fillna(0).astype(int)
+    por_vendedor = por_vendedor.sort_values("total_global", ascending=False)
+
+    totales = {col: round(float(por_cliente[col].sum()), 2) for col in columnas}
+    totales["clientes"] = len(por_cliente)
+
+    return {
+        "tramos": tramos,
+        "totales": totales,
+        "clientes": _registros(por_cliente, columnas),
+        "vendedores": _registros(por_vendedor, columnas),
+    }
+
+
+def _registros(resumen, columnas):
+    resumen = resumen.copy()
+    resumen[columnas] = resumen[columnas].round(2)
+    return resumen.reset_index().to_dict("records")
+
+
+class AgregadoCartera:
+    """
+    Resumen de antigüedad de deuda de toda la cartera, recalculado en segundo plano.
+
+    Las consultas del dashboard leen la última versión calculada (sin ir a SQL Server);
+    un hilo la recalcula cada `intervalo` segundos. La primera consulta del proceso
+    espera el primer cálculo.
+    """
+
+    def __init__(self, intervalo=CARTERA_REFRESCO_SEGUNDOS):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._lock_calculo = threading.Lock()
+        self._hilo = None
+        self._resumen = None
+        self._json = None
+        self.actualizado = None
+        self.duracion = None
+        self.error = None
+
+    def obtener(self):
+        """Último resumen calculado como diccionario (lo calcula si todavía no existe)"""
+        self._asegurar()
+        with self._lock:
+            return self._resumen
+
+    def obtener_json(self):
+        """Último resumen ya serializado a JSON (bytes), para responder sin volver a codificarlo"""
+        self._asegurar()
+        with self._lock:
+            return self._json
+
+    def refrescar(self, solo_si_falta=False):
+        """Recalcula el resumen desde SQL Server; si falla se conserva el anterior"""
+        with self._lock_calculo:
+            if solo_si_falta and self._resumen is not None:
+                return True  # 🔹 Otra solicitud lo calculó mientras se esperaba el lock
+
+            inicio = time.perf_counter()
+            try:
+                with session_scope() as db, medir("sql"):
+                    result = db.execute(cartera_saldos_abiertos())
+                    columnas = list(result.keys())
+                    filas = [fila for lote in lotes_cursor(result) for fila in lote]
+                df = pd.DataFrame(filas, columns=columnas)
+                resumen = calcular_resumen(df)
+            except Exception as e:
+                self.error = str(e)
+                logger.error("❌ Error al recalcular el resumen de cartera: %s", e, exc_info=True)
+                return False
+
+            duracion = time.perf_counter() - inicio
+            resumen["actualizado"] = datetime.now().isoformat(timespec="seconds")
+            resumen["duracionSegundos"] = round(duracion, 3)
+            contenido = json.dumps(resumen, ensure_ascii=False, default=str).encode("utf-8")
+
+            with self._lock:
+                self._resumen = resumen
+                self._json = contenido
+                self.actualizado = time.time()
+                self.duracion = duracion
+                self.error = None
+
+            logger.info("📊 Resumen de cartera actualizado: %d clientes en %.2f s",
+                        resumen["totales"]["clientes"], duracion)
+            return True
+
+    def _asegurar(self):
+        self._iniciar_hilo()
+        if self._resumen is None:
+            self.refrescar(solo_si_falta=True)
+        if self._resumen is None:
+            raise RuntimeError(f"El resumen de cartera todavía no está disponible: {self.error}")
+
+    def _iniciar_hilo(self):
+        # 🔹 Igual que en `trabajos`: el hilo se crea al primer uso, nunca al importar
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=self._ejecutar, name="cartera", daemon=True)
+            self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            time.sleep(self.intervalo)
+            self.refrescar()
+
+
+# 📌 Agregado compartido por todas las rutas del proceso
+agregado_cartera = AgregadoCartera()
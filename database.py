@@ -1,6 +1,11 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
 import os
+import time
+import threading
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env
@@ -12,19 +17,109 @@ DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_SERVER = os.getenv("DB_SERVER")
 DB_DATABASE = os.getenv("DB_DATABASE")
 
-# URL de conexión a SQL Server
-DATABASE_URL = f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}/{DB_DATABASE}?driver=ODBC+Driver+17+for+SQL+Server"
+# Configuración del pool de conexiones
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))  # Conexiones que se mantienen abiertas
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))  # Conexiones extra en picos de carga
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))  # Segundos de espera por una conexión libre
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # Renovar conexiones antes de que Azure SQL las corte
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "si", "yes")  # Descartar conexiones muertas
+
+# 📌 Filas que se leen del cursor por cada `fetchmany` en las respuestas en streaming
+DB_FETCH_SIZE = max(1, int(os.getenv("DB_FETCH_SIZE", 1000)))
+
+# URL de conexión a SQL Server (`DATABASE_URL` la reemplaza completa, por ejemplo con SQLite en los benchmarks)
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mssql+pyodbc://{DB_USER}:{DB_PASSWORD}@{DB_SERVER}/{DB_DATABASE}?driver=ODBC+Driver+17+for+SQL+Server"
+
+# 🔹 `fast_executemany` sólo existe en el driver pyodbc
+_OPCIONES_DRIVER = {"fast_executemany": True} if DATABASE_URL.startswith("mssql+pyodbc") else {}
+
+# 🔹 Tamaño, desborde y espera sólo los admite `QueuePool` (p. ej. SQLite en memoria usa `SingletonThreadPool`)
+_URL = make_url(DATABASE_URL)
+_OPCIONES_POOL = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+} if issubclass(_URL.get_dialect().get_pool_class(_URL), QueuePool) else {}
 
 # Crear el motor de SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=False, fast_executemany=True)
+engine = create_engine(
+    DATABASE_URL,
+    echo=False,
+    **_OPCIONES_DRIVER,
+    **_OPCIONES_POOL,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 # Crear sesión para interactuar con la base de datos
 SessionLocal = sessionmaker(bind=engine)
 
-# Función para obtener una sesión de base de datos
-def get_db():
+
+class _EstadisticasPool:
+    """Contadores de uso del pool para monitoreo (tiempo de espera por conexión y conexiones tomadas)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+    def registrar_espera(self, segundos):
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+
+
+_estadisticas = _EstadisticasPool()
+
+
+# 📌 Sesión con ciclo de vida explícito: la conexión vuelve al pool al salir del bloque
+@contextmanager
+def session_scope():
+    """
+    Abre una sesión y garantiza que se cierre (y la conexión vuelva al pool) al terminar.
+
+    Uso:
+        with session_scope() as db:
+            db.execute(...)
+    """
     db = SessionLocal()
     try:
+        # 🔹 Se toma la conexión del pool enseguida para medir cuánto hubo que esperar
+        inicio = time.perf_counter()
+        db.connection()
+        _estadisticas.registrar_espera(time.perf_counter() - inicio)
         yield db
     finally:
         db.close()
+
+
+def lotes_cursor(result, tamano=None):
+    """Lee un resultado de SQLAlchemy de a `tamano` filas (`fetchmany`) hasta agotarlo"""
+    tamano = tamano or DB_FETCH_SIZE
+    while True:
+        filas = result.fetchmany(tamano)
+        if not filas:
+            return
+        yield filas
+
+
+def estadisticas_pool():
+    """Estado actual del pool de conexiones y tiempos de espera acumulados"""
+    pool = engine.pool
+    with _estadisticas._lock:
+        checkouts = _estadisticas.checkouts
+        espera_total = _estadisticas.espera_total
+        espera_max = _estadisticas.espera_max
+
+    return {
+        "pool_size": _OPCIONES_POOL.get("pool_size"),
+        "max_overflow": _OPCIONES_POOL.get("max_overflow"),
+        "en_uso": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "disponibles": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow": max(0, pool.overflow()) if hasattr(pool, "overflow") else None,
+        "checkouts": checkouts,
+        "espera_promedio_ms": round(espera_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "espera_max_ms": round(espera_max * 1000, 3),
+    }
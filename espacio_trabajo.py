@@ -0,0 +1,23 @@
+import os
+import shutil
+import tempfile
+
+# 📌 Carpeta base para los directorios temporales (si no se define, se usa la del sistema)
+WORK_ROOT = os.getenv("WORK_ROOT") or None
+
+
+def crear_directorio_trabajo(prefijo):
+    """
+    Crea un directorio temporal exclusivo para una solicitud.
+
+    Cada llamada obtiene un directorio nuevo, así dos solicitudes simultáneas
+    (en el mismo worker o en workers distintos) nunca comparten archivos.
+    """
+    if WORK_ROOT:
+        os.makedirs(WORK_ROOT, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f"{prefijo}_", dir=WORK_ROOT)
+
+
+def eliminar_directorio(directorio):
+    """Elimina un directorio de trabajo y todo su contenido"""
+    shutil.rmtree(directorio, ignore_errors=True)
@@ -0,0 +1,533 @@
+"""
+Armado de los estados de cuenta en PDF, común a /upload y /comprobantes-con-saldo.
+
+El recorrido es siempre el mismo:
+
+    fuente -> EstadoCuenta por cliente -> iterar_pdfs (cache, paralelo) -> renderizar
+
+- Fuentes: `desde_libro` (export de movimientos subido a /upload) y `desde_saldos`
+  (vista `_DL_PBI_EstadoCtaCte_SaldoAcum`). Las dos normalizan el lote completo de una
+  sola vez y lo parten en un `EstadoCuenta` por cliente.
+- Diseños: "libro" (/upload: título fijo y la razón social en el encabezado) y "saldos"
+  (/comprobantes-con-saldo: título con la razón social y encabezado en cada parte).
+  Cada diseño conserva las reglas de su endpoint (qué es un remito y cómo se muestra
+  el saldo, ver `DISENOS`); las tablas y el motor de dibujo son los mismos.
+"""
+import io
+import os
+import re
+import logging
+from operator import itemgetter
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from reportlab.platypus import Paragraph, Spacer
+from plantilla_pdf import PlantillaEstadoCuenta, COLUMNAS_PDF, ANCHO_UTIL, elegir_renderer, validar_renderer, version_renderer
+from pdf_canvas import LienzoEstadoCuenta
+from formato import formatear_centavos, formatear_dias
+from movimientos import Movimientos, DIA_NULO, a_codigos
+from ingesta import leer_movimientos
+from cache_pdf import cache_pdf, huella
+from metricas import medir, capturar, registrar_tiempos
+from logs import ResumenLote
+
+logger = logging.getLogger(__name__)
+
+# 📌 Cantidad de procesos por defecto para el modo paralelo (por defecto, uno por núcleo)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 0)) or os.cpu_count() or 1
+
+# 📌 Reemplazos de tipo de comprobante (por prefijo, en orden de prioridad)
+COMPROBANTE_PATRONES = [
+    (r"^(?:FC A|XFC X)", "FC"),
+    (r"^(?:RC R|XRC)", "RC"),
+    (r"^(?:NC A|XNC X)", "NC"),
+    (r"^(?:NDA A|XND X)", "ND"),
+]
+_PATRONES = [(re.compile(patron), reemplazo) for patron, reemplazo in COMPROBANTE_PATRONES]
+_NUMERO_COMPROBANTE = re.compile(r"\d{6,}")
+
+# 📌 Plantillas de cada proceso del modo paralelo, por diseño (se arman al iniciar el proceso)
+_plantillas_proceso = {}
+
+
+class EstadoCuenta:
+    """
+    Estado de cuenta de un cliente: la representación común entre las fuentes y el renderer.
+
+    `movimientos` es una rebanada de los `Movimientos` del lote (vistas, sin copiar),
+    con los comprobantes ya abreviados. Las filas están ordenadas y partidas en dos:
+    la Parte 1 (deuda en Cta. Cte.) son las primeras `corte` filas y la Parte 2
+    (remitos pendientes de facturar) el resto.
+    """
+
+    __slots__ = ("clave", "razon_social", "movimientos", "corte")
+
+    def __init__(self, clave, razon_social, movimientos, corte):
+        self.clave = clave
+        self.razon_social = razon_social
+        self.movimientos = movimientos
+        self.corte = corte
+
+    @property
+    def deuda(self):
+        return self.movimientos[:self.corte]
+
+    @property
+    def remitos(self):
+        return self.movimientos[self.corte:]
+
+    @property
+    def nombre_archivo(self):
+        """Nombre del PDF: la razón social sin caracteres conflictivos"""
+        razon_social = self.razon_social or f"Cliente_{self.clave}"
+        return razon_social.replace("/", "_").replace("\\", "_").replace(" ", "_") + ".pdf"
+
+    def partes_huella(self):
+        """Bytes que identifican el contenido del PDF, para `cache_pdf.huella` (una parte por campo)"""
+        movimientos = self.movimientos
+        yield f"{self.razon_social}|{self.corte}".encode("utf-8", "surrogatepass")
+        for arreglo in (movimientos.femision, movimientos.vencimiento, movimientos.debe, movimientos.haber,
+                        movimientos.saldo, movimientos.subcentavos):
+            yield arreglo.tobytes()
+        for campo in ("comprobante", "condicion"):
+            yield "\x1f".join(map(str, movimientos.textos(campo).tolist())).encode("utf-8", "surrogatepass")
+
+
+# 📌 Normalización del lote
+
+def reemplazar_comprobantes(textos):
+    """Reemplaza tipos de comprobante con nombres más cortos (se aplica al vocabulario, no a cada fila)"""
+    resultado = []
+    for texto in textos:
+        texto = str(texto).strip()
+        for patron, reemplazo in _PATRONES:
+            texto = patron.sub(reemplazo, texto, count=1)
+        resultado.append(texto)
+    return np.array(resultado, dtype=object)
+
+
+def _numero_comprobante(texto):
+    encontrado = _NUMERO_COMPROBANTE.search(texto)
+    return float(encontrado.group()) if encontrado else np.nan
+
+
+def particionar(movimientos, cliente, claves, razones_sociales, diseno):
+    """
+    Normaliza y ordena todo el lote una sola vez, dejando cada cliente en un bloque contiguo.
+
+    Parámetros:
+    - movimientos (Movimientos): Movimientos del lote.
+    - cliente (array): Posición en `claves` del cliente de cada fila.
+    - claves (list): Clave de cada cliente (código o razón social), en el orden de salida.
+    - razones_sociales (list): Razón social de cada cliente, alineada con `claves`.
+    - diseno (str): Diseño del endpoint, define qué comprobantes van a la Parte 2 (ver `DISENOS`).
+
+    El orden resultante es: cliente, Parte 1 antes que Parte 2 (remitos), fecha de
+    emisión y número de comprobante. El ordenamiento es estable: ante igualdad
+    se respeta el orden de la fuente.
+
+    Retorna:
+    - Lista de `EstadoCuenta`, sin los clientes que no tienen movimientos.
+    """
+    # 🔹 Abreviatura, parte y número se calculan una vez por texto distinto y se reparten con los códigos
+    movimientos.comprobantes = reemplazar_comprobantes(movimientos.comprobantes)
+    es_remito = DISENOS[diseno]["remito"].search
+    remito = np.append([bool(es_remito(texto)) for texto in movimientos.comprobantes], False)[movimientos.comprobante]
+    numero = np.append([_numero_comprobante(texto) for texto in movimientos.comprobantes], np.nan)
+    fecha = np.where(movimientos.femision == DIA_NULO, np.iinfo(np.int32).max, movimientos.femision)
+    cliente = np.asarray(cliente, dtype=np.int64)
+
+    orden = np.lexsort((numero[movimientos.comprobante], fecha, remito, cliente))
+    movimientos = movimientos[orden]
+
+    # 📌 Cliente y parte combinados en una clave creciente para ubicar los cortes con búsqueda binaria
+    combinada = cliente[orden] * 2 + remito[orden]
+    posiciones = np.arange(len(claves), dtype=np.int64) * 2
+    inicios = np.searchsorted(combinada, posiciones)
+    cortes = np.searchsorted(combinada, posiciones + 1)
+    fines = np.searchsorted(combinada, posiciones + 2)
+
+    return [
+        EstadoCuenta(clave, razon_social, movimientos[inicio:fin], int(corte - inicio))
+        for clave, razon_social, inicio, corte, fin in zip(claves, razones_sociales, inicios, cortes, fines)
+        if fin > inicio
+    ]
+
+
+def _columnas_y_filas(datos):
+    """(nombres de columna, filas como tuplas) de un `ResultadoSaldo` o de una lista de diccionarios"""
+    if hasattr(datos, "columnas"):
+        return datos.columnas, datos.filas
+    columnas = tuple(datos[0])
+    return columnas, [tuple(registro.get(col) for col in columnas) for registro in datos]
+
+
+def _extraer(columnas, filas, nombres, destino):
+    """
+    Agrega a `destino[nombre]` los valores de cada columna pedida, sin armar un diccionario por fila.
+
+    Retorna la lista de columnas que faltan (los nombres se comparan sin distinguir mayúsculas).
+    """
+    indices = {col.lower(): i for i, col in enumerate(columnas)}
+    faltantes = [nombre for nombre in nombres if nombre.lower() not in indices]
+    if not faltantes:
+        for nombre in nombres:
+            destino[nombre].extend(map(itemgetter(indices[nombre.lower()]), filas))
+    return faltantes
+
+
+# 📌 Fuentes
+
+def desde_libro(archivo, razones_sociales_permitidas):
+    """
+    Estados de cuenta del export de movimientos que recibe /upload, uno por razón social.
+
+    Parámetros:
+    - archivo (str | file-like): Ruta al archivo (.xlsx, .csv o .parquet) o Excel ya abierto.
+    - razones_sociales_permitidas (list): Razones sociales a incluir.
+
+    Retorna:
+    - Lista de `EstadoCuenta` (clave = razón social), en el orden en que aparecen en el archivo.
+    """
+    if isinstance(archivo, str) and not os.path.exists(archivo):
+        raise FileNotFoundError(f"❌ Archivo no encontrado: {archivo}")
+
+    # 📌 Leer sólo las columnas necesarias de las razones sociales permitidas
+    df = leer_movimientos(archivo, razones_sociales_permitidas)
+    faltantes = [col for col in COLUMNAS_PDF if col not in df.columns]
+    if faltantes:
+        logger.error("❌ Las siguientes columnas faltan en el archivo: %s", faltantes)
+        return []
+
+    with medir("preparacion"):
+        movimientos = Movimientos.desde_columnas(*(df[col].to_numpy() for col in COLUMNAS_PDF))
+        cliente, razones_sociales = a_codigos(df["RazonSocial"].to_numpy())
+        return particionar(movimientos, cliente, razones_sociales, razones_sociales, "libro")
+
+
+def desde_saldos(saldos):
+    """
+    Estados de cuenta de `_DL_PBI_EstadoCtaCte_SaldoAcum` (ver `obtener_saldos_ultimos_30_dias`).
+
+    Parámetros:
+    - saldos (dict): {codigo_cliente: `ResultadoSaldo` o lista de registros}.
+
+    Retorna:
+    - Lista de `EstadoCuenta` (clave = código de cliente), en el mismo orden que `saldos`.
+      Los clientes sin movimientos se omiten.
+    """
+    with medir("preparacion"):
+        # 🔹 Las columnas del lote se arman directo desde las tuplas del cursor, sin diccionarios por fila
+        valores = {col: [] for col in COLUMNAS_PDF}
+        claves, razones_sociales, cantidades = [], [], []
+        for codigo, datos in saldos.items():
+            columnas, filas = _columnas_y_filas(datos) if datos else ((), [])
+            if not filas:
+                continue
+            faltantes = _extraer(columnas, filas, COLUMNAS_PDF, valores)
+            if faltantes:
+                logger.error("❌ Las siguientes columnas faltan en los datos del cliente %s: %s", codigo, faltantes)
+                continue
+            indice_razon = next((i for i, col in enumerate(columnas) if col.lower() == "razonsocial"), None)
+            claves.append(codigo)
+            razones_sociales.append(filas[0][indice_razon] if indice_razon is not None else None)
+            cantidades.append(len(filas))
+
+        if not claves:
+            return []
+        movimientos = Movimientos.desde_columnas(*(valores[col] for col in COLUMNAS_PDF))
+        cliente = np.repeat(np.arange(len(claves)), cantidades)
+        return particionar(movimientos, cliente, claves, razones_sociales, "saldos")
+
+
+# 📌 Diseños
+
+def plantilla_libro():
+    """Plantilla de los PDFs de /upload (columnas de igual ancho ocupando toda la página)"""
+    return PlantillaEstadoCuenta(
+        anchos=[ANCHO_UTIL / len(COLUMNAS_PDF)] * len(COLUMNAS_PDF),
+        titulo="Estado cuenta corriente (últimos 30 días)",
+        titulo_parte1="1 Deuda en Cta Cte",
+        titulo_parte2="2 Remitos pendientes de facturar - Valor estimado",
+    )
+
+
+def plantilla_saldos():
+    """Plantilla de los PDFs de /comprobantes-con-saldo (anchos fijos, título con la razón social)"""
+    return PlantillaEstadoCuenta(
+        anchos=[80, 120, 80, 80, 80, 80, 80],
+        titulo_parte1="<b>1. Deuda en Cta.Cte.</b>",
+        titulo_parte2="<b>2. Remitos pendientes de Facturar - Valor Estimado</b>",
+    )
+
+
+def _partes(plantilla, filas_deuda, filas_remitos):
+    """(título, filas, resaltar_saldo_final) de cada parte con movimientos"""
+    partes = [(plantilla.titulo_parte1, filas_deuda, True), (plantilla.titulo_parte2, filas_remitos, False)]
+    return [parte for parte in partes if parte[1]]
+
+
+def _bloques_libro(plantilla, estado, filas_deuda, filas_remitos):
+    """/upload: título fijo y la razón social en el encabezado de columnas"""
+    yield "texto", plantilla.fecha
+    yield "espacio", 12
+    yield "texto", plantilla.titulo
+    yield "espacio", 12
+    yield "encabezado", estado.razon_social
+    for titulo, filas, resaltar in _partes(plantilla, filas_deuda, filas_remitos):
+        yield "espacio", 24
+        yield "texto", titulo
+        yield "espacio", 12
+        yield "filas", filas, resaltar
+
+
+def _bloques_saldos(plantilla, estado, filas_deuda, filas_remitos):
+    """/comprobantes-con-saldo: título con la razón social y encabezado de columnas en cada parte"""
+    yield "texto", plantilla.fecha
+    yield "espacio", 12
+    yield "texto", f"Estado de Cuenta - {estado.razon_social}", plantilla.estilos["Title"]
+    yield "espacio", 12
+    for i, (titulo, filas, resaltar) in enumerate(_partes(plantilla, filas_deuda, filas_remitos)):
+        if i:
+            yield "espacio", 12
+        yield "texto", titulo
+        yield "espacio", 6
+        yield "encabezado",
+        yield "espacio", 6
+        yield "filas", filas, resaltar
+
+
+# 📌 Diseño de cada endpoint:
+# - plantilla / bloques: página del PDF; cada bloque es (método de `LienzoEstadoCuenta`, argumentos...),
+#   ver `_flowables` para Platypus.
+# - remito: comprobantes que van a la Parte 2 (ya abreviados, ver `reemplazar_comprobantes`).
+# - saldo_cero: texto del saldo cuando es 0; saldo_remitos: si el saldo se muestra en la Parte 2.
+DISENOS = {
+    "libro": {"plantilla": plantilla_libro, "bloques": _bloques_libro,
+              "remito": re.compile(r"RT R"), "saldo_cero": "", "saldo_remitos": True},
+    "saldos": {"plantilla": plantilla_saldos, "bloques": _bloques_saldos,
+               "remito": re.compile(r"^RT"), "saldo_cero": "0,00", "saldo_remitos": False},
+}
+
+
+def crear_plantilla(diseno):
+    return DISENOS[diseno]["plantilla"]()
+
+
+# 📌 Renderer
+
+def filas_movimientos(movimientos, saldo_cero="0,00", mostrar_saldo=True):
+    """
+    Filas de una tabla del PDF, formateando cada campo de una sola vez.
+
+    Fechas dd/mm/aaaa (vacías si faltan) e importes con separadores argentinos (vacíos
+    si son 0; "0,00" o "-0,00" si no llegan a medio centavo sin ser 0). El saldo muestra `saldo_cero` cuando es 0, o no se muestra con `mostrar_saldo=False`.
+    """
+    columnas = [
+        formatear_dias(movimientos.femision),
+        movimientos.textos("comprobante").tolist(),
+        formatear_dias(movimientos.vencimiento),
+        movimientos.textos("condicion").tolist(),
+        formatear_centavos(movimientos.debe, subcentavos=movimientos.subcentavos[:, 0]),
+        formatear_centavos(movimientos.haber, subcentavos=movimientos.subcentavos[:, 1]),
+        formatear_centavos(movimientos.saldo, vacio=saldo_cero, subcentavos=movimientos.subcentavos[:, 2])
+        if mostrar_saldo else [""] * len(movimientos),
+    ]
+    return [list(fila) for fila in zip(*columnas)]
+
+
+def filas_estado(estado, diseno):
+    """Filas ya formateadas de la Parte 1 y de la Parte 2 con las reglas del diseño, listas para `Table` o el canvas"""
+    reglas = DISENOS[diseno]
+    with medir("preparacion"):
+        return (filas_movimientos(estado.deuda, reglas["saldo_cero"]),
+                filas_movimientos(estado.remitos, reglas["saldo_cero"], mostrar_saldo=reglas["saldo_remitos"]))
+
+
+def _flowables(plantilla, bloques):
+    """Traduce los bloques de un diseño a flowables de Platypus"""
+    elementos = []
+    for tipo, *argumentos in bloques:
+        if tipo == "espacio":
+            elementos.append(Spacer(1, *argumentos))
+        elif tipo == "texto":
+            texto, estilo = (argumentos + [None])[:2]
+            elementos.append(Paragraph(texto, estilo) if estilo else texto)
+        elif tipo == "encabezado":
+            elementos.append(plantilla.tabla_encabezado_razon(*argumentos) if argumentos
+                             else plantilla.tabla_encabezado)
+        else:
+            elementos.append(plantilla.tabla_datos(*argumentos))
+    return elementos
+
+
+def renderizar(estado, diseno, plantilla=None, renderer=None):
+    """
+    Genera en memoria el PDF de un estado de cuenta.
+
+    Se define a nivel de módulo para poder ejecutarse en un `ProcessPoolExecutor`.
+    `plantilla` es la del lote (ver `crear_plantilla`); si no se indica se usa la del
+    proceso o se arma una nueva. `renderer` es "platypus", "canvas" o "auto"
+    (por defecto `PDF_RENDERER`).
+
+    Retorna:
+    - Tupla (nombre_archivo, bytes_pdf).
+    """
+    filas_deuda, filas_remitos = filas_estado(estado, diseno)
+    plantilla = plantilla or _plantillas_proceso.get(diseno) or crear_plantilla(diseno)
+    bloques = DISENOS[diseno]["bloques"](plantilla, estado, filas_deuda, filas_remitos)
+
+    buffer = io.BytesIO()
+    # 📌 Clientes con muchas filas: dibujar directo sobre el canvas, sin medir cada celda
+    if elegir_renderer(renderer, len(filas_deuda) + len(filas_remitos)) == "canvas":
+        with medir("pdf"):
+            lienzo = LienzoEstadoCuenta(buffer, plantilla)
+            for tipo, *argumentos in bloques:
+                getattr(lienzo, tipo)(*argumentos)
+            lienzo.cerrar()
+    else:
+        plantilla.construir(buffer, _flowables(plantilla, bloques))
+    return estado.nombre_archivo, buffer.getvalue()
+
+
+def _iniciar_proceso(diseno):
+    _plantillas_proceso[diseno] = crear_plantilla(diseno)
+
+
+def _renderizar_con_tiempos(estado, diseno, renderer):
+    """`renderizar` para un proceso hijo: devuelve también sus tiempos por etapa"""
+    with capturar() as tiempos:
+        resultado = renderizar(estado, diseno, renderer=renderer)
+    return resultado, tiempos
+
+
+def _clave_cache(estado, version):
+    return huella(estado.clave, version, estado.partes_huella()) if cache_pdf.habilitado else None
+
+
+def _pdf_cacheado(clave, estado):
+    """PDF ya renderizado para `clave` como (nombre_archivo, bytes_pdf), o None"""
+    contenido = cache_pdf.obtener(clave) if clave else None
+    return (estado.nombre_archivo, contenido) if contenido is not None else None
+
+
+def iterar_pdfs(estados, diseno, paralelo=False, max_workers=None, progreso=None, renderer=None, errores=None):
+    """
+    Genera en memoria el PDF de cada estado de cuenta, en el mismo orden que `estados`.
+
+    Parámetros:
+    - estados (list): `EstadoCuenta` de alguna de las fuentes (`desde_libro`, `desde_saldos`).
+    - diseno (str): "libro" o "saldos" (ver `DISENOS`).
+    - paralelo (bool): Si es True, reparte los clientes en un `ProcessPoolExecutor`.
+    - max_workers (int): Cantidad de procesos del modo paralelo (por defecto `PDF_WORKERS`).
+    - progreso (callable): Opcional, se llama con (procesados, total) a medida que avanza.
+    - renderer (str): "platypus", "canvas" o "auto" (por defecto `PDF_RENDERER`).
+    - errores (list): Opcional, se le agrega {"cliente": clave, "error": mensaje} por cada
+      cliente cuyo PDF no se pudo generar.
+
+    Retorna:
+    - Generador de tuplas (nombre_archivo, bytes_pdf). Cada PDF se entrega apenas
+      está listo. Un cliente que falla se informa en `errores` y se omite sin cortar
+      el lote. Si el pool de procesos se rompe (p. ej. un proceso hijo muere), los
+      clientes pendientes se renderizan en este proceso.
+
+    Los clientes cuyos movimientos no cambiaron desde el último lote (misma huella,
+    ver `cache_pdf.huella`) se toman de `cache_pdf` sin volver a renderizarse.
+    """
+    renderer = validar_renderer(renderer)
+    version = f"{version_renderer(renderer)}-{diseno}"
+    total = len(estados)
+    errores = [] if errores is None else errores
+    resumen = ResumenLote(logger, f"pdfs_{diseno}", clientes=total,
+                          movimientos=sum(len(estado.movimientos) for estado in estados),
+                          pdfs=0, cache=0, errores=0, renderer=renderer, paralelo=bool(paralelo))
+    plantilla = None  # 🔹 Una sola plantilla para los PDFs que se renderizan en este proceso, armada si hace falta
+
+    def en_este_proceso(estado):
+        nonlocal plantilla
+        plantilla = plantilla or crear_plantilla(diseno)
+        return renderizar(estado, diseno, plantilla, renderer)
+
+    def abandonar_pool(executor, error):
+        # 🔹 Un proceso hijo murió (p. ej. por falta de memoria): los pendientes se renderizan en este proceso
+        logger.warning("⚠️ El pool de procesos se rompió (%s): se sigue en este proceso", error)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    executor = None
+    try:
+        if paralelo:
+            executor = ProcessPoolExecutor(max_workers=max_workers or PDF_WORKERS, initializer=_iniciar_proceso,
+                                           initargs=(diseno,))
+
+        # 🔹 Sólo se envían a los procesos los clientes que cambiaron; el resto se lee del cache al entregarlo
+        pendientes = []
+        for estado in estados:
+            clave = _clave_cache(estado, version)
+            futuro = None
+            if executor and not (clave and cache_pdf.contiene(clave)):
+                try:
+                    futuro = executor.submit(_renderizar_con_tiempos, estado, diseno, renderer)
+                except BrokenProcessPool as e:
+                    abandonar_pool(executor, e)
+                    executor = None
+            pendientes.append((estado, clave, futuro))
+
+        for procesados, (estado, clave, futuro) in enumerate(pendientes, start=1):
+            try:
+                resultado = _pdf_cacheado(clave, estado) if futuro is None else None
+                if resultado:
+                    resumen.sumar("cache")
+                else:
+                    if futuro and executor:
+                        try:
+                            # 🔹 Lo medido en el proceso hijo se suma a las métricas de este proceso
+                            resultado, tiempos = futuro.result()
+                            registrar_tiempos(tiempos)
+                        except BrokenProcessPool as e:
+                            abandonar_pool(executor, e)
+                            executor = None
+                    # 🔹 Sin futuro y sin PDF (modo serie, o un worker lo desalojó recién del cache): se renderiza acá
+                    if resultado is None:
+                        resultado = en_este_proceso(estado)
+                    if clave:
+                        cache_pdf.guardar(clave, resultado[1])
+            except Exception as e:
+                errores.append({"cliente": estado.clave, "error": str(e)})
+                resumen.sumar("errores")
+                logger.error("❌ Error generando el PDF del cliente %s: %s", estado.clave, e)
+                continue
+            finally:
+                if progreso:
+                    progreso(procesados, total)
+            resumen.sumar("pdfs")
+            yield resultado
+    finally:
+        # 🔹 Si el consumidor corta la iteración (p. ej. el cliente HTTP se desconecta), no seguir renderizando
+        if executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    resumen.registrar()
+    if errores:
+        logger.warning("⚠️ %d clientes no pudieron procesarse: %s", len(errores),
+                       [error["cliente"] for error in errores])
+
+
+def guardar_pdfs(pdfs, pdf_directory):
+    """
+    Escribe en `pdf_directory` los PDFs de `iterar_pdfs` a medida que se generan.
+
+    Retorna:
+    - Lista de rutas de los PDFs generados, en el mismo orden.
+    """
+    os.makedirs(pdf_directory, exist_ok=True)
+
+    pdf_files = []
+    for pdf_name, contenido in pdfs:
+        pdf_file = os.path.join(pdf_directory, pdf_name)
+        with open(pdf_file, "wb") as f:
+            f.write(contenido)
+        logger.debug("✅ PDF generado: %s", pdf_file)
+        pdf_files.append(pdf_file)
+
+    logger.info("🎉 Proceso finalizado: %d PDFs generados en %s", len(pdf_files), pdf_directory)
+    return pdf_files
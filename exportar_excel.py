@@ -0,0 +1,84 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+import xlsxwriter
+
+FORMATO_FECHA = "dd/mm/yyyy"
+FORMATO_DINERO = "#,##0.00"
+
+_CARACTERES_INVALIDOS_HOJA = re.compile(r"[\[\]:*?/\\]")
+
+
+def exportar_excel(destino, hojas, tmpdir=None):
+    """
+    Escribe un Excel en modo `constant_memory`: cada fila se vuelca a disco apenas
+    se escribe, así la memoria no crece con la cantidad de movimientos.
+
+    Parámetros:
+    - destino (str): Ruta del .xlsx a generar.
+    - hojas (iterable): Tuplas (nombre_hoja, columnas, lotes), donde `lotes` es un
+      iterable de listas de filas (p. ej. `database.lotes_cursor(result)`).
+    - tmpdir (str): Directorio para los temporales de xlsxwriter.
+
+    Las fechas y los importes se escriben como tipos de Excel (fecha y número con
+    formato), no como texto.
+
+    Retorna:
+    - Cantidad de hojas escritas.
+    """
+    opciones = {"constant_memory": True}
+    if tmpdir:
+        opciones["tmpdir"] = tmpdir
+
+    workbook = xlsxwriter.Workbook(destino, opciones)
+    formatos = {
+        "fecha": workbook.add_format({"num_format": FORMATO_FECHA}),
+        "dinero": workbook.add_format({"num_format": FORMATO_DINERO}),
+    }
+    encabezado = workbook.add_format({"bold": True})
+    nombres_usados = set()
+    cantidad = 0
+
+    try:
+        for nombre_hoja, columnas, lotes in hojas:
+            worksheet = workbook.add_worksheet(_nombre_hoja(nombre_hoja, nombres_usados))
+            worksheet.write_row(0, 0, columnas, encabezado)
+
+            row_num = 1
+            tipos_definidos = False
+            for filas in lotes:
+                if not tipos_definidos:
+                    # 🔹 El formato de cada columna se decide con el primer lote (antes de escribirlo)
+                    _formatear_columnas(worksheet, columnas, filas, formatos)
+                    tipos_definidos = True
+                for fila in filas:
+                    worksheet.write_row(row_num, 0, fila)
+                    row_num += 1
+
+            cantidad += 1
+    finally:
+        workbook.close()
+
+    return cantidad
+
+
+def _formatear_columnas(worksheet, columnas, filas, formatos):
+    """Asigna formato de fecha o de dinero a cada columna según el tipo de sus valores"""
+    for col_num in range(len(columnas)):
+        valor = next((fila[col_num] for fila in filas if fila[col_num] is not None), None)
+        if isinstance(valor, (datetime, date)):
+            worksheet.set_column(col_num, col_num, 12, formatos["fecha"])
+        elif isinstance(valor, (Decimal, float)):
+            worksheet.set_column(col_num, col_num, 14, formatos["dinero"])
+
+
+def _nombre_hoja(nombre, usados):
+    """Nombre de hoja válido para Excel (máx. 31 caracteres, sin []:*?/\\ y sin repetir)"""
+    base = _CARACTERES_INVALIDOS_HOJA.sub("_", str(nombre)).strip("'")[:31] or "Hoja"
+    nombre_hoja = base
+    sufijo = 2
+    while nombre_hoja.lower() in usados:
+        nombre_hoja = f"{base[:31 - len(str(sufijo)) - 1]}_{sufijo}"
+        sufijo += 1
+    usados.add(nombre_hoja.lower())
+    return nombre_hoja
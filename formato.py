@@ -0,0 +1,45 @@
+import numpy as np
+
+# 📌 Importes con dos decimales y "_" como separador de miles, que después pasa a "." (1.234.567,89)
+_FORMATO_MONEDA = "{:_.2f}".format
+
+
+def formatear_centavos(centavos, vacio="", subcentavos=None):
+    """
+    Formatea una columna entera de importes en centavos (int64, ver `movimientos`) con separadores argentinos.
+
+    Parámetros:
+    - centavos (array): Importes en centavos.
+    - vacio (str): Texto para los importes iguales a 0 (los nulos llegan como 0).
+    - subcentavos (array): Opcional, signo de los importes que redondean a 0 sin ser 0
+      (`Movimientos.subcentavos`): se muestran "0,00" o "-0,00" en lugar de `vacio`.
+
+    Retorna:
+    - Lista de str, en el mismo orden que `centavos`.
+
+    🔹 Los separadores se cambian con dos `replace` sobre toda la columna unida en un
+    solo texto, en lugar de formatear celda por celda.
+    """
+    resultado = np.full(len(centavos), vacio, dtype=object)
+    if subcentavos is not None:
+        resultado[subcentavos > 0] = "0,00"
+        resultado[subcentavos < 0] = "-0,00"
+    llenos = centavos != 0
+    if llenos.any():
+        texto = "\n".join(map(_FORMATO_MONEDA, (centavos[llenos] / 100).tolist()))
+        resultado[llenos] = texto.replace(".", ",").replace("_", ".").split("\n")
+    return resultado.tolist()
+
+
+def formatear_dias(dias, vacio=""):
+    """
+    Formatea fechas en días desde 1970-01-01 (int32, ver `movimientos`) como dd/mm/aaaa.
+
+    🔹 Un estado de cuenta tiene pocas fechas distintas: cada día distinto se formatea
+    una sola vez y se reparte con los índices de `np.unique`.
+    """
+    unicos, inversa = np.unique(dias, return_inverse=True)
+    iso = unicos.astype("datetime64[D]").astype(str).tolist()  # 🔹 "aaaa-mm-dd"
+    textos = np.array([f"{d[8:10]}/{d[5:7]}/{d[:4]}" for d in iso], dtype=object)
+    textos[unicos == np.iinfo(np.int32).min] = vacio
+    return textos[inversa].tolist()
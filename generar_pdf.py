@@ -95,36 +95,37 @@ def generar_pdf(datos, nombre_archivo):
     c.save()
     print(f"PDF generado correctamente: {nombre_archivo}")
 
-# 📌 Ejemplo de uso con los datos de prueba
-datos_prueba = {
-    "Razon Social": "VIGLIETTI CARLOS JAVIER",
-    "Crédito a favor (Total_Loc negativos)": -1846000,
-    "Total vencidos": 4165000,
-    "Total a vencer": 0,
-    "Total global": 2319000,
-    "Negativos": [
-        {
-            "Fecha": "2025-01-17T00:00:00.000Z",
-            "Fecha_vto": "2025-01-17T00:00:00.000Z",
-            "Comp_Nro": "00125077",
-            "Comp_tipo": "RC",
-            "CondVta": "6 Días",
-            "Total_Loc": -1930000,
-            "Saldo_Loc": -1846000,
-        }
-    ],
-    "Vencidos": [
-        {
-            "Fecha": "2025-01-21T00:00:00.000Z",
-            "Fecha_vto": "2025-01-21T00:00:00.000Z",
-            "Comp_Nro": "00045152",
-            "Comp_tipo": "XFC",
-            "CondVta": "6 Días",
-            "Total_Loc": 824000,
-            "Saldo_Loc": 824000,
-        }
-    ],
-}
-
-# 📌 Generar PDF de prueba
-generar_pdf(datos_prueba, "estado_cuenta.pdf")
+# 📌 Ejemplo de uso con los datos de prueba (sólo al ejecutar `python generar_pdf.py`, nunca al importar)
+if __name__ == "__main__":
+    datos_prueba = {
+        "Razon Social": "VIGLIETTI CARLOS JAVIER",
+        "Crédito a favor (Total_Loc negativos)": -1846000,
+        "Total vencidos": 4165000,
+        "Total a vencer": 0,
+        "Total global": 2319000,
+        "Negativos": [
+            {
+                "Fecha": "2025-01-17T00:00:00.000Z",
+                "Fecha_vto": "2025-01-17T00:00:00.000Z",
+                "Comp_Nro": "00125077",
+                "Comp_tipo": "RC",
+                "CondVta": "6 Días",
+                "Total_Loc": -1930000,
+                "Saldo_Loc": -1846000,
+            }
+        ],
+        "Vencidos": [
+            {
+                "Fecha": "2025-01-21T00:00:00.000Z",
+                "Fecha_vto": "2025-01-21T00:00:00.000Z",
+                "Comp_Nro": "00045152",
+                "Comp_tipo": "XFC",
+                "CondVta": "6 Días",
+                "Total_Loc": 824000,
+                "Saldo_Loc": 824000,
+            }
+        ],
+    }
+
+    # 📌 Generar PDF de prueba
+    generar_pdf(datos_prueba, "estado_cuenta.pdf")
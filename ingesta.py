@@ -0,0 +1,132 @@
+import os
+
+# 🔹 pandas se importa dentro de cada lector: `routes` usa las constantes de este módulo
+#    y así el arranque de la app no carga pandas hasta la primera subida
+
+# 📌 Columnas que usa la generación de PDFs (el resto del export se descarta al leer)
+COLUMNAS_MOVIMIENTOS = ["RazonSocial", "Femision", "ComprobanteNro", "FechaVto", "CondVta",
+                        "Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+COLUMNAS_TEXTO = ["RazonSocial", "ComprobanteNro", "CondVta"]
+COLUMNAS_DINERO = ["Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+# 🔹 Las fechas en texto quedan como texto: las interpreta `movimientos.a_dias` (dd/mm/aaaa)
+COLUMNAS_FECHA = ["Femision", "FechaVto"]
+
+# 📌 Lector de Excel: "streaming" recorre las filas con openpyxl en modo sólo lectura y
+#    descarta lo que no se usa; "pandas" usa `pd.read_excel` sólo con las columnas necesarias
+EXCEL_LECTOR = os.getenv("EXCEL_LECTOR", "streaming").lower()
+
+# 📌 Formatos de archivo aceptados para el export de movimientos
+EXTENSIONES_SOPORTADAS = {"xlsx", "csv", "parquet"}
+
+CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", 50000))
+
+
+def leer_movimientos(archivo, razones_sociales):
+    """
+    Lee el export de movimientos quedándose sólo con las columnas necesarias
+    y las filas de las razones sociales pedidas.
+
+    Parámetros:
+    - archivo (str | file-like): Ruta al archivo (.xlsx, .csv o .parquet) o Excel ya abierto.
+    - razones_sociales (list): Razones sociales a conservar.
+
+    Retorna:
+    - DataFrame con las columnas de `COLUMNAS_MOVIMIENTOS` presentes en el archivo,
+      en el orden original de las filas.
+    """
+    import pandas as pd
+
+    razones = set(razones_sociales)
+    extension = _extension(archivo)
+
+    if extension == "csv":
+        df = _leer_csv(archivo, razones)
+    elif extension == "parquet":
+        df = _leer_parquet(archivo, razones)
+    elif EXCEL_LECTOR == "pandas":
+        df = pd.read_excel(archivo, usecols=lambda col: col in COLUMNAS_MOVIMIENTOS,
+                           dtype={col: str for col in COLUMNAS_TEXTO})
+        df = df[df["RazonSocial"].isin(razones)]
+    else:
+        df = _leer_excel_streaming(archivo, razones)
+
+    return _aplicar_tipos(df)
+
+
+def _extension(archivo):
+    if isinstance(archivo, str) and "." in archivo:
+        return archivo.rsplit(".", 1)[1].lower()
+    return "xlsx"
+
+
+def _aplicar_tipos(df):
+    """Fija tipos explícitos: dinero como float64 y textos como str (los nulos se mantienen)"""
+    import pandas as pd
+
+    df = df[[col for col in COLUMNAS_MOVIMIENTOS if col in df.columns]]
+    for col in COLUMNAS_DINERO:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    for col in COLUMNAS_TEXTO:
+        if col in df.columns:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df.reset_index(drop=True)
+
+
+def _leer_excel_streaming(archivo, razones):
+    """Recorre la primera hoja fila por fila sin cargar el libro completo en memoria"""
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, None) or ()
+
+        indices = {col: i for i, col in enumerate(encabezado) if col in COLUMNAS_MOVIMIENTOS}
+        if "RazonSocial" not in indices:
+            raise ValueError("❌ El archivo no tiene la columna 'RazonSocial'.")
+
+        columnas = [col for col in COLUMNAS_MOVIMIENTOS if col in indices]
+        datos = {col: [] for col in columnas}
+        indice_razon = indices["RazonSocial"]
+
+        for fila in filas:
+            if indice_razon >= len(fila) or fila[indice_razon] not in razones:
+                continue
+            for col in columnas:
+                i = indices[col]
+                valor = fila[i] if i < len(fila) else None
+                datos[col].append(None if valor == "" else valor)  # 🔹 Igual que pandas: celda vacía = nulo
+    finally:
+        libro.close()
+
+    return pd.DataFrame(datos, columns=columnas)
+
+
+def _leer_csv(archivo, razones):
+    """Lee el CSV por bloques y filtra cada bloque antes de acumularlo"""
+    import pandas as pd
+
+    bloques = pd.read_csv(archivo, usecols=lambda col: col in COLUMNAS_MOVIMIENTOS,
+                          dtype={col: str for col in COLUMNAS_TEXTO + COLUMNAS_FECHA}, chunksize=CSV_CHUNK_SIZE)
+    filtrados = [bloque[bloque["RazonSocial"].isin(razones)] for bloque in bloques]
+    if not filtrados:
+        return pd.DataFrame(columns=COLUMNAS_MOVIMIENTOS)
+    return pd.concat(filtrados, ignore_index=True)
+
+
+def _leer_parquet(archivo, razones):
+    """Lee sólo las columnas necesarias y filtra las razones sociales al leer (requiere pyarrow)"""
+    import pandas as pd
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("❌ Para subir archivos .parquet el servidor necesita el paquete 'pyarrow'.")
+
+    columnas_archivo = pq.read_schema(archivo).names
+    columnas = [col for col in COLUMNAS_MOVIMIENTOS if col in columnas_archivo]
+    if not razones:
+        return pd.DataFrame(columns=columnas)
+    tabla = pq.read_table(archivo, columns=columnas, filters=[("RazonSocial", "in", list(razones))])
+    return tabla.to_pandas()
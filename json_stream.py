@@ -0,0 +1,88 @@
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from json.encoder import encode_basestring
+
+# 📌 Serialización de filas a JSON sin armar un diccionario por fila:
+#    las claves se codifican una sola vez y cada valor se codifica según su tipo
+
+
+def _decimal(valor):
+    return str(valor) if valor.is_finite() else "null"
+
+
+def _float(valor):
+    return repr(valor) if math.isfinite(valor) else "null"
+
+
+def _fecha(valor):
+    return f'"{valor.isoformat()}"'
+
+
+def _generico(valor):
+    return json.dumps(valor, ensure_ascii=False, default=str)
+
+
+_CODIFICADORES = {
+    str: encode_basestring,
+    int: int.__repr__,
+    float: _float,
+    Decimal: _decimal,  # 🔹 Como número JSON, sin perder decimales
+    datetime: _fecha,  # 🔹 ISO 8601
+    date: _fecha,
+    time: _fecha,
+    bool: lambda valor: "true" if valor else "false",
+    type(None): lambda valor: "null",
+}
+
+
+def codificador_filas(columnas):
+    """
+    Retorna una función que convierte una fila (tupla de valores en el orden de
+    `columnas`) en el texto JSON del objeto {columna: valor}.
+
+    Si la fila trae más valores que columnas, los sobrantes se ignoran.
+    """
+    prefijos = [("{" if i == 0 else ",") + encode_basestring(col) + ":" for i, col in enumerate(columnas)]
+    codificadores = _CODIFICADORES
+
+    def codificar(fila):
+        partes = [prefijo + codificadores.get(valor.__class__, _generico)(valor)
+                  for prefijo, valor in zip(prefijos, fila)]
+        return "".join(partes) + "}" if partes else "{}"
+
+    return codificar
+
+
+def generar_ndjson(codificar, lotes, final=None):
+    """
+    Genera NDJSON (un objeto JSON por línea), un bloque por lote de filas.
+
+    `final` es opcional: función sin argumentos que se llama al terminar y
+    puede devolver un diccionario a agregar como última línea.
+    """
+    for filas in lotes:
+        yield ("\n".join(map(codificar, filas)) + "\n").encode("utf-8")
+
+    extra = final() if final else None
+    if extra is not None:
+        yield (_generico(extra) + "\n").encode("utf-8")
+
+
+def generar_json(codificar, lotes, final=None):
+    """
+    Genera `{"datos": [...]}` en bloques, un bloque por lote de filas.
+
+    `final` es opcional: función sin argumentos que se llama al terminar y
+    devuelve claves extra para el objeto (p. ej. el cursor de la página siguiente).
+    """
+    yield b'{"datos":['
+    separador = ""
+    for filas in lotes:
+        yield (separador + ",".join(map(codificar, filas))).encode("utf-8")
+        separador = ","
+
+    extra = final() if final else None
+    cola = "".join(f",{encode_basestring(clave)}:{_generico(valor)}" for clave, valor in (extra or {}).items())
+    yield f"]{cola}}}".encode("utf-8")
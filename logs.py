@@ -0,0 +1,82 @@
+import os
+import json
+import time
+import logging
+
+# 📌 Nivel de los logs (DEBUG, INFO, WARNING, ERROR); en producción INFO no registra nada por fila ni por cliente
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# 📌 "texto" (una línea legible) o "json" (un objeto por línea, con los campos de los resúmenes por separado)
+LOG_FORMATO = os.getenv("LOG_FORMATO", "texto").lower()
+
+FORMATO_TEXTO = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+# 🔹 Atributos que trae todo LogRecord: el resto vino por `extra=` y se exporta como campo propio
+_ATRIBUTOS_REGISTRO = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: fecha, nivel, logger, mensaje y los campos recibidos en `extra`"""
+
+    def format(self, record):
+        datos = {
+            "fecha": self.formatTime(record),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensaje": record.getMessage(),
+        }
+        datos.update({clave: valor for clave, valor in vars(record).items() if clave not in _ATRIBUTOS_REGISTRO})
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+def configurar_logs(nivel=None, formato=None):
+    """
+    Configura el logger raíz con el nivel y el formato de las variables de entorno.
+
+    Se llama una vez desde `app.py`. Si el servidor (gunicorn) ya configuró handlers,
+    sólo se ajusta el nivel y el formato de los existentes.
+    """
+    nivel = (nivel or LOG_LEVEL).upper()
+    formato = (formato or LOG_FORMATO).lower()
+    formateador = FormatoJSON() if formato == "json" else logging.Formatter(FORMATO_TEXTO)
+
+    raiz = logging.getLogger()
+    if not raiz.handlers:
+        raiz.addHandler(logging.StreamHandler())
+    for handler in raiz.handlers:
+        handler.setFormatter(formateador)
+    raiz.setLevel(getattr(logging, nivel, logging.INFO))
+
+
+class ResumenLote:
+    """
+    Contadores de un lote (PDFs, clientes, errores...) que se registran en un solo log al terminar.
+
+    Reemplaza los mensajes por cliente: el lote completo deja una línea en INFO, y el
+    detalle por cliente queda en DEBUG. Con `LOG_FORMATO=json` los contadores van en
+    el campo "lote".
+
+    Uso:
+        resumen = ResumenLote(logger, "pdfs_excel", razones=len(razones))
+        resumen.sumar("pdfs")
+        resumen.registrar()
+    """
+
+    def __init__(self, logger, operacion, **campos):
+        self.logger = logger
+        self.operacion = operacion
+        self.campos = dict(campos)
+        self._inicio = time.perf_counter()
+
+    def sumar(self, campo, cantidad=1):
+        self.campos[campo] = self.campos.get(campo, 0) + cantidad
+
+    def registrar(self, nivel=logging.INFO):
+        if not self.logger.isEnabledFor(nivel):
+            return
+        campos = {**self.campos, "segundos": round(time.perf_counter() - self._inicio, 3)}
+        self.logger.log(nivel, "📦 %s: %s", self.operacion,
+                         ", ".join(f"{clave}={valor}" for clave, valor in campos.items()),
+                         extra={"lote": {"operacion": self.operacion, **campos}})
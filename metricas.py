@@ -0,0 +1,165 @@
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# 📌 Medición de etapas (SQL, preparación de datos, PDF, ZIP): se puede apagar sin tocar el código
+METRICAS_HABILITADAS = os.getenv("METRICAS_HABILITADAS", "true").lower() in ("1", "true", "si", "yes")
+
+# 📌 Límites (en segundos) de los histogramas
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+ETAPAS = "estado_cuenta_etapa_segundos"
+SOLICITUDES = "estado_cuenta_solicitud_segundos"
+
+_DESCRIPCIONES = {
+    ETAPAS: "Duración de cada etapa del armado de estados de cuenta (sql, preparacion, pdf, zip)",
+    SOLICITUDES: "Duración de las solicitudes HTTP hasta devolver la respuesta (sin el envío en streaming)",
+}
+
+# 🔹 Mediciones (etapa, segundos) de la solicitud (o captura) en curso; None fuera de una solicitud
+_tiempos_actuales = ContextVar("tiempos_etapas", default=None)
+
+
+class Histograma:
+    """Histograma acumulativo al estilo Prometheus (conteo por límite, suma y cantidad)"""
+
+    __slots__ = ("conteos", "suma", "cantidad")
+
+    def __init__(self):
+        self.conteos = [0] * (len(LIMITES_SEGUNDOS) + 1)  # 🔹 El último es +Inf
+        self.suma = 0.0
+        self.cantidad = 0
+
+    def observar(self, valor):
+        self.conteos[bisect.bisect_left(LIMITES_SEGUNDOS, valor)] += 1
+        self.suma += valor
+        self.cantidad += 1
+
+
+class RegistroMetricas:
+    """
+    Histogramas del proceso, indexados por (métrica, etiqueta).
+
+    Observar cuesta una búsqueda binaria y tres sumas bajo un lock: se puede dejar
+    encendido en producción. Con varios workers de gunicorn cada proceso tiene los suyos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas = {}
+
+    def observar(self, metrica, etiqueta, valor):
+        with self._lock:
+            histograma = self._histogramas.get((metrica, etiqueta))
+            if histograma is None:
+                histograma = self._histogramas[(metrica, etiqueta)] = Histograma()
+            histograma.observar(valor)
+
+    def sumas(self, metrica=ETAPAS):
+        """Segundos acumulados por etiqueta de `metrica` (por ejemplo {"sql": 0.4, "pdf": 3.1})"""
+        with self._lock:
+            return {etiqueta: h.suma for (nombre, etiqueta), h in self._histogramas.items() if nombre == metrica}
+
+    def exportar(self):
+        """Texto en el formato de exposición de Prometheus (version 0.0.4)"""
+        with self._lock:
+            copia = {
+                clave: (list(h.conteos), h.suma, h.cantidad) for clave, h in self._histogramas.items()
+            }
+
+        lineas = []
+        for metrica, descripcion in _DESCRIPCIONES.items():
+            lineas.append(f"# HELP {metrica} {descripcion}")
+            lineas.append(f"# TYPE {metrica} histogram")
+            nombre_etiqueta = "etapa" if metrica == ETAPAS else "endpoint"
+            for (nombre, etiqueta), (conteos, suma, cantidad) in sorted(copia.items()):
+                if nombre != metrica:
+                    continue
+                etiqueta = f'{nombre_etiqueta}="{_escapar(etiqueta)}"'
+                acumulado = 0
+                for limite, conteo in zip(LIMITES_SEGUNDOS + ("+Inf",), conteos):
+                    acumulado += conteo
+                    lineas.append(f'{metrica}_bucket{{{etiqueta},le="{limite}"}} {acumulado}')
+                lineas.append(f"{metrica}_sum{{{etiqueta}}} {suma:.6f}")
+                lineas.append(f"{metrica}_count{{{etiqueta}}} {cantidad}")
+        return "\n".join(lineas) + "\n"
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# 📌 Registro compartido por todo el proceso
+registro = RegistroMetricas()
+
+
+def registrar(etapa, segundos):
+    """Suma una duración al histograma de `etapa` y a los tiempos de la solicitud en curso"""
+    registro.observar(ETAPAS, etapa, segundos)
+    tiempos = _tiempos_actuales.get()
+    if tiempos is not None:
+        tiempos.append((etapa, segundos))
+
+
+@contextmanager
+def medir(etapa):
+    """Mide el bloque `with` como una ocurrencia de `etapa`"""
+    if not METRICAS_HABILITADAS:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar(etapa, time.perf_counter() - inicio)
+
+
+@contextmanager
+def capturar():
+    """
+    Junta en una lista de (etapa, segundos) lo medido dentro del bloque.
+
+    Sirve para devolver los tiempos de un proceso hijo (`ProcessPoolExecutor`) y
+    registrarlos en el proceso principal con `registrar_tiempos`.
+    """
+    tiempos = []
+    token = _tiempos_actuales.set(tiempos)
+    try:
+        yield tiempos
+    finally:
+        _tiempos_actuales.reset(token)
+
+
+def registrar_tiempos(tiempos):
+    for etapa, segundos in tiempos:
+        registrar(etapa, segundos)
+
+
+# 📌 Resumen por solicitud (encabezado Server-Timing)
+
+def iniciar_solicitud():
+    """Empieza a juntar los tiempos de la solicitud actual; retorna el estado para `finalizar_solicitud`"""
+    return time.perf_counter(), _tiempos_actuales.set([])
+
+
+def finalizar_solicitud(estado, endpoint):
+    """
+    Registra la duración de la solicitud y arma el valor del encabezado `Server-Timing`.
+
+    🔹 En las respuestas en streaming sólo entra lo medido antes de empezar a enviar
+    (por ejemplo las consultas y el primer PDF); el resto queda en los histogramas.
+    """
+    inicio, token = estado
+    total = time.perf_counter() - inicio
+    por_etapa = {}
+    for etapa, segundos in _tiempos_actuales.get() or ():
+        por_etapa[etapa] = por_etapa.get(etapa, 0.0) + segundos
+    _tiempos_actuales.reset(token)
+    registro.observar(SOLICITUDES, endpoint or "desconocido", total)
+
+    partes = [f"{etapa};dur={segundos * 1000:.1f}" for etapa, segundos in por_etapa.items()]
+    partes.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(partes)
@@ -0,0 +1,171 @@
+"""
+Modelo compacto de los movimientos de cuenta corriente: una columna tipada por campo.
+
+En lugar de un diccionario o una fila de DataFrame por movimiento, cada campo es un
+arreglo de numpy:
+
+- Fechas: días desde 1970-01-01 (int32, `DIA_NULO` si falta).
+- Importes: centavos (int64); nulo y 0 se guardan igual, como 0. Los importes distintos
+  de 0 que redondean a 0 centavos (p. ej. -0.001) guardan además su signo en
+  `subcentavos` (int8, una columna por importe), porque se imprimen "0,00" / "-0,00".
+- Comprobante y condición de venta: códigos (int32) sobre un vocabulario de textos
+  compartido por el lote (-1 si falta).
+
+Las columnas se arman directo desde los valores del cursor (`desde_columnas`) y un
+cliente es una rebanada de las del lote, sin copiar.
+"""
+import numpy as np
+import pandas as pd
+
+DIA_NULO = np.iinfo(np.int32).min
+
+# 📌 Formato de las fechas que llegan como texto (export de Bejerman, CSV)
+FORMATO_FECHA = "%d/%m/%Y"
+
+# 📌 Campos del modelo, en el orden de `COLUMNAS_PDF`
+CAMPOS_DIAS = ("femision", "vencimiento")
+CAMPOS_CENTAVOS = ("debe", "haber", "saldo")
+CAMPOS_CODIGOS = ("comprobante", "condicion")
+
+
+def a_dias(valores):
+    """Fechas (datetime, date, texto dd/mm/aaaa o ISO, o nulos) como días desde 1970-01-01 en int32"""
+    try:
+        fechas = np.asarray(valores, dtype="datetime64[us]")
+    except (ValueError, TypeError):
+        fechas = _fechas_texto(valores)
+    dias = fechas.astype("datetime64[D]").astype(np.int64)
+    dias[np.isnat(fechas)] = DIA_NULO
+    return dias.astype(np.int32)
+
+
+def _fechas_texto(valores):
+    """
+    Fechas con textos en formato argentino: primero dd/mm/aaaa (el del export de Bejerman),
+    después ISO y por último cualquier otro formato con el día primero; lo que no se
+    entiende queda nulo. Nunca se interpreta el mes primero.
+    """
+    serie = pd.Series(valores, dtype=object)
+    fechas = pd.to_datetime(serie, format=FORMATO_FECHA, errors="coerce")
+    for opciones in ({"format": "ISO8601"}, {"format": "mixed", "dayfirst": True}):
+        restantes = fechas.isna() & serie.notna()
+        if not restantes.any():
+            break
+        fechas[restantes] = pd.to_datetime(serie[restantes], errors="coerce", **opciones)
+    return fechas.to_numpy("datetime64[us]")
+
+
+def a_centavos(valores):
+    """Importes (float, Decimal, texto numérico o nulos) como centavos en int64 (nulo -> 0)"""
+    return _centavos(_numeros(valores))
+
+
+def a_subcentavos(valores):
+    """Signo (int8: 1, -1, o 0) de los importes distintos de 0 que redondean a 0 centavos"""
+    numeros = _numeros(valores)
+    return _subcentavos(numeros, _centavos(numeros))
+
+
+def _numeros(valores):
+    try:
+        numeros = np.asarray(valores, dtype=np.float64)
+    except (ValueError, TypeError):
+        numeros = pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").to_numpy(dtype=np.float64,
+                                                                                           na_value=np.nan)
+    return np.nan_to_num(numeros, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _subcentavos(numeros, centavos):
+    return np.where(centavos == 0, np.sign(numeros), 0).astype(np.int8)  # 🔹 -0.0 da signo 0, igual que 0
+
+
+def _centavos(numeros):
+    escalados = numeros * 100
+    centavos = np.rint(escalados)
+    # 🔹 A medio centavo, el producto ya redondeado puede caer del otro lado que el valor binario:
+    # esos pocos se redondean con `format` sobre el valor original, igual que el formato de importes anterior
+    for i in np.flatnonzero(np.abs(np.abs(escalados - centavos) - 0.5) < 1e-6):
+        centavos[i] = int(format(numeros[i], ".2f").replace(".", ""))
+    return centavos.astype(np.int64)
+
+
+def a_codigos(valores):
+    """Textos como (códigos int32, vocabulario); los nulos quedan con código -1"""
+    codigos, vocabulario = pd.factorize(np.asarray(valores, dtype=object))
+    return codigos.astype(np.int32), np.asarray(vocabulario, dtype=object)
+
+
+def _compactar(codigos, vocabulario):
+    """Deja en el vocabulario sólo los textos que usan `codigos` (para enviar un cliente a otro proceso)"""
+    validos = codigos >= 0
+    usados, inversa = np.unique(codigos[validos], return_inverse=True)
+    nuevos = np.full(len(codigos), -1, dtype=np.int32)
+    nuevos[validos] = inversa
+    return nuevos, vocabulario[usados]
+
+
+class Movimientos:
+    """
+    Movimientos de uno o varios clientes en columnas tipadas (ver el comentario del módulo).
+
+    `comprobantes` y `condiciones` son los vocabularios de los códigos. Rebanar
+    (`movimientos[inicio:fin]`) devuelve vistas de las mismas columnas; al serializar
+    para otro proceso sólo viajan los textos que se usan.
+    """
+
+    __slots__ = ("femision", "vencimiento", "comprobante", "condicion", "debe", "haber", "saldo",
+                 "subcentavos", "comprobantes", "condiciones")
+
+    def __init__(self, femision, vencimiento, comprobante, condicion, debe, haber, saldo, subcentavos,
+                 comprobantes, condiciones):
+        self.femision = femision
+        self.vencimiento = vencimiento
+        self.comprobante = comprobante
+        self.condicion = condicion
+        self.debe = debe
+        self.haber = haber
+        self.saldo = saldo
+        self.subcentavos = subcentavos  # 🔹 (filas, 3): una columna por campo de `CAMPOS_CENTAVOS`
+        self.comprobantes = comprobantes
+        self.condiciones = condiciones
+
+    @classmethod
+    def desde_columnas(cls, femision, comprobante, vencimiento, condicion, debe, haber, saldo):
+        """Arma el modelo a partir de secuencias de valores crudos, una por campo (en el orden de `COLUMNAS_PDF`)"""
+        comprobante, comprobantes = a_codigos(comprobante)
+        condicion, condiciones = a_codigos(condicion)
+        numeros = [_numeros(valores) for valores in (debe, haber, saldo)]
+        centavos = [_centavos(valores) for valores in numeros]
+        subcentavos = np.column_stack([_subcentavos(n, c) for n, c in zip(numeros, centavos)])
+        return cls(a_dias(femision), a_dias(vencimiento), comprobante, condicion, *centavos, subcentavos,
+                   comprobantes, condiciones)
+
+    def __len__(self):
+        return len(self.femision)
+
+    def __getitem__(self, indices):
+        """Rebanada (vistas) o selección por posiciones (copia) de las filas; los vocabularios se comparten"""
+        return Movimientos(self.femision[indices], self.vencimiento[indices], self.comprobante[indices],
+                           self.condicion[indices], self.debe[indices], self.haber[indices], self.saldo[indices],
+                           self.subcentavos[indices], self.comprobantes, self.condiciones)
+
+    def textos(self, campo):
+        """Textos de un campo con códigos ("comprobante" o "condicion"); los nulos como ""."""
+        vocabulario = self.comprobantes if campo == "comprobante" else self.condiciones
+        return np.append(vocabulario, "")[getattr(self, campo)]  # 🔹 El código -1 toma el "" del final
+
+    @property
+    def nbytes(self):
+        """Bytes de las columnas (sin los textos de los vocabularios)"""
+        return sum(getattr(self, campo).nbytes
+                   for campo in CAMPOS_DIAS + CAMPOS_CENTAVOS + ("subcentavos",) + CAMPOS_CODIGOS)
+
+    def __getstate__(self):
+        comprobante, comprobantes = _compactar(self.comprobante, self.comprobantes)
+        condicion, condiciones = _compactar(self.condicion, self.condiciones)
+        return (self.femision, self.vencimiento, comprobante, condicion, self.debe, self.haber, self.saldo,
+                self.subcentavos, comprobantes, condiciones)
+
+    def __setstate__(self, estado):
+        for campo, valor in zip(self.__slots__, estado):
+            setattr(self, campo, valor)
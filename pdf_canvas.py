@@ -0,0 +1,170 @@
+import re
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.pdfgen import canvas
+from plantilla_pdf import PAGINA, MARGEN, ANCHO_UTIL, ALTO_UTIL, ENCABEZADO_PDF, COLUMNA_SALDO
+
+# 📌 Medidas de las filas, las mismas que resultan de las tablas de Platypus con `ESTILO_DATOS`
+TAMANO_FUENTE = 10
+INTERLINEA = 12
+RELLENO_SUPERIOR = 3
+ALTO_FILA = RELLENO_SUPERIOR + INTERLINEA + 6
+ALTO_ENCABEZADO = RELLENO_SUPERIOR + INTERLINEA + 12
+RELLENO_MARCO = 6  # 🔹 Relleno por defecto de los `Frame` de Platypus
+
+_ETIQUETAS = re.compile(r"<[^>]+>")
+
+
+class LienzoEstadoCuenta:
+    """
+    Dibuja un estado de cuenta directo sobre `reportlab.pdfgen.canvas`, sin flowables.
+
+    Las columnas tienen ancho fijo, así que cada fila se posiciona sin medir celdas
+    (lo que hace `Table` de Platypus para calcular los cortes de página). Es la vía
+    rápida para clientes con miles de movimientos: al cambiar de página se repite
+    el encabezado de columnas y el saldo final de la Parte 1 se resalta igual que
+    en la versión con tablas.
+
+    Uso: se llama a `texto`, `espacio`, `encabezado` y `filas` en el mismo orden que
+    los flowables de la versión Platypus y al final `cerrar`.
+    """
+
+    def __init__(self, buffer, plantilla):
+        self.anchos = plantilla.anchos
+        self.c = canvas.Canvas(buffer, pagesize=PAGINA)
+
+        izquierda = MARGEN + RELLENO_MARCO
+        disponible = ANCHO_UTIL - 2 * RELLENO_MARCO
+        self.izquierda = izquierda
+        self.derecha = izquierda + disponible
+        self.arriba = MARGEN + ALTO_UTIL - RELLENO_MARCO
+        self.abajo = MARGEN + RELLENO_MARCO
+
+        # 🔹 La tabla va centrada en el marco, como `Table(hAlign="CENTER")`
+        ancho_tabla = sum(self.anchos)
+        x = izquierda + (disponible - ancho_tabla) / 2
+        self.bordes = []
+        for ancho in self.anchos:
+            self.bordes.append(x)
+            x += ancho
+        self.bordes.append(x)
+        self.centros = [(a + b) / 2 for a, b in zip(self.bordes, self.bordes[1:])]
+
+        self.y = self.arriba
+        self._pagina_vacia = True
+
+    # 📌 Flowables equivalentes
+
+    def espacio(self, alto):
+        """Equivalente a `Spacer(1, alto)` (se descarta al comienzo de una página)"""
+        if not self._pagina_vacia:
+            self.y -= alto
+
+    def texto(self, texto, estilo=None):
+        """Dibuja una línea: un `Paragraph` de la plantilla, o un texto con el `estilo` indicado"""
+        if estilo is None:
+            estilo, texto = texto.style, texto.text
+        texto = _ETIQUETAS.sub("", texto)
+        antes = 0 if self._pagina_vacia else estilo.spaceBefore
+        self._reservar(antes + estilo.leading)
+
+        self.y -= antes + estilo.leading
+        self.c.setFont(estilo.fontName, estilo.fontSize)
+        self.c.setFillColor(estilo.textColor)
+        base = self.y + estilo.leading - estilo.fontSize
+        if estilo.alignment == TA_CENTER:
+            self.c.drawCentredString((self.izquierda + self.derecha) / 2, base, texto)
+        else:
+            self.c.drawString(self.izquierda, base, texto)
+        self.y -= estilo.spaceAfter
+        self._pagina_vacia = False
+
+    def encabezado(self, razon_social=None):
+        """Fila de títulos de columna (y, si se indica, la fila con la razón social)"""
+        alto = ALTO_ENCABEZADO + (ALTO_FILA if razon_social is not None else 0)
+        self._reservar(alto)
+        self._fila_encabezado()
+        if razon_social is not None:
+            self.c.setFillColor(colors.lightgrey)
+            self.c.rect(self.bordes[0], self.y - ALTO_FILA, self.bordes[-1] - self.bordes[0], ALTO_FILA,
+                        stroke=0, fill=1)
+            self.c.setFillColor(colors.black)
+            self.c.setFont("Helvetica-Bold", TAMANO_FUENTE)
+            self.c.drawCentredString((self.bordes[0] + self.bordes[-1]) / 2, self._base(), razon_social)
+            self.y -= ALTO_FILA
+
+    def filas(self, filas, resaltar_saldo_final=False, repetir_encabezado=True):
+        """
+        Dibuja las filas de movimientos, ya formateadas como texto.
+
+        Si una fila no entra en la página actual se pasa a la siguiente y, con
+        `repetir_encabezado`, se vuelve a dibujar la fila de títulos de columna.
+        """
+        c = self.c
+        centros = self.centros
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", TAMANO_FUENTE)
+        ultima = len(filas) - 1
+        for i, fila in enumerate(filas):
+            if self.y - ALTO_FILA < self.abajo:
+                self._nueva_pagina()
+                if repetir_encabezado:
+                    self._fila_encabezado()
+                c.setFillColor(colors.black)
+                c.setFont("Helvetica", TAMANO_FUENTE)
+
+            base = self._base()
+            for x, valor in zip(centros, fila):
+                if valor is not None and valor != "":
+                    c.drawCentredString(x, base, str(valor))
+
+            if resaltar_saldo_final and i == ultima:
+                self._resaltar_saldo(fila)
+            self.y -= ALTO_FILA
+            self._pagina_vacia = False
+
+    def cerrar(self):
+        """Termina la última página y escribe el PDF en el buffer"""
+        self.c.showPage()
+        self.c.save()
+
+    # 📌 Auxiliares
+
+    def _base(self):
+        # 🔹 Línea de base de una celda de una línea en `Table` (alineación vertical inferior)
+        return self.y - RELLENO_SUPERIOR - TAMANO_FUENTE
+
+    def _reservar(self, alto):
+        if not self._pagina_vacia and self.y - alto < self.abajo:
+            self._nueva_pagina()
+
+    def _nueva_pagina(self):
+        self.c.showPage()
+        self.y = self.arriba
+        self._pagina_vacia = True
+
+    def _fila_encabezado(self):
+        c = self.c
+        c.setFillColor(colors.grey)
+        c.rect(self.bordes[0], self.y - ALTO_ENCABEZADO, self.bordes[-1] - self.bordes[0], ALTO_ENCABEZADO,
+               stroke=0, fill=1)
+        c.setFillColor(colors.whitesmoke)
+        c.setFont("Helvetica-Bold", TAMANO_FUENTE)
+        base = self._base()
+        for x, titulo in zip(self.centros, ENCABEZADO_PDF):
+            c.drawCentredString(x, base, titulo)
+        self.y -= ALTO_ENCABEZADO
+        self._pagina_vacia = False
+
+    def _resaltar_saldo(self, fila):
+        """Marco rojo, fondo amarillo y negrita sobre el saldo de la fila actual"""
+        c = self.c
+        x0, x1 = self.bordes[COLUMNA_SALDO], self.bordes[COLUMNA_SALDO + 1]
+        c.setFillColor(colors.yellow)
+        c.setStrokeColor(colors.red)
+        c.setLineWidth(2)
+        c.rect(x0, self.y - ALTO_FILA, x1 - x0, ALTO_FILA, stroke=1, fill=1)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", TAMANO_FUENTE)
+        c.drawCentredString(self.centros[COLUMNA_SALDO], self._base(), str(fila[COLUMNA_SALDO]))
+        c.setFont("Helvetica", TAMANO_FUENTE)
@@ -0,0 +1,146 @@
+import os
+from datetime import datetime
+from functools import lru_cache
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Table, TableStyle, Paragraph
+from metricas import medir
+
+# 📌 Página y márgenes de los estados de cuenta (los mismos que usa `SimpleDocTemplate` por defecto)
+PAGINA = landscape(letter)
+MARGEN = inch
+ANCHO_UTIL = PAGINA[0] - 2 * MARGEN
+ALTO_UTIL = PAGINA[1] - 2 * MARGEN
+
+# 📌 Versión del diseño de los PDFs: incrementarla cuando cambie el formato, invalida los caches de ZIPs y PDFs
+VERSION_PLANTILLA = "3"
+
+# 📌 Motor de dibujo por defecto: "platypus" (tablas de ReportLab), "canvas" (filas de ancho fijo
+# dibujadas directo, ver `pdf_canvas`) o "auto" (canvas sólo para los clientes con muchas filas)
+RENDERERS = ("auto", "platypus", "canvas")
+PDF_RENDERER = os.getenv("PDF_RENDERER", "auto").lower()
+PDF_CANVAS_UMBRAL_FILAS = int(os.getenv("PDF_CANVAS_UMBRAL_FILAS", 500))  # 🔹 Filas de un cliente a partir de las que "auto" usa canvas
+
+# 📌 Columnas de la tabla de movimientos y su título en el PDF
+COLUMNAS_PDF = ["Femision", "ComprobanteNro", "FechaVto", "CondVta", "Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+ENCABEZADO_PDF = ["Fecha", "Comprobante Nro", "Vto.", "Cond. Venta", "Debe", "Haber", "Saldo"]
+COLUMNA_SALDO = ENCABEZADO_PDF.index("Saldo")
+
+ESTILO_ENCABEZADO = [
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+]
+
+# 📌 Encabezado con la razón social: fila de títulos + fila con la razón social ocupando todo el ancho
+ESTILO_ENCABEZADO_RAZON = ESTILO_ENCABEZADO + [
+    ('SPAN', (0, 1), (-1, 1)),
+    ('ALIGN', (0, 1), (-1, 1), 'CENTER'),
+    ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 1), (-1, 1), colors.lightgrey),
+]
+
+ESTILO_DATOS = [
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+]
+
+
+def estilo_saldo_final(fila):
+    """Resalta el saldo de la fila indicada: marco rojo, fondo amarillo y negrita"""
+    celda = (COLUMNA_SALDO, fila)
+    return [
+        ('BOX', celda, celda, 2, colors.red),  # Marco rojo
+        ('BACKGROUND', celda, celda, colors.yellow),  # Fondo amarillo
+        ('FONTNAME', celda, celda, 'Helvetica-Bold'),  # Texto en negrita
+        ('TEXTCOLOR', celda, celda, colors.black),  # Texto en negro
+    ]
+
+
+def validar_renderer(renderer):
+    """Normaliza el motor pedido en una solicitud (None = el configurado por `PDF_RENDERER`)"""
+    renderer = (renderer or PDF_RENDERER).lower()
+    if renderer not in RENDERERS:
+        raise ValueError(f"Renderer inválido: {renderer}. Opciones: {', '.join(RENDERERS)}")
+    return renderer
+
+
+def elegir_renderer(renderer, filas):
+    """Motor con el que se dibuja un PDF de `filas` movimientos ("platypus" o "canvas")"""
+    renderer = validar_renderer(renderer)
+    if renderer == "auto":
+        return "canvas" if filas > PDF_CANVAS_UMBRAL_FILAS else "platypus"
+    return renderer
+
+
+def version_renderer(renderer):
+    """Versión de los PDFs para las claves de cache: plantilla + motor (con "auto", también el umbral)"""
+    renderer = validar_renderer(renderer)
+    motor = f"{renderer}-{PDF_CANVAS_UMBRAL_FILAS}" if renderer == "auto" else renderer
+    return f"{VERSION_PLANTILLA}-{motor}"
+
+
+@lru_cache(maxsize=1)
+def hoja_estilos():
+    """Estilos de ReportLab, creados una sola vez por proceso (sólo se leen, nunca se modifican)"""
+    return getSampleStyleSheet()
+
+
+class PlantillaEstadoCuenta:
+    """
+    Partes fijas de los PDFs de estado de cuenta, armadas una sola vez por lote.
+
+    Contiene los estilos, la fecha, los títulos, la tabla de encabezado, los anchos de
+    columna y la plantilla de página; por cliente sólo se arman las filas de datos.
+
+    Los flowables se reutilizan en cada `construir`, por lo que una plantilla debe
+    usarse desde un único hilo (cada lote crea la suya).
+    """
+
+    def __init__(self, anchos, titulo_parte1, titulo_parte2, titulo=None):
+        estilos = hoja_estilos()
+        self.anchos = anchos
+        self.estilos = estilos
+
+        self.fecha = Paragraph(datetime.today().strftime("%d/%m/%Y"), estilos["Normal"])
+        self.titulo = Paragraph(titulo, estilos["Title"]) if titulo else None
+        self.titulo_parte1 = Paragraph(titulo_parte1, estilos["Heading2"])
+        self.titulo_parte2 = Paragraph(titulo_parte2, estilos["Heading2"])
+
+        self.estilo_encabezado = TableStyle(ESTILO_ENCABEZADO)
+        self.estilo_encabezado_razon = TableStyle(ESTILO_ENCABEZADO_RAZON)
+        self.estilo_datos = TableStyle(ESTILO_DATOS)
+        self.tabla_encabezado = Table([ENCABEZADO_PDF], colWidths=anchos)
+        self.tabla_encabezado.setStyle(self.estilo_encabezado)
+
+        self._paginas = [PageTemplate(id="First", pagesize=PAGINA,
+                                      frames=[Frame(MARGEN, MARGEN, ANCHO_UTIL, ALTO_UTIL, id="normal")])]
+
+    def tabla_encabezado_razon(self, razon_social):
+        """Tabla de encabezado con una segunda fila que muestra la razón social"""
+        tabla = Table([ENCABEZADO_PDF, [razon_social] + [""] * (len(ENCABEZADO_PDF) - 1)], colWidths=self.anchos)
+        tabla.setStyle(self.estilo_encabezado_razon)
+        return tabla
+
+    def tabla_datos(self, filas, resaltar_saldo_final=False):
+        """Tabla de movimientos con el estilo común (y el saldo final resaltado si se pide)"""
+        tabla = Table(filas, colWidths=self.anchos)
+        tabla.setStyle(self.estilo_datos)
+        if resaltar_saldo_final and filas:
+            tabla.setStyle(TableStyle(estilo_saldo_final(len(filas) - 1)))
+        return tabla
+
+    def construir(self, buffer, elementos):
+        """Arma el PDF con los flowables indicados sobre `buffer`"""
+        # 🔹 ReportLab marca con `_postponed` al flowable que pasó a la página siguiente; en los
+        # flowables compartidos esa marca quedaría del PDF anterior y cortaría el armado
+        for elemento in elementos:
+            elemento.__dict__.pop("_postponed", None)
+        doc = BaseDocTemplate(buffer, pagesize=PAGINA, pageTemplates=self._paginas)
+        with medir("pdf"):
+            doc.build(elementos)
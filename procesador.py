@@ -1,49 +1,61 @@
-import json
-from datetime import datetime
-
-def procesar_resultados(razon_social, data):
-    print("Datos a procesar:", json.dumps(data, indent=2)) 
-    today = datetime.today()  # Fecha actual
-
-    # Obtener el primer vendedor no vacío
-    vendedor = next((item["Vendedor"] for item in data if item.get("Vendedor")), "")
-
-    # 1. Filtrar objetos con "Saldo_Loc" distinto de 0
-    filtered_data = [item for item in data if item.get("Saldo_Loc", 0) != 0]
-
-    # 2. Dividir en negativos y positivos
-    negatives = [item for item in filtered_data if item["Saldo_Loc"] < 0]
-    positives = [item for item in filtered_data if item["Saldo_Loc"] >= 0]
-
-    # 3. Sumarizar los "Total_Loc" negativos como "Crédito a favor"
-    credito_a_favor = sum(item["Saldo_Loc"] for item in negatives)
-
-    # 4. Dividir los positivos en vencido y a vencer, y sumarizar
-    vencidos = [item for item in positives if datetime.strptime(item["Fecha_vto"], "%Y-%m-%d") < today]
-    a_vencer = [item for item in positives if datetime.strptime(item["Fecha_vto"], "%Y-%m-%d") >= today]
-
-    total_vencidos = sum(item["Saldo_Loc"] for item in vencidos)
-    total_a_vencer = sum(item["Saldo_Loc"] for item in a_vencer)
-
-    total = round(sum(item["Saldo_Loc"] for item in filtered_data), 2)  # Sumar y redondear a 2 decimales
-
-    # Crear un diccionario con los resultados
-    resultados = {
+import numpy as np
+from antiguedad import clasificar_dias, etiquetas_tramos, CATEGORIAS, CREDITO, VENCIDO, A_VENCER
+from movimientos import a_centavos, a_dias
+
+
+def procesar_resultados(razon_social, data, hoy=None):
+    """
+    Resume el estado de cuenta de un cliente: crédito a favor, vencidos y a vencer.
+
+    Usa el mismo motor vectorizado que el resumen de muchos clientes (`antiguedad`),
+    directo sobre las columnas de saldo (en centavos) y vencimiento (en días), sin
+    armar un DataFrame. No escribe archivos ni imprime los datos recibidos.
+
+    "Tramos vencidos" suma los vencidos por antigüedad ({"0-30": ..., "90+": ...},
+    ver `ANTIGUEDAD_TRAMOS`); los tramos sin movimientos quedan en 0.
+    """
+    if not data:
+        return {
+            "Razon Social": razon_social,
+            "Crédito a favor (Total_Loc negativos)": 0,
+            "Total vencidos": 0,
+            "Total a vencer": 0,
+            "Total global": 0,
+            "Vendedor": "",
+            "Tramos vencidos": dict.fromkeys(etiquetas_tramos(), 0),
+            "Negativos": [],
+            "Vencidos": [],
+            "A Vencer": [],
+        }
+
+    saldo = a_centavos([item.get("Saldo_Loc") for item in data])
+    categorias, _, tramos = clasificar_dias(saldo, a_dias([item.get("Fecha_vto") for item in data]), hoy)
+
+    # 🔹 Totales por categoría y por tramo con `bincount` sobre los centavos (sumas exactas)
+    etiquetas = etiquetas_tramos()
+    validos = categorias >= 0
+    por_categoria = np.bincount(categorias[validos], weights=saldo[validos], minlength=len(CATEGORIAS)) / 100
+    vencidos = tramos >= 0
+    por_tramo = np.bincount(tramos[vencidos], weights=saldo[vencidos], minlength=len(etiquetas)) / 100
+    totales = dict(zip(CATEGORIAS, por_categoria.tolist()))
+
+    # 🔹 Primer vendedor no vacío del cliente
+    vendedor = next((item.get("Vendedor") for item in data if item.get("Vendedor")), "")
+
+    # 🔹 Los detalles se devuelven con los mismos objetos recibidos
+    def items(categoria):
+        codigo = CATEGORIAS.index(categoria)
+        return [item for item, cat in zip(data, categorias) if cat == codigo]
+
+    return {
         "Razon Social": razon_social,
-        "Crédito a favor (Total_Loc negativos)": credito_a_favor,
-        "Total vencidos": total_vencidos,
-        "Total a vencer": total_a_vencer,
-        "Total global": total,
+        "Crédito a favor (Total_Loc negativos)": totales[CREDITO],
+        "Total vencidos": totales[VENCIDO],
+        "Total a vencer": totales[A_VENCER],
+        "Total global": round(sum(totales.values()), 2),
         "Vendedor": vendedor,
-        "Negativos": negatives,
-        "Vencidos": vencidos,
-        "A Vencer": a_vencer,
+        "Tramos vencidos": dict(zip(etiquetas, por_tramo.tolist())),
+        "Negativos": items(CREDITO),
+        "Vencidos": items(VENCIDO),
+        "A Vencer": items(A_VENCER),
     }
-
-    # Escribir los resultados en un archivo JSON
-    output_file_path = "resultados.json"
-    with open(output_file_path, "w", encoding="utf-8") as json_file:
-        json.dump(resultados, json_file, indent=2, ensure_ascii=False)
-
-    print(f"Resultados guardados en el archivo: {output_file_path}")
-    return resultados
@@ -1,4 +1,4 @@
-from sqlalchemy import text
+from sqlalchemy import text, bindparam, select, table, column, and_, or_
 
 
 # def comprobantes_cargados_hoy_razon_social():
@@ -37,84 +37,203 @@ def comprobantes_cargados_hoy_razon_social():
             cv.cvecli_RazSoc ASC;
     """)
 
-# 📌 Query para obtener el estado de cuenta de los últimos 45 días
-def estado_cuenta_ultimos_45_dias(razon_social):
-    return text(f"""
+# 📌 Query para obtener todos los movimientos de un cliente
+def saldo_acumulado_por_cliente():
+    return text("SELECT * FROM _DL_PBI_EstadoCtaCte_SaldoAcum WHERE clienteCod = :cliente_cod")
+
+# 📌 Query con los saldos abiertos de toda la cartera, para el resumen de antigüedad de deuda
+def cartera_saldos_abiertos():
+    """
+    Saldos pendientes de todos los clientes habilitados, ya agrupados por cliente,
+    vendedor y fecha de vencimiento. Los saldos deudores y acreedores se suman por
+    separado porque el crédito a favor se informa aparte de la deuda.
+    """
+    return text("""
         SELECT 
-            '' AS ClienteCod,
-            '' AS RazonSocial,
-            '' AS Comp_tipo,
-            '' AS Comp_letra,
-            '' AS Comp_PtoVta,
-            'Saldos' AS Comp_Nro,
-            'Saldo Anterior' AS CompNro,
-            DATEADD(D, ISNULL(CONVERT(INT, ParamModulo.pmo_Valor) * -1, -46), GETDATE()) AS Fecha,
-            DATEADD(D, ISNULL(CONVERT(INT, ParamModulo.pmo_Valor) * -1, -46), GETDATE()) AS Fecha_vto,
-            '' AS CondVta_Cod,
-            '' AS CondVta,
-            p.VendedorCod AS VendedorCod,
-            p.Vendedor AS Vendedor,
-            ROUND(SUM(p.Total_Loc), 2) AS Total_Loc,
-            ROUND(SUM(p.Saldo_Loc), 2) AS Saldo_Loc,
-            '' AS PuntoReg_cod,
-            '' AS PuntoReg,
-            p.CC_Por_LugEnt AS CC_Por_LugEnt,
-            '' AS LugEnt_Id,
-            '' AS LugarEnt,
-            p.LugarEnt_RefClienteCod AS LugarEnt_RefClienteCod,
-            '0-Saldo Anterior al ' + CONVERT(VARCHAR(10), DATEADD(D, ISNULL(CONVERT(INT, ParamModulo.pmo_Valor) * -1, -46), GETDATE()), 103) AS LugarEnt_Grupo,
-            p.LugarEnt_SubGrupo AS LugarEnt_SubGrupo,
-            p.Habilitado
+            p.ClienteCod,
+            MAX(p.RazonSocial) AS RazonSocial,
+            p.VendedorCod,
+            p.Vendedor,
+            CONVERT(DATE, p.Fecha_vto) AS Fecha_vto,
+            SUM(CASE WHEN p.Saldo_Loc > 0 THEN p.Saldo_Loc ELSE 0 END) AS Saldo_Deudor,
+            SUM(CASE WHEN p.Saldo_Loc < 0 THEN p.Saldo_Loc ELSE 0 END) AS Saldo_Acreedor
         FROM 
             _Sta_PBI_DeudoresCtaCte_Historico AS p
-        LEFT JOIN 
-            ParamModulo ON ParamModulo.pmo_Modulo = 'QUERIES' AND ParamModulo.pmo_Param = 'CTACTE_LUGARENTREGA'
         WHERE 
-            p.Fecha < DATEADD(D, ISNULL(CONVERT(INT, ParamModulo.pmo_Valor) * -1, -46), GETDATE())
-            AND p.Habilitado = 1
-            AND p.RazonSocial = '{razon_social}'
+            p.Habilitado = 1
+            AND p.Saldo_Loc <> 0
         GROUP BY 
-            p.LugarEnt_RefClienteCod, 
-            p.LugarEnt_SubGrupo, 
-            p.CC_Por_LugEnt, 
-            ParamModulo.pmo_Valor, 
+            p.ClienteCod, 
             p.VendedorCod, 
             p.Vendedor, 
-            p.Habilitado
+            CONVERT(DATE, p.Fecha_vto)
+    """)
+
+# 📌 Columnas del saldo acumulado que se pueden pedir en las respuestas en streaming
+COLUMNAS_SALDO_ACUMULADO = ["ClienteCod", "RazonSocial", "Femision", "ComprobanteNro", "FechaVto",
+                            "CondVta", "Debe_Loc", "Haber_Loc", "SaldoAcum_Loc"]
+
+_vista_saldo_acumulado = table("_DL_PBI_EstadoCtaCte_SaldoAcum",
+                               *(column(col) for col in COLUMNAS_SALDO_ACUMULADO))
 
-        UNION ALL
+# 📌 Query con proyección, rango de fechas y paginación por keyset (Femision, ComprobanteNro)
+def saldo_acumulado_filtrado(columnas, desde=None, hasta=None, despues_de=None, limite=None):
+    """
+    Arma la consulta de un cliente (`:cliente_cod`) con sólo las columnas pedidas.
 
+    Parámetros:
+    - columnas (list): Columnas de `COLUMNAS_SALDO_ACUMULADO` a devolver, en ese orden.
+    - desde (datetime): Opcional, `Femision >= desde`.
+    - hasta (datetime): Opcional, `Femision < hasta`.
+    - despues_de (tuple): Opcional, (Femision, ComprobanteNro) de la última fila ya enviada.
+    - limite (int): Opcional, cantidad máxima de filas (`TOP` en SQL Server).
+
+    Con `despues_de` o `limite` las filas se ordenan por (Femision, ComprobanteNro)
+    para que las páginas sean estables. Se usa SQLAlchemy Core para que los filtros
+    opcionales y las columnas viajen siempre como parámetros o identificadores citados.
+    """
+    vista = _vista_saldo_acumulado.c
+    query = select(*(vista[col] for col in columnas)).where(vista.ClienteCod == bindparam("cliente_cod"))
+
+    if desde is not None:
+        query = query.where(vista.Femision >= desde)
+    if hasta is not None:
+        query = query.where(vista.Femision < hasta)
+    if despues_de is not None:
+        fecha, comprobante = despues_de
+        query = query.where(or_(vista.Femision > fecha,
+                                and_(vista.Femision == fecha, vista.ComprobanteNro > comprobante)))
+    if despues_de is not None or limite is not None:
+        query = query.order_by(vista.Femision, vista.ComprobanteNro)
+    if limite is not None:
+        query = query.limit(limite)
+    return query
+
+# 📌 Query para obtener los movimientos desde una fecha de varios clientes a la vez
+def saldo_acumulado_ultimos_30_dias_por_clientes():
+    """
+    Devuelve los movimientos de `_DL_PBI_EstadoCtaCte_SaldoAcum` con `Femision >= :desde`
+    para una lista de clientes en una sola consulta.
+
+    El parámetro `codigos` se expande a `IN (...)`, por lo que debe enviarse como lista
+    (ver `SALDO_CHUNK_SIZE` en routes.py para el tamaño de cada lote).
+    `desde` lo calcula la aplicación (hoy - 30 días) para que coincida con el corte
+    que se aplica sobre los resultados en cache.
+    """
+    return text("""
+        SELECT * 
+        FROM _DL_PBI_EstadoCtaCte_SaldoAcum 
+        WHERE clienteCod IN :codigos 
+        AND Femision >= :desde  -- Solo registros de los últimos 30 días
+    """).bindparams(bindparam("codigos", expanding=True))
+
+# 📌 Estado de cuenta de los últimos N días (N = ParamModulo CTACTE_LUGARENTREGA, 46 por defecto):
+#    una fila de "Saldo Anterior" por lugar de entrega/vendedor con lo anterior al corte + el detalle posterior.
+#    El corte se calcula una sola vez y `_Sta_PBI_DeudoresCtaCte_Historico` se recorre una sola vez:
+#    las filas anteriores al corte comparten `Fila = 0` y se agregan juntas, las posteriores
+#    tienen un `Fila` propio y pasan sin agregarse. `Fila` se numera por cliente (PARTITION BY
+#    la clave), así un lote con varios clientes agrupa igual que uno solo.
+_ESTADO_CUENTA_ULTIMOS_45_DIAS = """
+    WITH parametros AS (
+        SELECT DATEADD(D, ISNULL(CONVERT(INT, pm.pmo_Valor) * -1, -46), GETDATE()) AS Corte
+        FROM (SELECT 1 AS Uno) AS u
+        LEFT JOIN ParamModulo AS pm
+            ON pm.pmo_Modulo = 'QUERIES' AND pm.pmo_Param = 'CTACTE_LUGARENTREGA'
+    ),
+    movimientos AS (
         SELECT 
-            ClienteCod,
-            RazonSocial,
-            Comp_tipo,
-            Comp_letra,
-            Comp_PtoVta,
-            Comp_Nro,
-            CompNro,
-            Fecha,
-            Fecha_vto,
-            CondVta_Cod,
-            CondVta,
-            VendedorCod,
-            Vendedor,
-            Total_Loc,
-            Saldo_Loc,
-            PuntoReg_cod,
-            PuntoReg,
-            CC_Por_LugEnt,
-            LugEnt_Id,
-            LugarEnt,
-            LugarEnt_RefClienteCod,
-            LugarEnt_Grupo,
-            LugarEnt_SubGrupo,
-            Habilitado
+            p.*,
+            {clave} AS Clave,
+            par.Corte,
+            CASE WHEN p.Fecha < par.Corte THEN 0
+                 ELSE ROW_NUMBER() OVER (PARTITION BY {clave} ORDER BY p.Fecha) END AS Fila  -- 0 = Saldo Anterior
         FROM 
             _Sta_PBI_DeudoresCtaCte_Historico AS p
-        LEFT JOIN 
-            ParamModulo ON ParamModulo.pmo_Modulo = 'QUERIES' AND ParamModulo.pmo_Param = 'CTACTE_LUGARENTREGA'
+        CROSS JOIN 
+            parametros AS par
         WHERE 
-            p.Fecha >= DATEADD(D, ISNULL(CONVERT(INT, ParamModulo.pmo_Valor) * -1, -46), GETDATE())
-            AND p.Habilitado = 1
-            AND p.RazonSocial = '{razon_social}';
-    """)
+            p.Habilitado = 1
+            AND p.Fecha IS NOT NULL  -- Igual que antes: sin fecha no entra ni antes ni después del corte
+            AND {clave} IN :{parametro}
+    )
+    SELECT 
+        m.Clave,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.ClienteCod) END AS ClienteCod,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.RazonSocial) END AS RazonSocial,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.Comp_tipo) END AS Comp_tipo,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.Comp_letra) END AS Comp_letra,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.Comp_PtoVta) END AS Comp_PtoVta,
+        CASE WHEN m.Fila = 0 THEN 'Saldos' ELSE MAX(m.Comp_Nro) END AS Comp_Nro,
+        CASE WHEN m.Fila = 0 THEN 'Saldo Anterior' ELSE MAX(m.CompNro) END AS CompNro,
+        CASE WHEN m.Fila = 0 THEN m.Corte ELSE MAX(m.Fecha) END AS Fecha,
+        CASE WHEN m.Fila = 0 THEN m.Corte ELSE MAX(m.Fecha_vto) END AS Fecha_vto,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.CondVta_Cod) END AS CondVta_Cod,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.CondVta) END AS CondVta,
+        m.VendedorCod,
+        m.Vendedor,
+        CASE WHEN m.Fila = 0 THEN ROUND(SUM(m.Total_Loc), 2) ELSE SUM(m.Total_Loc) END AS Total_Loc,
+        CASE WHEN m.Fila = 0 THEN ROUND(SUM(m.Saldo_Loc), 2) ELSE SUM(m.Saldo_Loc) END AS Saldo_Loc,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.PuntoReg_cod) END AS PuntoReg_cod,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.PuntoReg) END AS PuntoReg,
+        m.CC_Por_LugEnt,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.LugEnt_Id) END AS LugEnt_Id,
+        CASE WHEN m.Fila = 0 THEN '' ELSE MAX(m.LugarEnt) END AS LugarEnt,
+        m.LugarEnt_RefClienteCod,
+        CASE WHEN m.Fila = 0 THEN '0-Saldo Anterior al ' + CONVERT(VARCHAR(10), m.Corte, 103)
+             ELSE MAX(m.LugarEnt_Grupo) END AS LugarEnt_Grupo,
+        m.LugarEnt_SubGrupo,
+        m.Habilitado
+    FROM 
+        movimientos AS m
+    GROUP BY 
+        m.Clave,
+        m.Fila,
+        m.Corte,
+        m.LugarEnt_RefClienteCod, 
+        m.LugarEnt_SubGrupo, 
+        m.CC_Por_LugEnt, 
+        m.VendedorCod, 
+        m.Vendedor, 
+        m.Habilitado
+    ORDER BY 
+        m.Clave, m.Fila;
+"""
+
+# 📌 Campos por los que se puede pedir el estado de cuenta en lote, con el nombre de su parámetro
+_CLAVES_ESTADO_CUENTA = {
+    "razon_social": ("p.RazonSocial", "razones_sociales"),
+    "cliente": ("p.ClienteCod", "codigos"),
+}
+
+# 📌 Query para obtener el estado de cuenta de los últimos 45 días de varios clientes a la vez
+def estado_cuenta_ultimos_45_dias_por_lote(por="razon_social"):
+    """
+    Estado de cuenta de varios clientes en una sola consulta.
+
+    Parámetros:
+    - por (str): "razon_social" (parámetro `razones_sociales`) o "cliente" (parámetro `codigos`).
+
+    El parámetro se expande a `IN (...)`, por lo que debe enviarse como lista (ver
+    `SALDO_CHUNK_SIZE` para el tamaño de cada lote). Cada fila trae la columna extra
+    `Clave` con la razón social o el código de cliente al que pertenece; las filas
+    de "Saldo Anterior" se agrupan por esa clave.
+
+    Uso:
+        db.execute(estado_cuenta_ultimos_45_dias_por_lote("cliente"), {"codigos": codigos})
+    """
+    if por not in _CLAVES_ESTADO_CUENTA:
+        raise ValueError(f"por debe ser uno de: {', '.join(_CLAVES_ESTADO_CUENTA)}")
+    campo, parametro = _CLAVES_ESTADO_CUENTA[por]
+    return text(_ESTADO_CUENTA_ULTIMOS_45_DIAS.format(clave=campo, parametro=parametro)).bindparams(
+        bindparam(parametro, expanding=True))
+
+# 📌 Query para obtener el estado de cuenta de los últimos 45 días de una razón social
+def estado_cuenta_ultimos_45_dias():
+    """
+    Estado de cuenta de una razón social: la consulta por lote con una lista de un elemento
+    (el texto de la consulta es siempre el mismo, así SQL Server reutiliza el plan).
+
+    Uso:
+        db.execute(estado_cuenta_ultimos_45_dias(), {"razones_sociales": [razon_social]})
+    """
+    return estado_cuenta_ultimos_45_dias_por_lote("razon_social")
@@ -1,52 +1,191 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, url_for
 import os
 import json
-import subprocess
-from werkzeug.utils import secure_filename
-from sqlalchemy.sql import text
-from database import get_db
-from queries import comprobantes_cargados_hoy_razon_social
-from procesador import procesar_resultados
-from generar_pdf import generar_pdf
-import zipfile
+from datetime import datetime, date, timedelta
+from database import session_scope, estadisticas_pool, lotes_cursor
+from queries import comprobantes_cargados_hoy_razon_social, saldo_acumulado_por_cliente, saldo_acumulado_ultimos_30_dias_por_clientes, saldo_acumulado_filtrado, COLUMNAS_SALDO_ACUMULADO
+import itertools
 import logging
-import traceback
-from excelSaldoUltimos30DiasAPDF import procesar_excel_a_pdf  # 📌 Importamos la función directamente
-from jsonSaldoUltimos30DiasAPDF import procesar_json_a_pdf
-import xlsxwriter
-import io
-import shutil  # Agregar esta importación al inicio del archivo
+from zip_stream import generar_zip_stream
+from ingesta import EXTENSIONES_SOPORTADAS
+from espacio_trabajo import crear_directorio_trabajo, eliminar_directorio
+import cache_zip
+from cache_saldos import cache_saldos, ResultadoSaldo
+from cache_pdf import cache_pdf
+from metricas import medir
+from trabajos import administrador as administrador_trabajos, ColaLlenaError, obtener_estado, obtener_zip
+from json_stream import codificador_filas, generar_ndjson, generar_json
+import base64
+from contextlib import ExitStack, closing
 
+# 📌 Los módulos que cargan pandas, ReportLab o xlsxwriter (PDFs, cartera, export a Excel)
+#    se importan dentro de las rutas que los usan: cada worker arranca sin pagarlos y
+#    los carga recién en la primera solicitud que los necesita.
 
 
 
 
-# 📌 Configurar logging
-logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# 📌 Logger del módulo (el nivel y el formato se configuran en `logs.configurar_logs`, desde app.py)
 logger = logging.getLogger(__name__)
 
 
 # 📌 Definir un Blueprint
 uploads_bp = Blueprint("uploads", __name__)
 
-# Directorios de trabajo
-UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
-PDF_FOLDER = os.path.join(os.getcwd(), "pdfs")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(PDF_FOLDER, exist_ok=True)
-
 # Configuración
-ALLOWED_EXTENSIONS = {"xlsx"}
+ALLOWED_EXTENSIONS = EXTENSIONES_SOPORTADAS  # 📌 Excel, o CSV/Parquet para exports muy grandes
+
+# 📌 Cantidad máxima de clientes por consulta `IN (...)` (SQL Server admite hasta 2100 parámetros)
+SALDO_CHUNK_SIZE = max(1, min(int(os.getenv("SALDO_CHUNK_SIZE", 500)), 2000))
+
+# 📌 Máximo de filas por página en /saldo-acumulado con `limite`
+SALDO_LIMITE_MAXIMO = int(os.getenv("SALDO_LIMITE_MAXIMO", 10000))
+
+# 📌 Renderizar los PDFs en varios procesos por defecto (se puede pisar con "paralelo" en el body o el formulario)
+PDF_PARALELO = os.getenv("PDF_PARALELO", "false").lower() in ("1", "true", "si", "yes")
+
+# 📌 Los trabajos en segundo plano renderizan en el pool de procesos por defecto: en los hilos del
+# administrador, ReportLab competiría por el GIL con los endpoints interactivos del mismo worker
+TRABAJOS_PARALELO = os.getenv("TRABAJOS_PARALELO", "true").lower() in ("1", "true", "si", "yes")
+
+
+def paralelo_formulario(defecto=PDF_PARALELO):
+    """Campo "paralelo" de un formulario multipart (por defecto `defecto`)"""
+    valor = request.form.get("paralelo")
+    return defecto if valor is None else valor.lower() in ("1", "true", "si", "yes")
 
 def allowed_file(filename):
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    return "." in filename and extension_archivo(filename) in ALLOWED_EXTENSIONS
+
+def extension_archivo(filename):
+    return filename.rsplit(".", 1)[1].lower()
+
+# 📌 Ventanas de fechas con las que se guardan los saldos en `cache_saldos`
+VENTANA_HISTORICO = "historico"
+VENTANA_30_DIAS = "ultimos_30_dias"
+
+def _clave_cliente(codigo):
+    return str(codigo).strip()
+
+def _indice_columna(columnas, nombre):
+    # 🔹 La vista puede devolver `clienteCod` o `ClienteCod`
+    return next((i for i, col in enumerate(columnas) if col.lower() == nombre), None)
+
+def _recortar_desde(resultado, desde):
+    """
+    Recorta un resultado histórico a los movimientos con `Femision >= desde`.
+
+    Retorna None si las fechas no se pueden comparar (en ese caso se consulta a la base).
+    """
+    indice = _indice_columna(resultado.columnas, "femision")
+    if indice is None:
+        return None
+
+    filas = []
+    for fila in resultado.filas:
+        fecha = fila[indice]
+        if fecha is None:
+            continue  # 🔹 Igual que en SQL: NULL >= desde no se cumple
+        if not isinstance(fecha, datetime):
+            if not isinstance(fecha, date):
+                return None
+            fecha = datetime.combine(fecha, datetime.min.time())
+        if fecha >= desde:
+            filas.append(fila)
+    return ResultadoSaldo(resultado.columnas, filas)
+
+# 📌 Trae todos los movimientos de un cliente (compartido por /saldo-acumulado y /saldo-acumulado-excel)
+def obtener_saldo_acumulado(cliente_cod):
+    """
+    Retorna un `ResultadoSaldo` con todos los movimientos del cliente,
+    desde `cache_saldos` si se consultó hace menos de `CACHE_SALDOS_TTL` segundos.
+    """
+    clave = (_clave_cliente(cliente_cod), VENTANA_HISTORICO)
+    resultado = cache_saldos.obtener(clave)
+    if resultado is not None:
+        logger.debug("♻️ Saldo acumulado de ClienteCod %s obtenido del cache", cliente_cod)
+        return resultado
+
+    with session_scope() as db, medir("sql"):
+        result = db.execute(saldo_acumulado_por_cliente(), {"cliente_cod": cliente_cod})
+        resultado = ResultadoSaldo(result.keys(), [tuple(row) for row in result])
+
+    cache_saldos.guardar(clave, resultado)
+    return resultado
+
+# 📌 Trae los saldos de los últimos 30 días de todos los clientes en lotes
+def obtener_saldos_ultimos_30_dias(codigos, chunk_size=None):
+    """
+    Consulta `_DL_PBI_EstadoCtaCte_SaldoAcum` para todos los códigos en lotes de
+    `chunk_size` clientes y agrupa las filas por cliente en Python.
+
+    Los clientes que están en `cache_saldos` (con la ventana de 30 días o con el
+    histórico completo) no se consultan; si todos están, no se abre ninguna conexión.
+
+    Retorna:
+    - Diccionario {codigo: ResultadoSaldo} con el mismo orden que `codigos` (los clientes
+      sin movimientos quedan sin filas). Las filas quedan como tuplas del cursor: el armado
+      de los PDFs las pasa directo a columnas (ver `estado_cuenta.desde_saldos`).
+    """
+    chunk_size = chunk_size or SALDO_CHUNK_SIZE
+    codigos = list(dict.fromkeys(codigos))  # 🔹 Quitar duplicados conservando el orden
+    desde = datetime.now() - timedelta(days=30)
+
+    resultados = {}
+    pendientes = []
+    for codigo in codigos:
+        clave = _clave_cliente(codigo)
+        resultado = cache_saldos.obtener((clave, VENTANA_30_DIAS))
+        if resultado is None:
+            historico = cache_saldos.obtener((clave, VENTANA_HISTORICO))
+            resultado = _recortar_desde(historico, desde) if historico is not None else None
+        if resultado is None:
+            pendientes.append(codigo)
+        else:
+            resultados[codigo] = resultado
+
+    consultas = 0
+    if pendientes:
+        query = saldo_acumulado_ultimos_30_dias_por_clientes()
+        codigos_normalizados = {_clave_cliente(codigo): codigo for codigo in pendientes}
+        filas_por_codigo = {codigo: [] for codigo in pendientes}
+        columnas = ()
+
+        with session_scope() as db:
+            for inicio in range(0, len(pendientes), chunk_size):
+                lote = pendientes[inicio:inicio + chunk_size]
+                with medir("sql"):
+                    result = db.execute(query, {"codigos": lote, "desde": desde})
+                    consultas += 1
+
+                    columnas = tuple(result.keys())
+                    indice_cliente = _indice_columna(columnas, "clientecod")
+                    for row in result:
+                        codigo = codigos_normalizados.get(_clave_cliente(row[indice_cliente]))
+                        if codigo is not None:
+                            filas_por_codigo[codigo].append(tuple(row))
+
+        for codigo, filas in filas_por_codigo.items():
+            resultados[codigo] = ResultadoSaldo(columnas, filas)
+            cache_saldos.guardar((_clave_cliente(codigo), VENTANA_30_DIAS), resultados[codigo])
+
+    saldos = {codigo: resultados[codigo] for codigo in codigos}
+
+    total_registros = sum(len(resultado.filas) for resultado in saldos.values())
+    logger.info("📊 Saldos obtenidos: %d clientes (%d del cache), %d registros, %d consultas a SQL Server (lotes de %d)",
+                len(codigos), len(codigos) - len(pendientes), total_registros, consultas, chunk_size)
+    return saldos
 
 # 📌 Función para generar PDFs sin usar subprocess
-def generar_pdf_con_python(excel_file_path, output_dir, razones_sociales):
+def generar_pdf_con_python(excel_file_path, output_dir, razones_sociales, progreso=None, renderer=None,
+                           paralelo=False, errores=None):
+    from excelSaldoUltimos30DiasAPDF import procesar_excel_a_pdf
+
     try:
         # 📌 Ejecutar la función directamente en lugar de `subprocess.run()`
-        archivos_pdf = procesar_excel_a_pdf(excel_file_path, output_dir, razones_sociales)
-        archivos_pdf = procesar_excel_a_pdf(excel_file_path, output_dir, razones_sociales)
+        archivos_pdf = procesar_excel_a_pdf(excel_file_path, output_dir, razones_sociales, progreso, renderer,
+                                            paralelo, errores=errores)
 
         if not archivos_pdf:
             raise Exception("No se generaron archivos PDF.")
@@ -54,12 +193,65 @@ def generar_pdf_con_python(excel_file_path, output_dir, razones_sociales):
         return archivos_pdf
 
     except Exception as e:
-        print(f"❌ Error en la generación de PDFs: {str(e)}")
+        logger.error("❌ Error en la generación de PDFs: %s", e)
         raise Exception(f"Error en la generación de PDFs: {str(e)}")
     
+# 📌 Arma la respuesta HTTP que envía el ZIP a medida que se generan los PDFs
+def texto_errores(errores):
+    """Contenido de `errores.txt`: un cliente por línea con el motivo por el que no se generó su PDF"""
+    return "".join(f"{error['cliente']}: {error['error']}\n" for error in errores).encode("utf-8")
+
+
+def respuesta_zip_stream(archivos, download_name, permitir_vacio=False, cache_clave=None, errores=None):
+    """
+    Envía los PDFs como un ZIP en streaming: cada PDF se comprime y se manda
+    apenas está listo, sin escribir nada en disco.
+
+    Parámetros:
+    - archivos (iterable): Pares (nombre, bytes) con los PDFs a incluir.
+    - download_name (str): Nombre del ZIP para la descarga.
+    - permitir_vacio (bool): Si es False y no hay ningún PDF, retorna None.
+    - cache_clave (str): Opcional, guarda el ZIP completo en `cache_zip` con esta clave.
+    - errores (list): Opcional, la lista donde `iterar_pdfs` anota los clientes que fallaron.
+      Si al terminar no está vacía, el ZIP incluye `errores.txt` y no se guarda en cache.
+
+    El primer PDF se genera antes de responder, así los errores iniciales
+    todavía pueden devolverse como JSON con código 500.
+    """
+    archivos = iter(archivos)
+    primero = next(archivos, None)
+    if primero is None and not permitir_vacio:
+        return None
+
+    pendientes = itertools.chain([primero], archivos) if primero is not None else archivos
+
+    def con_errores():
+        yield from pendientes
+        # 🔹 Los encabezados ya se enviaron: los clientes que fallaron se informan dentro del ZIP
+        if errores:
+            yield "errores.txt", texto_errores(errores)
+
+    def contenido():
+        bloques = generar_zip_stream(con_errores())
+        if cache_clave:
+            bloques = cache_zip.guardar_stream(cache_clave, bloques, descartar=lambda: bool(errores))
+        try:
+            yield from bloques
+            logger.info("🎉 ZIP %s enviado completo al cliente.", download_name)
+        except Exception as e:
+            # 🔹 La respuesta ya empezó: sólo queda registrar el error y cortar el stream
+            logger.error("❌ Error durante el envío del ZIP %s: %s", download_name, e, exc_info=True)
+            raise
+
+    return Response(contenido(), mimetype="application/zip",
+                    headers={"Content-Disposition": f"attachment; filename={download_name}"})
+
 # 📌 Ruta para subir archivos y generar ZIP con PDFs con logs detallados
 @uploads_bp.route("/upload", methods=["POST"])
 def upload_file():
+    from excelSaldoUltimos30DiasAPDF import iterar_pdfs_excel
+    from plantilla_pdf import validar_renderer, version_renderer
+
     try:
         logger.info("📌 Iniciando proceso de subida de archivo...")
 
@@ -70,47 +262,66 @@ def upload_file():
 
         file = request.files["file"]
         if file.filename == "" or not allowed_file(file.filename):
-            logger.error(f"❌ Archivo no permitido o sin nombre: {file.filename}")
+            logger.error("❌ Archivo no permitido o sin nombre: %s", file.filename)
             return jsonify({"error": "Archivo no permitido."}), 400
 
-        # 📌 Guardar archivo en la carpeta de uploads
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(file_path)
-        logger.info(f"📂 Archivo guardado en: {file_path}")
-
         # 📌 Obtener razones sociales
         razones_sociales = request.form.get("razonesSociales", "[]")
         try:
             razones_sociales = json.loads(razones_sociales)
-            logger.info(f"📌 Razones sociales recibidas: {razones_sociales}")
+            logger.info("📌 Razones sociales recibidas: %d", len(razones_sociales))
+            logger.debug("📌 Razones sociales: %s", razones_sociales)
         except json.JSONDecodeError:
             logger.error("❌ Error al decodificar razones sociales.")
             return jsonify({"error": "Formato inválido en razonesSociales."}), 400
 
-        # 📌 Ejecutar el script de generación de PDFs
-        logger.info("🚀 Ejecutando generación de PDFs...")
-        archivos_pdf = generar_pdf_con_python(file_path, PDF_FOLDER, razones_sociales)
-        logger.info(f"📂 Archivos PDF generados: {archivos_pdf}")
+        # 📌 Motor de dibujo de los PDFs ("platypus", "canvas" o "auto")
+        try:
+            renderer = validar_renderer(request.form.get("renderer"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        paralelo = paralelo_formulario()
 
-        if not archivos_pdf:
+        # 📌 Guardar archivo en un directorio propio de esta solicitud
+        work_dir = crear_directorio_trabajo("upload")
+        try:
+            # 🔹 El directorio es exclusivo de la solicitud: sólo importa conservar la extensión
+            file_path = os.path.join(work_dir, f"archivo.{extension_archivo(file.filename)}")
+            file.save(file_path)
+            logger.info("📂 Archivo guardado en: %s", file_path)
+
+            # 📌 Mismo Excel, misma selección y misma plantilla: reenviar el ZIP ya generado
+            clave_cache = cache_zip.clave_upload(file_path, razones_sociales, version_renderer(renderer))
+            zip_cacheado = cache_zip.obtener(clave_cache)
+            if zip_cacheado:
+                eliminar_directorio(work_dir)
+                return send_file(zip_cacheado, mimetype="application/zip", as_attachment=True,
+                                 download_name="reportes.zip")
+
+            # 📌 Generar los PDFs y enviarlos en un ZIP a medida que se generan
+            logger.info("🚀 Ejecutando generación de PDFs...")
+            errores = []
+            response = respuesta_zip_stream(iterar_pdfs_excel(file_path, razones_sociales, renderer=renderer,
+                                                              paralelo=paralelo, errores=errores),
+                                            "reportes.zip",
+                                            cache_clave=clave_cache,
+                                            errores=errores)
+        except Exception:
+            eliminar_directorio(work_dir)
+            raise
+
+        if response is None:
+            eliminar_directorio(work_dir)
             logger.error("❌ No se generaron archivos PDF.")
             return jsonify({"error": "No se generaron archivos PDF."}), 500
 
-        # 📌 Crear ZIP con los PDFs generados
-        zip_file_path = os.path.join(PDF_FOLDER, "reportes.zip")
-        logger.info(f"📌 Creando ZIP en {zip_file_path}")
-        with zipfile.ZipFile(zip_file_path, "w") as zipf:
-            for pdf_file in archivos_pdf:
-                zipf.write(pdf_file, os.path.basename(pdf_file))  # ✅ Solo guarda el nombre del archivo
-
-
-        logger.info("🎉 ZIP generado exitosamente, enviando archivo al cliente...")
-        return send_file(zip_file_path, as_attachment=True)
+        # 🔹 El Excel se sigue leyendo mientras se envía el ZIP: se borra recién al cerrar la respuesta
+        response.call_on_close(lambda: eliminar_directorio(work_dir))
+        logger.info("📦 Enviando ZIP al cliente a medida que se generan los PDFs...")
+        return response
 
     except Exception as e:
-        error_trace = traceback.format_exc()
-        logger.error(f"❌ Error en la generación del ZIP: {str(e)}\n{error_trace}")
+        logger.error("❌ Error en la generación del ZIP: %s", e, exc_info=True)
         return jsonify({"error": f"Error al generar el ZIP: {str(e)}"}), 500
     
     
@@ -135,10 +346,9 @@ def upload_file():
 @uploads_bp.route("/comprobantes", methods=["GET"])
 def get_comprobantes():
     try:
-        db = next(get_db())
-
         razon_social_query = comprobantes_cargados_hoy_razon_social()
-        result = db.execute(razon_social_query).fetchall()
+        with session_scope() as db, medir("sql"):
+            result = db.execute(razon_social_query).fetchall()
 
         razones_sociales = [row.RazonSocial for row in result]
         emails = [row.email for row in result]
@@ -158,132 +368,506 @@ def get_saldo_acumulado():
     try:
         logger.info("📌 Iniciando consulta de saldo acumulado...")
 
-        db = next(get_db())
-
         # 📌 Obtener el parámetro clienteCod desde la URL
         cliente_cod = request.args.get("clienteCod")
         if not cliente_cod:
             logger.warning("⚠️ No se proporcionó clienteCod en la solicitud.")
             return jsonify({"error": "Se requiere el parámetro clienteCod"}), 400
 
-        # 📌 Ejecutar la consulta en la vista de Bejerman con filtro por clienteCod
-        query = text("SELECT * FROM _DL_PBI_EstadoCtaCte_SaldoAcum WHERE clienteCod = :cliente_cod")
-        result = db.execute(query, {"cliente_cod": cliente_cod}).fetchall()
-
-        if not result:
-            logger.warning(f"⚠️ No se encontraron registros para ClienteCod: {cliente_cod}")
+        # 📌 Con `formato=ndjson|json-stream` o con filtros, la respuesta sale en streaming desde el cursor
+        formato = request.args.get("formato")
+        filtros = PARAMETROS_SALDO_STREAM.intersection(request.args)
+        if formato is None and filtros:
+            formato = "json-stream"
+        if formato in FORMATOS_SALDO_STREAM:
+            return respuesta_saldo_stream(cliente_cod, formato, request.args)
+        if formato not in (None, "json"):
+            return jsonify({"error": f"Formato no soportado: {formato}"}), 400
+        if filtros:
+            return jsonify({"error": f"Los parámetros {', '.join(sorted(filtros))} requieren formato=ndjson o json-stream"}), 400
+
+        # 📌 Consultar la vista de Bejerman con filtro por clienteCod (o tomarla del cache)
+        resultado = obtener_saldo_acumulado(cliente_cod)
+
+        if not resultado.filas:
+            logger.warning("⚠️ No se encontraron registros para ClienteCod: %s", cliente_cod)
             return jsonify({"message": "No se encontraron datos para el cliente"}), 404
 
         # 📌 Convertir cada fila en un diccionario
-        datos = [dict(row._mapping) for row in result]  # ✅ Convierte Row en diccionario
+        datos = resultado.registros()
 
-        logger.info(f"✅ Se encontraron {len(datos)} registros para ClienteCod: {cliente_cod}")
+        logger.info("✅ Se encontraron %s registros para ClienteCod: %s", len(datos), cliente_cod)
         return jsonify(datos)
 
     except Exception as e:
-        logger.error(f"❌ Error al obtener saldo acumulado: {str(e)}")
+        logger.error("❌ Error al obtener saldo acumulado: %s", e)
         return jsonify({"error": f"Error al obtener saldo acumulado: {str(e)}"}), 500
 
 
+# 📌 /saldo-acumulado en streaming: NDJSON o un objeto {"datos": [...]} enviado por bloques
+FORMATOS_SALDO_STREAM = {
+    "ndjson": ("application/x-ndjson", generar_ndjson),
+    "json-stream": ("application/json", generar_json),
+}
+PARAMETROS_SALDO_STREAM = {"columnas", "desde", "hasta", "limite", "cursor"}
+
+def _codificar_cursor(fecha, comprobante):
+    """Cursor opaco con la posición (Femision, ComprobanteNro) de la última fila enviada"""
+    tipo = "dt" if isinstance(fecha, datetime) else "d" if isinstance(fecha, date) else "s"
+    valor = fecha if tipo == "s" else fecha.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([tipo, valor, comprobante]).encode()).decode()
+
+def _decodificar_cursor(cursor):
+    try:
+        tipo, valor, comprobante = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if tipo == "dt":
+            valor = datetime.fromisoformat(valor)
+        elif tipo == "d":
+            valor = date.fromisoformat(valor)
+    except (ValueError, TypeError):
+        raise ValueError("cursor inválido")
+    return valor, comprobante
+
+def _opciones_saldo_stream(args):
+    """
+    Valida los parámetros de /saldo-acumulado en streaming.
+
+    - columnas: lista separada por comas (de `COLUMNAS_SALDO_ACUMULADO`, sin distinguir mayúsculas).
+    - desde / hasta: fechas YYYY-MM-DD, ambas inclusive.
+    - limite: filas por página (hasta `SALDO_LIMITE_MAXIMO`).
+    - cursor: `siguienteCursor` devuelto por la página anterior.
+
+    Lanza ValueError con el mensaje para el cliente si algún parámetro no es válido.
+    """
+    opciones = {"columnas": list(COLUMNAS_SALDO_ACUMULADO), "desde": None, "hasta": None,
+                "limite": None, "despues_de": None}
+
+    if args.get("columnas"):
+        disponibles = {col.lower(): col for col in COLUMNAS_SALDO_ACUMULADO}
+        pedidas = [col.strip() for col in args["columnas"].split(",") if col.strip()]
+        invalidas = [col for col in pedidas if col.lower() not in disponibles]
+        if invalidas or not pedidas:
+            raise ValueError(f"Columnas no válidas: {', '.join(invalidas)}. "
+                             f"Disponibles: {', '.join(COLUMNAS_SALDO_ACUMULADO)}")
+        opciones["columnas"] = list(dict.fromkeys(disponibles[col.lower()] for col in pedidas))
+
+    for parametro, dias in (("desde", 0), ("hasta", 1)):
+        if args.get(parametro):
+            try:
+                fecha = date.fromisoformat(args[parametro])
+            except ValueError:
+                raise ValueError(f"{parametro} debe tener el formato YYYY-MM-DD")
+            # 🔹 `hasta` inclusive: se compara contra el inicio del día siguiente
+            opciones[parametro] = datetime.combine(fecha, datetime.min.time()) + timedelta(days=dias)
+
+    if args.get("limite"):
+        try:
+            limite = int(args["limite"])
+        except ValueError:
+            limite = 0
+        if not 1 <= limite <= SALDO_LIMITE_MAXIMO:
+            raise ValueError(f"limite debe ser un entero entre 1 y {SALDO_LIMITE_MAXIMO}")
+        opciones["limite"] = limite
+
+    if args.get("cursor"):
+        opciones["despues_de"] = _decodificar_cursor(args["cursor"])
+
+    return opciones
+
+def respuesta_saldo_stream(cliente_cod, formato, args):
+    """
+    Envía los movimientos de un cliente leyendo el cursor por lotes (`fetchmany`),
+    sin armar la lista completa ni un diccionario por fila.
+
+    La primera tanda se lee antes de responder para que los errores de la consulta
+    todavía puedan devolverse como JSON con código 500. La conexión se libera al
+    terminar o al cerrarse la respuesta (p. ej. si el cliente se desconecta).
+    """
+    try:
+        opciones = _opciones_saldo_stream(args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    columnas = opciones["columnas"]
+    limite = opciones["limite"]
+    paginado = limite is not None or opciones["despues_de"] is not None
+
+    # 🔹 Para armar el cursor siempre se leen Femision y ComprobanteNro (aunque no se envíen)
+    columnas_consulta = columnas + [col for col in ("Femision", "ComprobanteNro") if paginado and col not in columnas]
+    query = saldo_acumulado_filtrado(columnas_consulta, opciones["desde"], opciones["hasta"],
+                                     opciones["despues_de"], limite).execution_options(stream_results=True)
+
+    pila = ExitStack()
+    try:
+        db = pila.enter_context(session_scope())
+        with medir("sql"):  # 🔹 Hasta el primer lote: el resto se lee mientras se envía
+            result = db.execute(query, {"cliente_cod": cliente_cod})
+            lotes = lotes_cursor(result)
+            primero = next(lotes, None)
+    except Exception:
+        pila.close()
+        raise
+
+    enviados = {"filas": 0, "ultima": None}
+
+    def lotes_enviados():
+        with pila:
+            if primero is None:
+                return
+            for filas in itertools.chain([primero], lotes):
+                enviados["filas"] += len(filas)
+                enviados["ultima"] = filas[-1]
+                yield filas
+        logger.info("✅ Se enviaron %s registros para ClienteCod: %s (%s)", enviados['filas'], cliente_cod, formato)
+
+    def siguiente_cursor():
+        # 🔹 Página completa: puede haber más filas después de la última enviada
+        if limite is None or enviados["filas"] < limite:
+            return None
+        ultima = enviados["ultima"]
+        return _codificar_cursor(ultima[columnas_consulta.index("Femision")],
+                                 ultima[columnas_consulta.index("ComprobanteNro")])
+
+    def final():
+        cursor = siguiente_cursor()
+        # 🔹 En NDJSON el cursor va como última línea, sólo si hay otra página
+        if formato == "ndjson" and cursor is None:
+            return None
+        return {"siguienteCursor": cursor}
+
+    mimetype, generador = FORMATOS_SALDO_STREAM[formato]
+    response = Response(generador(codificador_filas(columnas), lotes_enviados(), final), mimetype=mimetype)
+    response.call_on_close(pila.close)
+    return response
+
+# 📌 Hojas del Excel de saldo acumulado: una por cliente, leídas del cache o del cursor por lotes
+def _hojas_saldo_acumulado(codigos):
+    """
+    Genera (nombre_hoja, columnas, lotes) por cliente para `exportar_excel`.
+
+    Los clientes en `cache_saldos` no se consultan; el resto se lee del cursor
+    con `fetchmany` sin armar la lista completa en memoria (por eso no se guardan
+    en el cache). La conexión se abre recién cuando hace falta y se comparte entre
+    todos los clientes. Los clientes sin movimientos se omiten.
+    """
+    with ExitStack() as pila:
+        db = None
+        for codigo in codigos:
+            resultado = cache_saldos.obtener((_clave_cliente(codigo), VENTANA_HISTORICO))
+            if resultado is not None:
+                logger.debug("♻️ Saldo acumulado de ClienteCod %s obtenido del cache", codigo)
+                if resultado.filas:
+                    yield codigo, resultado.columnas, [resultado.filas]
+                continue
+
+            if db is None:
+                db = pila.enter_context(session_scope())
+            query = saldo_acumulado_por_cliente().execution_options(stream_results=True)
+            with medir("sql"):
+                result = db.execute(query, {"cliente_cod": codigo})
+                lotes = lotes_cursor(result)
+                primero = next(lotes, None)
+            if primero is None:
+                continue
+            yield codigo, list(result.keys()), itertools.chain([primero], lotes)
+
+def _respuesta_excel_saldos(codigos, download_name):
+    """Genera el Excel en un directorio temporal y lo envía; None si ningún cliente tiene datos"""
+    from exportar_excel import exportar_excel
+
+    work_dir = crear_directorio_trabajo("excel")
+    try:
+        excel_path = os.path.join(work_dir, download_name)
+        # 🔹 `closing` libera la conexión aunque la escritura falle a mitad de camino
+        with closing(_hojas_saldo_acumulado(codigos)) as hojas_generadas:
+            hojas = exportar_excel(excel_path, hojas_generadas, tmpdir=work_dir)
+        if not hojas:
+            return None
+
+        # 🔹 Con el archivo ya abierto se puede borrar el directorio (send_file no ejecuta `call_on_close`)
+        excel_file = open(excel_path, "rb")
+    finally:
+        eliminar_directorio(work_dir)
+
+    return send_file(excel_file, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                     as_attachment=True, download_name=download_name)
 
 @uploads_bp.route("/saldo-acumulado-excel", methods=["GET"])
 def get_saldo_acumulado_excel():
     try:
         logger.info("📌 Iniciando generación de Excel para saldo acumulado...")
 
-        db = next(get_db())
-
         # 📌 Obtener el parámetro clienteCod desde la URL
         cliente_cod = request.args.get("clienteCod")
         if not cliente_cod:
             logger.warning("⚠️ No se proporcionó clienteCod en la solicitud.")
             return jsonify({"error": "Se requiere el parámetro clienteCod"}), 400
 
-        # 📌 Ejecutar la consulta en la vista de Bejerman con filtro por clienteCod
-        query = text("SELECT * FROM _DL_PBI_EstadoCtaCte_SaldoAcum WHERE clienteCod = :cliente_cod")
-        result = db.execute(query, {"cliente_cod": cliente_cod})
-
-        rows = result.fetchall()
-        if not rows:
-            logger.warning(f"⚠️ No se encontraron registros para ClienteCod: {cliente_cod}")
+        # 📌 Escribir el Excel a medida que se leen las filas de la vista de Bejerman
+        response = _respuesta_excel_saldos([cliente_cod], f"SaldoAcumulado_{cliente_cod}.xlsx")
+        if response is None:
+            logger.warning("⚠️ No se encontraron registros para ClienteCod: %s", cliente_cod)
             return jsonify({"message": "No se encontraron datos para el cliente"}), 404
 
-        # 📌 Obtener nombres de columnas desde `cursor.description`
-        column_names = [col[0] for col in result.cursor.description]
+        # 📌 Devolver el archivo como una descarga
+        logger.info("✅ Excel generado con éxito, enviando archivo...")
+        return response
 
-        # 📌 Convertir filas en listas de valores
-        data = [list(row) for row in rows]  
+    except Exception as e:
+        logger.error("❌ Error al generar Excel: %s", e, exc_info=True)
+        return jsonify({"error": f"Error al generar Excel: {str(e)}"}), 500
 
-        # 📌 Crear un archivo Excel en memoria
-        output = io.BytesIO()
-        workbook = xlsxwriter.Workbook(output, {'in_memory': True})
-        worksheet = workbook.add_worksheet()
+# 📌 Excel con una hoja por cliente
+@uploads_bp.route("/saldo-acumulado-excel", methods=["POST"])
+def get_saldo_acumulado_excel_clientes():
+    try:
+        data = request.get_json(silent=True) or {}
+        codigos = data.get("codigos", [])
 
-        # 📌 Escribir encabezados
-        for col_num, column_name in enumerate(column_names):
-            worksheet.write(0, col_num, column_name)
+        if not codigos or not isinstance(codigos, list):
+            return jsonify({"error": "No se proporcionaron códigos de clientes"}), 400
 
-        # 📌 Escribir los datos
-        for row_num, row_data in enumerate(data, start=1):
-            for col_num, cell_value in enumerate(row_data):
-                worksheet.write(row_num, col_num, cell_value)
+        codigos = list(dict.fromkeys(codigos))  # 🔹 Una sola hoja por cliente
+        logger.info("📌 Iniciando generación de Excel para %s clientes...", len(codigos))
 
-        # 📌 Cerrar el workbook
-        workbook.close()
-        output.seek(0)
+        response = _respuesta_excel_saldos(codigos, "SaldoAcumulado_clientes.xlsx")
+        if response is None:
+            logger.warning("⚠️ No se encontraron registros para ninguno de los clientes.")
+            return jsonify({"message": "No se encontraron datos para los clientes"}), 404
 
-        # 📌 Devolver el archivo como una descarga
         logger.info("✅ Excel generado con éxito, enviando archivo...")
-        return send_file(output, mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                         as_attachment=True, download_name=f"SaldoAcumulado_{cliente_cod}.xlsx")
+        return response
 
     except Exception as e:
-        error_trace = traceback.format_exc()
-        logger.error(f"❌ Error al generar Excel: {str(e)}\n{error_trace}")
+        logger.error("❌ Error al generar Excel: %s", e, exc_info=True)
         return jsonify({"error": f"Error al generar Excel: {str(e)}"}), 500
     
 @uploads_bp.route("/comprobantes-con-saldo", methods=["POST"])
 def get_comprobantes_con_saldo():
+    from jsonSaldoUltimos30DiasAPDF import iterar_pdfs_json
+    from plantilla_pdf import validar_renderer
+
     try:
-        db = next(get_db())
         data = request.get_json()
         codigos = data.get("codigos", [])
 
         if not codigos:
             return jsonify({"error": "No se proporcionaron códigos de clientes"}), 400
 
-        pdf_directory = "./pdfs"
+        try:
+            renderer = validar_renderer(data.get("renderer"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        # 📌 Limpiar la carpeta antes de comenzar
-        if os.path.exists(pdf_directory):
-            shutil.rmtree(pdf_directory)
-        os.makedirs(pdf_directory, exist_ok=True)
+        # 🔹 La conexión vuelve al pool antes de empezar a renderizar y enviar el ZIP
+        saldos = obtener_saldos_ultimos_30_dias(codigos)
 
-        saldos = {}
-        for codigo in codigos:
-            query = text("""
-                SELECT * 
-                FROM _DL_PBI_EstadoCtaCte_SaldoAcum 
-                WHERE clienteCod = :cliente_cod 
-                AND Femision >= DATEADD(DAY, -30, GETDATE())  -- Solo registros de los últimos 30 días
-            """)
-            
-            saldo_result = db.execute(query, {"cliente_cod": codigo}).fetchall()
-            saldos[codigo] = [dict(row._mapping) for row in saldo_result] if saldo_result else []
+        paralelo = bool(data.get("paralelo", PDF_PARALELO))
+        errores = []
+        archivos = iterar_pdfs_json(saldos, paralelo=paralelo, renderer=renderer, errores=errores)
 
-        pdf_files = procesar_json_a_pdf(saldos, pdf_directory)
+        return respuesta_zip_stream(archivos, "comprobantes_con_saldo.zip", permitir_vacio=True, errores=errores)
 
-        zip_filename = os.path.join(pdf_directory, "comprobantes_con_saldo.zip")
-        with zipfile.ZipFile(zip_filename, "w") as zipf:
-            for pdf_file in pdf_files:
-                zipf.write(pdf_file, os.path.basename(pdf_file))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        response = send_file(zip_filename, as_attachment=True, download_name="comprobantes_con_saldo.zip")
 
-        # 📌 Eliminar la carpeta después de completar la generación
-        shutil.rmtree(pdf_directory)
+# 📌 Estado del pool de conexiones para monitoreo
+@uploads_bp.route("/estado-pool", methods=["GET"])
+def get_estado_pool():
+    return jsonify(estadisticas_pool())
 
-        return response
+
+# 📌 Cache de saldos: estadísticas e invalidación manual
+@uploads_bp.route("/cache/saldos", methods=["GET"])
+def get_estado_cache_saldos():
+    return jsonify(cache_saldos.estadisticas())
+
+
+# 📌 PDFs por cliente reutilizados en /comprobantes-con-saldo (hit rate del proceso y ocupación en disco)
+@uploads_bp.route("/cache/pdf", methods=["GET"])
+def get_estado_cache_pdf():
+    return jsonify(cache_pdf.estadisticas())
+
+
+@uploads_bp.route("/cache/saldos/invalidar", methods=["POST"])
+def invalidar_cache_saldos():
+    """
+    Borra del cache los saldos de los clientes en `codigos` (body JSON opcional),
+    o todo el cache si no se envían códigos.
+
+    `eliminadas` cuenta las entradas del proceso que atiende la solicitud (`pid`); el resto
+    de los workers de la instancia aplica la misma invalidación en su próxima lectura
+    (ver `cache_saldos.CacheTTL`).
+    """
+    data = request.get_json(silent=True) or {}
+    codigos = data.get("codigos")
+    if codigos is not None and not isinstance(codigos, list):
+        return jsonify({"error": "codigos debe ser una lista"}), 400
+
+    eliminadas = cache_saldos.invalidar(codigos)
+    logger.info("🧹 Cache de saldos invalidado: %s entradas eliminadas en el proceso %s", eliminadas, os.getpid())
+    return jsonify({"eliminadas": eliminadas, "pid": os.getpid(),
+                    "compartida": bool(cache_saldos.invalidaciones)})
+
+
+# 📌 Antigüedad de deuda de toda la cartera (por cliente y por vendedor), servida desde el agregado en memoria
+@uploads_bp.route("/cartera/antiguedad", methods=["GET"])
+def get_cartera_antiguedad():
+    from cartera import agregado_cartera
+
+    try:
+        vendedor = request.args.get("vendedor")
+        if not vendedor:
+            return Response(agregado_cartera.obtener_json(), mimetype="application/json")
+
+        resumen = agregado_cartera.obtener()
+        return jsonify({
+            **resumen,
+            "clientes": [cliente for cliente in resumen["clientes"] if cliente["Vendedor"] == vendedor],
+            "vendedores": [fila for fila in resumen["vendedores"] if fila["Vendedor"] == vendedor],
+        })
+
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+
+
+@uploads_bp.route("/cartera/antiguedad/refrescar", methods=["POST"])
+def refrescar_cartera_antiguedad():
+    from cartera import agregado_cartera
+
+    if not agregado_cartera.refrescar():
+        return jsonify({"error": f"No se pudo recalcular el resumen de cartera: {agregado_cartera.error}"}), 500
+    return jsonify({"actualizado": agregado_cartera.obtener()["actualizado"],
+                    "duracionSegundos": round(agregado_cartera.duracion, 3)})
+
+
+# 📌 Trabajos en segundo plano: el POST responde enseguida con un id y el avance se consulta aparte
+def _trabajo_upload(trabajo, pdf_directory, work_dir, file_path, razones_sociales, renderer, paralelo):
+    try:
+        return generar_pdf_con_python(file_path, pdf_directory, razones_sociales,
+                                      progreso=trabajo.actualizar_progreso, renderer=renderer, paralelo=paralelo,
+                                      errores=trabajo.errores)
+    finally:
+        eliminar_directorio(work_dir)
+
+
+def _trabajo_comprobantes(trabajo, pdf_directory, codigos, paralelo, renderer):
+    from jsonSaldoUltimos30DiasAPDF import procesar_json_a_pdf
+
+    saldos = obtener_saldos_ultimos_30_dias(codigos)
+    return procesar_json_a_pdf(saldos, pdf_directory, paralelo=paralelo,
+                               progreso=trabajo.actualizar_progreso, renderer=renderer, errores=trabajo.errores)
+
+
+def _respuesta_trabajo_encolado(trabajo):
+    return jsonify({
+        "trabajoId": trabajo.id,
+        "estado": trabajo.estado,
+        "estadoUrl": url_for("uploads.get_estado_trabajo", trabajo_id=trabajo.id),
+    }), 202
+
+
+@uploads_bp.route("/trabajos/upload", methods=["POST"])
+def crear_trabajo_upload():
+    from plantilla_pdf import validar_renderer, version_renderer
+
+    try:
+        if "file" not in request.files:
+            return jsonify({"error": "No se recibió ningún archivo."}), 400
+
+        file = request.files["file"]
+        if file.filename == "" or not allowed_file(file.filename):
+            return jsonify({"error": "Archivo no permitido."}), 400
+
+        try:
+            razones_sociales = json.loads(request.form.get("razonesSociales", "[]"))
+        except json.JSONDecodeError:
+            return jsonify({"error": "Formato inválido en razonesSociales."}), 400
+
+        try:
+            renderer = validar_renderer(request.form.get("renderer"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        paralelo = paralelo_formulario(TRABAJOS_PARALELO)
+
+        # 📌 El archivo se guarda antes de encolar: el trabajo lo borra al terminar
+        work_dir = crear_directorio_trabajo("trabajo_upload")
+        try:
+            file_path = os.path.join(work_dir, f"archivo.{extension_archivo(file.filename)}")
+            file.save(file_path)
+
+            clave_cache = cache_zip.clave_upload(file_path, razones_sociales, version_renderer(renderer))
+            zip_cacheado = cache_zip.obtener(clave_cache)
+            if zip_cacheado:
+                eliminar_directorio(work_dir)
+                with zip_cacheado:
+                    trabajo = administrador_trabajos.registrar_finalizado("upload", "reportes.zip", zip_cacheado)
+                return _respuesta_trabajo_encolado(trabajo)
+
+            trabajo = administrador_trabajos.encolar("upload", "reportes.zip", _trabajo_upload,
+                                                     work_dir, file_path, razones_sociales, renderer, paralelo,
+                                                     cache_clave=clave_cache)
+        except ColaLlenaError as e:
+            eliminar_directorio(work_dir)
+            return jsonify({"error": str(e)}), 503
+        except Exception:
+            eliminar_directorio(work_dir)  # 🔹 El trabajo no llegó a encolarse: nadie más va a borrar el archivo
+            raise
+
+        return _respuesta_trabajo_encolado(trabajo)
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        logger.error("❌ Error al crear el trabajo de upload: %s", e, exc_info=True)
+        return jsonify({"error": f"Error al crear el trabajo: {str(e)}"}), 500
+
+
+@uploads_bp.route("/trabajos/comprobantes-con-saldo", methods=["POST"])
+def crear_trabajo_comprobantes_con_saldo():
+    from plantilla_pdf import validar_renderer
+
+    try:
+        data = request.get_json()
+        codigos = data.get("codigos", [])
+
+        if not codigos:
+            return jsonify({"error": "No se proporcionaron códigos de clientes"}), 400
+
+        paralelo = bool(data.get("paralelo", TRABAJOS_PARALELO))
+        try:
+            renderer = validar_renderer(data.get("renderer"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        try:
+            trabajo = administrador_trabajos.encolar("comprobantes-con-saldo", "comprobantes_con_saldo.zip",
+                                                     _trabajo_comprobantes, codigos, paralelo, renderer)
+        except ColaLlenaError as e:
+            return jsonify({"error": str(e)}), 503
+
+        return _respuesta_trabajo_encolado(trabajo)
+
+    except Exception as e:
+        logger.error("❌ Error al crear el trabajo de comprobantes: %s", e, exc_info=True)
+        return jsonify({"error": f"Error al crear el trabajo: {str(e)}"}), 500
+
+
+@uploads_bp.route("/trabajos/<trabajo_id>", methods=["GET"])
+def get_estado_trabajo(trabajo_id):
+    estado = obtener_estado(trabajo_id)
+    if estado is None:
+        return jsonify({"error": "Trabajo inexistente o expirado"}), 404
+    return jsonify(estado)
+
+
+@uploads_bp.route("/trabajos/<trabajo_id>/descarga", methods=["GET"])
+def descargar_trabajo(trabajo_id):
+    estado = obtener_estado(trabajo_id)
+    if estado is None:
+        return jsonify({"error": "Trabajo inexistente o expirado"}), 404
+
+    zip_path = obtener_zip(trabajo_id)
+    if zip_path is None:
+        return jsonify({"error": "El trabajo todavía no finalizó", "estado": estado["estado"]}), 409
+
+    return send_file(zip_path, as_attachment=True, download_name=estado["nombreZip"])
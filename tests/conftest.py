@@ -0,0 +1,14 @@
+import os
+import sys
+import tempfile
+
+# 🔹 Los módulos de la app están en la raíz del repo (sin paquete)
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+LIBRO_EJEMPLO = os.path.join(RAIZ, "uploads", "Querie_EstadoCuentaUltimos30Dias_Abregu.xlsx")
+
+# 🔹 Las rutas se prueban contra SQLite (ver `database.DATABASE_URL`), nunca contra SQL Server.
+# Con `detect_types=1` las columnas TIMESTAMP vuelven como datetime, igual que con pyodbc.
+BASE_PRUEBAS = os.path.join(tempfile.mkdtemp(prefix="estado_cuenta_pruebas_"), "base.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{BASE_PRUEBAS}?detect_types=1"
@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pandas as pd
+
+from cartera import calcular_resumen
+from procesador import procesar_resultados
+
+HOY = datetime(2025, 3, 1)
+
+
+def test_procesar_resultados_categorias_y_tramos():
+    data = [
+        {"Saldo_Loc": -50.0, "Fecha_vto": "2025-01-01", "Vendedor": ""},
+        {"Saldo_Loc": 100.0, "Fecha_vto": "2025-02-20", "Vendedor": "ANA"},  # 🔹 9 días vencido
+        {"Saldo_Loc": 200.5, "Fecha_vto": "2025-01-15", "Vendedor": "LUIS"},  # 🔹 45 días
+        {"Saldo_Loc": 300.0, "Fecha_vto": "2024-10-01", "Vendedor": ""},  # 🔹 151 días
+        {"Saldo_Loc": 10.0, "Fecha_vto": "2025-03-01", "Vendedor": ""},  # 🔹 Vence hoy a la medianoche: a vencer
+        {"Saldo_Loc": 0, "Fecha_vto": "2025-01-01", "Vendedor": ""},
+    ]
+    resultado = procesar_resultados("CLIENTE A", data, hoy=HOY)
+
+    assert resultado["Crédito a favor (Total_Loc negativos)"] == -50.0
+    assert resultado["Total vencidos"] == 600.5
+    assert resultado["Total a vencer"] == 10.0
+    assert resultado["Total global"] == 560.5
+    assert resultado["Vendedor"] == "ANA"
+    assert resultado["Tramos vencidos"] == {"0-30": 100.0, "31-60": 200.5, "61-90": 0.0, "90+": 300.0}
+    assert resultado["Negativos"] == [data[0]]
+    assert resultado["Vencidos"] == data[1:4]
+    assert resultado["A Vencer"] == [data[4]]
+
+
+def test_procesar_resultados_sin_datos():
+    resultado = procesar_resultados("CLIENTE A", [], hoy=HOY)
+    assert resultado["Total global"] == 0
+    assert resultado["Tramos vencidos"] == {"0-30": 0, "31-60": 0, "61-90": 0, "90+": 0}
+
+
+def test_resumen_de_cartera_por_cliente_y_vendedor():
+    df = pd.DataFrame([
+        ("000001", "CLIENTE A", "ANA", "2025-02-20", 100.0, 0.0),
+        ("000001", "CLIENTE A", "ANA", "2025-04-01", 50.0, -20.0),
+        ("000002", "CLIENTE B", None, "2024-10-01", 300.0, 0.0),
+    ], columns=["ClienteCod", "RazonSocial", "Vendedor", "Fecha_vto", "Saldo_Deudor", "Saldo_Acreedor"])
+    resumen = calcular_resumen(df, hoy=HOY)
+
+    assert resumen["tramos"] == ["0-30", "31-60", "61-90", "90+"]
+    assert resumen["totales"]["clientes"] == 2
+    assert resumen["totales"]["total_global"] == 430.0
+    # 🔹 Ordenados por total_global, de mayor a menor
+    b, a = resumen["clientes"]
+    assert (b["ClienteCod"], b["90+"], b["Vendedor"]) == ("000002", 300.0, "")
+    assert (a["ClienteCod"], a["RazonSocial"], a["credito_a_favor"], a["total_vencidos"], a["total_a_vencer"],
+            a["0-30"]) == ("000001", "CLIENTE A", -20.0, 100.0, 50.0, 100.0)
+    assert {v["Vendedor"]: (v["clientes"], v["total_global"]) for v in resumen["vendedores"]} == \
+        {"ANA": (1, 130.0), "": (1, 300.0)}
@@ -0,0 +1,152 @@
+import os
+from datetime import date
+
+import numpy as np
+
+import cache_pdf
+import cache_saldos
+import cache_zip
+from cache_saldos import CacheTTL
+from estado_cuenta import EstadoCuenta
+from movimientos import Movimientos
+
+
+class _Dia(date):
+    """`date` con `today()` fijo en `_Dia.hoy`, para simular el paso de los días"""
+    hoy = date(2025, 3, 1)
+
+    @classmethod
+    def today(cls):
+        return cls.hoy
+
+
+def _estado(debe=100):
+    movimientos = Movimientos.desde_columnas(["21/01/2025"], ["FC A 00202 00000001"], ["31/01/2025"],
+                                             ["9 DIAS"], [debe], [0], [debe])
+    return EstadoCuenta("000001", "CLIENTE A", movimientos, 1)
+
+
+def test_clave_upload_cambia_con_excel_seleccion_version_y_dia(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_zip, "date", _Dia)
+    excel = tmp_path / "libro.xlsx"
+    excel.write_bytes(b"contenido")
+    clave = cache_zip.clave_upload(str(excel), ["B", "A"], "3")
+
+    # 🔹 La selección no depende del orden ni de los duplicados
+    assert cache_zip.clave_upload(str(excel), ["A", "B", "A"], "3") == clave
+    assert cache_zip.clave_upload(str(excel), ["A"], "3") != clave
+    assert cache_zip.clave_upload(str(excel), ["A", "B"], "4") != clave
+
+    excel.write_bytes(b"otro contenido")
+    assert cache_zip.clave_upload(str(excel), ["A", "B"], "3") != clave
+    excel.write_bytes(b"contenido")
+    monkeypatch.setattr(_Dia, "hoy", date(2025, 3, 2))
+    assert cache_zip.clave_upload(str(excel), ["A", "B"], "3") != clave
+
+
+def test_guardar_stream_descarta_incompletos(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_zip, "CACHE_ZIP_DIR", str(tmp_path))
+    assert b"".join(cache_zip.guardar_stream("a", iter([b"PK", b"fin"]))) == b"PKfin"
+    assert b"".join(cache_zip.guardar_stream("b", iter([b"PK"]), descartar=lambda: True)) == b"PK"
+    cortado = cache_zip.guardar_stream("c", iter([b"PK", b"fin"]))
+    next(cortado)
+    cortado.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.zip"]
+    with cache_zip.obtener("a") as f:
+        assert f.read() == b"PKfin"
+    assert cache_zip.obtener("b") is None
+
+
+def test_zip_obtenido_sobrevive_a_la_poda(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_zip, "CACHE_ZIP_DIR", str(tmp_path))
+    monkeypatch.setattr(cache_zip, "CACHE_ZIP_MAX_ARCHIVOS", 1)
+    b"".join(cache_zip.guardar_stream("a", iter([b"PKa"])))
+
+    with cache_zip.obtener("a") as f:
+        # 🔹 Otra solicitud guarda un ZIP nuevo y la poda borra "a" antes de enviarlo
+        os.utime(tmp_path / "a.zip", (0, 0))
+        b"".join(cache_zip.guardar_stream("b", iter([b"PKb"])))
+        assert not (tmp_path / "a.zip").exists()
+        assert f.read() == b"PKa"
+    assert cache_zip.obtener("a") is None
+
+
+def test_huella_pdf_cambia_con_movimientos_version_y_dia(monkeypatch):
+    monkeypatch.setattr(cache_pdf, "date", _Dia)
+    estado = _estado()
+    huella = cache_pdf.huella(estado.clave, "3", estado.partes_huella())
+
+    assert cache_pdf.huella(estado.clave, "3", _estado().partes_huella()) == huella
+    assert cache_pdf.huella(estado.clave, "3", _estado(debe=101).partes_huella()) != huella
+    assert cache_pdf.huella(estado.clave, "4", estado.partes_huella()) != huella
+    assert cache_pdf.huella("000002", "3", estado.partes_huella()) != huella
+    monkeypatch.setattr(_Dia, "hoy", date(2025, 3, 2))
+    assert cache_pdf.huella(estado.clave, "3", estado.partes_huella()) != huella
+
+
+def test_cache_pdf_desaloja_el_menos_usado(tmp_path):
+    cache = cache_pdf.CachePDF(directorio=str(tmp_path), max_mb=1)
+    contenido = np.zeros(400 * 1024, dtype=np.uint8).tobytes()
+    for antiguedad, clave in ((200, "a"), (100, "b")):
+        cache.guardar(clave, contenido)
+        os.utime(cache._ruta(clave), (antiguedad, antiguedad))
+    assert cache.obtener("a") == contenido  # 🔹 "a" pasa a ser el más reciente
+    cache.guardar("c", contenido)  # 🔹 Supera el máximo: se poda al guardar
+
+    assert cache.contiene("a") and cache.contiene("c")
+    assert not cache.contiene("b")
+
+
+def test_cache_saldos_vencimiento(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(cache_saldos.time, "monotonic", lambda: ahora[0])
+    cache = CacheTTL(ttl=60, max_entradas=10)
+    cache.guardar(("000001", 30), "saldos")
+
+    ahora[0] += 59
+    assert cache.obtener(("000001", 30)) == "saldos"
+    ahora[0] += 2
+    assert cache.obtener(("000001", 30)) is None
+    assert cache.estadisticas()["entradas"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_saldos_lru_e_invalidar():
+    cache = CacheTTL(ttl=60, max_entradas=2)
+    cache.guardar(("000001", 30), 1)
+    cache.guardar(("000002", 30), 2)
+    cache.obtener(("000001", 30))  # 🔹 El menos usado pasa a ser "000002"
+    cache.guardar(("000003", 30), 3)
+    assert cache.obtener(("000002", 30)) is None
+    assert cache.obtener(("000001", 30)) == 1
+
+    cache.guardar(("000001", 45), 4)
+    assert cache.invalidar([" 000001 "]) == 2
+    assert cache.obtener(("000003", 30)) is None  # 🔹 Desalojado al guardar la ventana de 45 días
+    cache.guardar(("000004", 30), 5)
+    assert cache.invalidar() == 1
+
+
+def test_cache_saldos_invalidacion_compartida_entre_procesos(tmp_path):
+    # 🔹 Dos workers de gunicorn: cada uno con sus datos, el mismo archivo de invalidaciones
+    ruta = str(tmp_path / "invalidaciones")
+    worker_a, worker_b = (CacheTTL(ttl=60, invalidaciones=ruta) for _ in range(2))
+    for worker in (worker_a, worker_b):
+        for cliente in ("000001", "000002", "000003"):
+            worker.guardar((cliente, 30), cliente)
+
+    assert worker_a.invalidar(["000001"]) == 1
+    assert worker_b.obtener(("000001", 30)) is None
+    assert worker_b.obtener(("000002", 30)) == "000002"
+
+    assert worker_b.invalidar() == 2
+    assert worker_a.obtener(("000002", 30)) is None
+    assert worker_a.estadisticas()["entradas"] == 0
+
+    # 🔹 Un worker nuevo (o que nunca leyó el archivo) no borra lo que guarde después
+    worker_c = CacheTTL(ttl=60, invalidaciones=ruta)
+    worker_c.guardar(("000004", 30), "000004")
+    assert worker_c.obtener(("000004", 30)) == "000004"
+    worker_a.invalidar(["000004"])
+    assert worker_c.obtener(("000004", 30)) is None
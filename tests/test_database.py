@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("url", ["sqlite:///:memory:", "sqlite://"])
+def test_engine_sin_queue_pool(url):
+    # 🔹 En un proceso aparte: `database` arma el engine al importarse
+    codigo = ("import json, database\n"
+              "from sqlalchemy import text\n"
+              "with database.session_scope() as db:\n"
+              "    assert db.execute(text('SELECT 1')).scalar() == 1\n"
+              "print(json.dumps(database.estadisticas_pool()))")
+    salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, env={**os.environ, "DATABASE_URL": url},
+                            capture_output=True, text=True, check=True).stdout
+    estadisticas = json.loads(salida.strip().splitlines()[-1])
+    assert (estadisticas["pool_size"], estadisticas["checkouts"]) == (None, 1)
+
+
+def test_engine_con_queue_pool():
+    import database
+
+    # 🔹 El SQLite en archivo de conftest usa `QueuePool`: se le pasan las opciones del pool
+    assert database.estadisticas_pool()["pool_size"] == database.DB_POOL_SIZE
+    assert database.engine.pool.size() == database.DB_POOL_SIZE
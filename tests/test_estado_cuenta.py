@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+import estado_cuenta
+from cache_pdf import cache_pdf
+from estado_cuenta import DISENOS, crear_plantilla, desde_libro, filas_estado, iterar_pdfs, particionar, renderizar
+from formato import formatear_dias
+from movimientos import Movimientos
+
+CSV = """RazonSocial,Femision,ComprobanteNro,FechaVto,CondVta,Debe_Loc,Haber_Loc,SaldoAcum_Loc
+CLIENTE A,21/01/2025,FC A 00202 00000001,31/01/2025,9 DIAS,100,0,100
+CLIENTE B,03/02/2025,FC A 00202 00000002,05/03/2025,9 DIAS,200,0,200
+CLIENTE C,01/01/2025,FC A 00202 00000003,01/01/2025,9 DIAS,1,0,1
+"""
+
+# 🔹 (cliente, emisión, comprobante): "RT R" es remito sólo para "libro", "RT X" sólo para "saldos"
+LOTE = [
+    (1, "10/01/2025", "FC A 00202 00000001"),
+    (0, "05/01/2025", "FC A 00202 00000100"),
+    (0, None, "NC A 00202 00000003"),
+    (0, "05/01/2025", "FC A 00203 00000099"),
+    (0, "01/01/2025", "RT R 0001 00000005"),
+    (0, "02/01/2025", "RT X 0001 00000007"),
+    (0, "03/01/2025", "XRT R 0001 00000008"),
+]
+
+
+def _particionar(diseno):
+    cliente, femision, comprobante = zip(*LOTE)
+    movimientos = Movimientos.desde_columnas(femision, comprobante, femision, ["9 DIAS"] * len(LOTE),
+                                             [1] * len(LOTE), [0] * len(LOTE), [1] * len(LOTE))
+    return particionar(movimientos, cliente, ["C0", "C1", "C2"], ["Cliente 0", "Cliente 1", "Cliente 2"], diseno)
+
+
+def _partes(estado):
+    return [list(zip(formatear_dias(parte.femision), parte.textos("comprobante").tolist()))
+            for parte in (estado.deuda, estado.remitos)]
+
+
+@pytest.mark.parametrize("diseno, deuda, remitos", [
+    ("libro",
+     [("02/01/2025", "RT X 0001 00000007"), ("05/01/2025", "FC 00203 00000099"),
+      ("05/01/2025", "FC 00202 00000100"), ("", "NC 00202 00000003")],
+     [("01/01/2025", "RT R 0001 00000005"), ("03/01/2025", "XRT R 0001 00000008")]),
+    ("saldos",
+     [("03/01/2025", "XRT R 0001 00000008"), ("05/01/2025", "FC 00203 00000099"),
+      ("05/01/2025", "FC 00202 00000100"), ("", "NC 00202 00000003")],
+     [("01/01/2025", "RT R 0001 00000005"), ("02/01/2025", "RT X 0001 00000007")]),
+])
+def test_particionar_orden_y_partes(diseno, deuda, remitos):
+    estados = _particionar(diseno)
+
+    # 🔹 Orden de `claves`, sin el cliente que no tiene movimientos
+    assert [(estado.clave, estado.razon_social) for estado in estados] == [("C0", "Cliente 0"), ("C1", "Cliente 1")]
+    # 🔹 Por emisión (las fechas vacías al final) y, el mismo día, por número de comprobante
+    assert _partes(estados[0]) == [deuda, remitos]
+    assert estados[0].corte == len(deuda)
+    assert _partes(estados[1]) == [[("10/01/2025", "FC 00202 00000001")], []]
+
+
+@pytest.mark.parametrize("renderer", ["platypus", "canvas"])
+@pytest.mark.parametrize("diseno", ["libro", "saldos"])
+def test_cliente_sin_remitos_o_sin_deuda(diseno, renderer):
+    # 🔹 "C0" sólo tiene deuda y "C1" sólo remitos: la parte vacía no se imprime
+    movimientos = Movimientos.desde_columnas(["10/01/2025", "11/01/2025"],
+                                             ["FC A 00202 00000001", "RT R 0001 00000005"], ["20/01/2025", None], ["9 DIAS"] * 2, [100, 50], [0, 0], [100, 150])
+    sin_remitos, sin_deuda = particionar(movimientos, [0, 1], ["C0", "C1"], ["Cliente 0", "Cliente 1"], diseno)
+    plantilla = crear_plantilla(diseno)
+
+    for estado, vacia, titulo_ausente in ((sin_remitos, 1, plantilla.titulo_parte2),
+                                          (sin_deuda, 0, plantilla.titulo_parte1)):
+        partes = filas_estado(estado, diseno)
+        assert len(partes[vacia]) == 0 and len(partes[1 - vacia]) == 1
+        textos = [argumentos[0] for tipo, *argumentos in DISENOS[diseno]["bloques"](plantilla, estado, *partes)
+                  if tipo == "texto"]
+        assert titulo_ausente not in textos
+
+        nombre, contenido = renderizar(estado, diseno, plantilla, renderer=renderer)
+        assert nombre == estado.nombre_archivo and contenido.startswith(b"%PDF")
+
+
+@pytest.fixture
+def estados(tmp_path, monkeypatch):
+    # 🔹 Sin cache de PDFs: cada cliente se renderiza en todas las pruebas
+    monkeypatch.setattr(cache_pdf, "max_bytes", 0)
+    ruta = tmp_path / "movimientos.csv"
+    ruta.write_text(CSV, encoding="utf-8")
+    return desde_libro(str(ruta), ["CLIENTE A", "CLIENTE B", "CLIENTE C"])
+
+
+def test_serie_omite_y_reporta_el_cliente_que_falla(estados, monkeypatch):
+    renderizar = estado_cuenta.renderizar
+
+    def falla_b(estado, *args, **kwargs):
+        if estado.clave == "CLIENTE B":
+            raise ValueError("dato inválido")
+        return renderizar(estado, *args, **kwargs)
+
+    monkeypatch.setattr(estado_cuenta, "renderizar", falla_b)
+    errores, avance = [], []
+    pdfs = list(iterar_pdfs(estados, "libro", progreso=lambda procesados, total: avance.append(procesados),
+                            errores=errores))
+
+    assert [nombre for nombre, _ in pdfs] == [estados[0].nombre_archivo, estados[2].nombre_archivo]
+    assert all(contenido.startswith(b"%PDF") for _, contenido in pdfs)
+    assert errores == [{"cliente": "CLIENTE B", "error": "dato inválido"}]
+    assert avance == [1, 2, 3]
+
+
+def test_pool_roto_sigue_en_este_proceso(estados, monkeypatch):
+    # 🔹 Los procesos hijos mueren al iniciar (como si los matara el OOM killer)
+    monkeypatch.setattr(estado_cuenta, "_iniciar_proceso", lambda diseno: os._exit(1))
+    errores = []
+    pdfs = list(iterar_pdfs(estados, "libro", paralelo=True, max_workers=2, errores=errores))
+
+    assert [nombre for nombre, _ in pdfs] == [estado.nombre_archivo for estado in estados]
+    assert errores == []
+    assert all(contenido.startswith(b"%PDF") for _, contenido in pdfs)
@@ -0,0 +1,26 @@
+from estado_cuenta import desde_libro, filas_estado
+from ingesta import leer_movimientos
+
+CSV = """RazonSocial,Femision,ComprobanteNro,FechaVto,CondVta,Debe_Loc,Haber_Loc,SaldoAcum_Loc,Otra
+CLIENTE A,03/02/2025,FC A 00202 00000002,05/03/2025,9 DIAS,200,0,300,x
+CLIENTE A,21/01/2025,FC A 00202 00000001,31/01/2025,9 DIAS,100,0,100,x
+CLIENTE B,01/01/2025,FC A 00202 00000003,01/01/2025,9 DIAS,1,0,1,x
+"""
+
+
+def test_csv_columnas_y_razones(tmp_path):
+    ruta = tmp_path / "movimientos.csv"
+    ruta.write_text(CSV, encoding="utf-8")
+    df = leer_movimientos(str(ruta), ["CLIENTE A"])
+    assert "Otra" not in df.columns
+    assert df["RazonSocial"].tolist() == ["CLIENTE A", "CLIENTE A"]
+    assert df["Femision"].tolist() == ["03/02/2025", "21/01/2025"]
+
+
+def test_csv_fecha_ambigua_dia_primero(tmp_path):
+    ruta = tmp_path / "movimientos.csv"
+    ruta.write_text(CSV, encoding="utf-8")
+    (estado,) = desde_libro(str(ruta), ["CLIENTE A"])
+    filas_deuda, _ = filas_estado(estado, "libro")
+    # 🔹 03/02/2025 es 3 de febrero: va después del 21 de enero
+    assert [(fila[0], fila[2]) for fila in filas_deuda] == [("21/01/2025", "31/01/2025"), ("03/02/2025", "05/03/2025")]
@@ -0,0 +1,66 @@
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from conftest import LIBRO_EJEMPLO
+from estado_cuenta import desde_libro, filas_movimientos
+from formato import formatear_dias
+from movimientos import DIA_NULO, Movimientos, a_centavos, a_dias, a_subcentavos
+
+
+def test_a_dias_texto_dia_primero():
+    fechas = ["21/01/2025", "03/02/2025", "31/01/2025", "2025-02-04", None]
+    assert formatear_dias(a_dias(fechas)) == ["21/01/2025", "03/02/2025", "31/01/2025", "04/02/2025", ""]
+
+
+def test_desde_libro_fechas_como_en_la_hoja():
+    libro = load_workbook(LIBRO_EJEMPLO, read_only=True)
+    filas = libro.worksheets[0].iter_rows(values_only=True)
+    encabezado = next(filas)
+    razon, emision, vencimiento = (encabezado.index(col) for col in ("RazonSocial", "Femision", "FechaVto"))
+    esperadas = {}
+    for fila in filas:
+        esperadas.setdefault(fila[razon], Counter())[(fila[emision], fila[vencimiento])] += 1
+    libro.close()
+
+    estados = desde_libro(LIBRO_EJEMPLO, list(esperadas))
+    assert [estado.clave for estado in estados] == list(esperadas)
+    for estado in estados:
+        movimientos = estado.movimientos
+        impresas = zip(formatear_dias(movimientos.femision), formatear_dias(movimientos.vencimiento))
+        assert Counter(impresas) == esperadas[estado.clave], estado.clave
+        # 🔹 Cada parte queda ordenada por día de emisión
+        for parte in (estado.deuda, estado.remitos):
+            assert np.all(np.diff(parte.femision) >= 0)
+            assert not np.any(parte.femision == DIA_NULO)
+
+
+def test_a_dias_datetime_date_y_nulos():
+    fechas = [datetime(2025, 1, 21, 15, 30), date(2025, 2, 3), None, pd.NaT, "basura"]
+    assert formatear_dias(a_dias(fechas)) == ["21/01/2025", "03/02/2025", "", "", ""]
+    assert a_dias([datetime(1970, 1, 2)]).tolist() == [1]
+
+
+def test_a_centavos_tipos_y_redondeo():
+    importes = [1234.5, Decimal("10.25"), "2.5", None, float("nan"), "x", 0.125]
+    assert a_centavos(importes).tolist() == [123450, 1025, 250, 0, 0, 0, 12]
+    # 🔹 A medio centavo se redondea como `format(importe, ".2f")` (el valor binario, no el decimal escrito)
+    medios = [0.015, 2.675, -1234.565, 999999.995, 1.005]
+    assert a_centavos(medios).tolist() == [int(format(v, ".2f").replace(".", "")) for v in medios]
+    assert a_centavos(medios).tolist() == [1, 267, -123457, 99999999, 100]
+    assert a_centavos([]).dtype == np.int64
+
+
+def test_importes_de_menos_de_medio_centavo():
+    importes = [0.001, -0.001, 0.004, -0.004, -0.0, 0, None, 0.01]
+    assert a_subcentavos(importes).tolist() == [1, -1, 1, -1, 0, 0, 0, 0]
+    # 🔹 Como el formato anterior: no son 0, así que se imprimen aunque redondeen a 0 centavos
+    movimientos = Movimientos.desde_columnas([None] * 8, ["FC"] * 8, [None] * 8, [""] * 8, importes, importes,
+                                             importes)
+    debe, _, saldo = zip(*(fila[4:] for fila in filas_movimientos(movimientos, saldo_cero="0,00")))
+    assert list(debe) == ["0,00", "-0,00", "0,00", "-0,00", "", "", "", "0,01"]
+    assert list(saldo) == ["0,00", "-0,00", "0,00", "-0,00", "0,00", "0,00", "0,00", "0,01"]
@@ -0,0 +1,94 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from conftest import BASE_PRUEBAS
+from queries import COLUMNAS_SALDO_ACUMULADO
+
+# 🔹 Dos movimientos el mismo día: la página se corta entre ellos y sólo el número de comprobante los ordena
+MOVIMIENTOS = [
+    ("000001", datetime(2025, 1, 5), "FC A 00202 00000002"),
+    ("000001", datetime(2025, 1, 3), "FC A 00202 00000001"),
+    ("000001", datetime(2025, 1, 5), "FC A 00202 00000001"),
+    ("000001", datetime(2025, 1, 9), "RC R 00001 00000004"),
+    ("000001", datetime(2025, 1, 5), "FC A 00202 00000003"),
+    ("000002", datetime(2025, 1, 4), "FC A 00202 00000009"),
+]
+ORDENADOS = sorted((fecha.isoformat(), comprobante) for cliente, fecha, comprobante in MOVIMIENTOS
+                   if cliente == "000001")
+
+
+def _texto(fecha):
+    # 🔹 Mismo texto con que SQLAlchemy envía un datetime a SQLite (con microsegundos): así compara el cursor
+    return fecha.isoformat(" ", "microseconds")
+
+
+@pytest.fixture(scope="module")
+def cliente_http():
+    tipos = {"Femision": "TIMESTAMP", "FechaVto": "TIMESTAMP", "Debe_Loc": "REAL", "Haber_Loc": "REAL",
+             "SaldoAcum_Loc": "REAL"}
+    conexion = sqlite3.connect(BASE_PRUEBAS)
+    try:
+        conexion.execute("DROP TABLE IF EXISTS _DL_PBI_EstadoCtaCte_SaldoAcum")
+        conexion.execute("CREATE TABLE _DL_PBI_EstadoCtaCte_SaldoAcum ("
+                         + ", ".join(f"{col} {tipos.get(col, 'TEXT')}" for col in COLUMNAS_SALDO_ACUMULADO) + ")")
+        conexion.executemany(
+            "INSERT INTO _DL_PBI_EstadoCtaCte_SaldoAcum VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(cliente, "CLIENTE", _texto(fecha), comprobante, _texto(fecha), "9 DIAS", 1.0, 0.0, 1.0)
+             for cliente, fecha, comprobante in MOVIMIENTOS],
+        )
+        conexion.commit()
+    finally:
+        conexion.close()
+
+    from app import app
+    return app.test_client()
+
+
+def _paginas(cliente_http, formato, **parametros):
+    """Recorre todas las páginas siguiendo `siguienteCursor`; retorna (páginas, filas)"""
+    paginas, filas, cursor = 0, [], None
+    while True:
+        consulta = {"clienteCod": "000001", "formato": formato, **parametros}
+        if cursor:
+            consulta["cursor"] = cursor
+        respuesta = cliente_http.get("/api/saldo-acumulado", query_string=consulta)
+        assert respuesta.status_code == 200
+        paginas += 1
+        if formato == "ndjson":
+            lineas = [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+            cursor = lineas.pop()["siguienteCursor"] if lineas and "siguienteCursor" in lineas[-1] else None
+        else:
+            cuerpo = respuesta.get_json()
+            lineas, cursor = cuerpo["datos"], cuerpo["siguienteCursor"]
+        filas += lineas
+        if cursor is None:
+            return paginas, filas
+
+
+@pytest.mark.parametrize("formato", ["ndjson", "json-stream"])
+def test_paginas_por_keyset(cliente_http, formato):
+    paginas, filas = _paginas(cliente_http, formato, limite=2, columnas="Femision,ComprobanteNro")
+
+    # 🔹 La última página vino completa: hace falta una más (vacía) para saber que no hay más filas
+    assert paginas == 3
+    assert [(fila["Femision"], fila["ComprobanteNro"]) for fila in filas] == ORDENADOS
+
+
+def test_paginas_con_columnas_y_rango(cliente_http):
+    paginas, filas = _paginas(cliente_http, "json-stream", limite=1, columnas="comprobantenro",
+                              desde="2025-01-05", hasta="2025-01-05")
+
+    # 🔹 Femision no se pidió: se lee para armar el cursor pero no se envía
+    assert paginas == 4
+    assert filas == [{"ComprobanteNro": f"FC A 00202 0000000{n}"} for n in (1, 2, 3)]
+
+
+def test_parametros_invalidos(cliente_http):
+    for parametros in ({"limite": "0"}, {"cursor": "no-es-un-cursor"}, {"columnas": "Clave"},
+                       {"desde": "05/01/2025"}):
+        respuesta = cliente_http.get("/api/saldo-acumulado",
+                                     query_string={"clienteCod": "000001", "formato": "ndjson", **parametros})
+        assert respuesta.status_code == 400, parametros
@@ -0,0 +1,179 @@
+import json
+import os
+import time
+import uuid
+import zipfile
+import threading
+
+import pytest
+
+import trabajos
+
+
+@pytest.fixture(autouse=True)
+def directorio_trabajos(tmp_path, monkeypatch):
+    monkeypatch.setattr(trabajos, "TRABAJOS_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _envejecer(trabajo, **campos):
+    """Reescribe campos de `estado.json` como si el trabajo fuera de hace tiempo"""
+    ruta = os.path.join(trabajo.directorio, "estado.json")
+    with open(ruta, encoding="utf-8") as f:
+        estado = json.load(f)
+    estado.update(campos)
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+
+
+def test_limpiar_vencidos_trabajos_abandonados():
+    hace_mucho = time.time() - trabajos.TRABAJOS_ABANDONO_SEGUNDOS - 60
+    abandonado, activo = trabajos.Trabajo("upload", "a.zip"), trabajos.Trabajo("upload", "b.zip")
+    for trabajo in (abandonado, activo):
+        trabajo.guardar()
+    _envejecer(abandonado, estado=trabajos.PROCESANDO, creado=hace_mucho, actualizado=hace_mucho)
+
+    trabajos.limpiar_vencidos()
+    assert not os.path.exists(abandonado.directorio)
+    assert trabajos.obtener_estado(activo.id)["estado"] == trabajos.EN_COLA
+
+
+def test_limpiar_vencidos_terminados_y_sin_estado():
+    terminado = trabajos.Trabajo("upload", "a.zip")
+    terminado.guardar()
+    _envejecer(terminado, estado=trabajos.FINALIZADO, finalizado=time.time() - trabajos.TRABAJOS_TTL_SEGUNDOS - 60)
+    # 🔹 Directorio creado pero el proceso murió antes de escribir estado.json
+    sin_estado = trabajos.Trabajo("upload", "b.zip")
+    viejo = time.time() - trabajos.TRABAJOS_ABANDONO_SEGUNDOS - 60
+    os.utime(sin_estado.directorio, (viejo, viejo))
+
+    trabajos.limpiar_vencidos()
+    assert not os.path.exists(terminado.directorio)
+    assert not os.path.exists(sin_estado.directorio)
+
+
+def test_encolar_no_deja_directorio_si_falla(directorio_trabajos, monkeypatch):
+    def falla(self):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(trabajos.Trabajo, "guardar", falla)
+    administrador = trabajos.AdministradorTrabajos(workers=1, max_en_cola=1)
+    with pytest.raises(OSError):
+        administrador.encolar("upload", "a.zip", lambda trabajo, directorio: [])
+    with pytest.raises(OSError):
+        administrador.registrar_finalizado("upload", "a.zip", str(directorio_trabajos / "no_existe.zip"))
+    assert os.listdir(directorio_trabajos) == []
+
+
+def _esperar(trabajo, estados=(trabajos.FINALIZADO, trabajos.ERROR)):
+    for _ in range(200):
+        estado = trabajos.obtener_estado(trabajo.id)
+        if estado and estado["estado"] in estados:
+            return estado
+        time.sleep(0.02)
+    raise AssertionError(f"El trabajo {trabajo.id} no llegó a {estados}")
+
+
+def _generar(trabajo, pdf_directory, nombres, fallidos=()):
+    os.makedirs(pdf_directory)
+    rutas = []
+    for nombre in nombres:
+        rutas.append(os.path.join(pdf_directory, nombre))
+        with open(rutas[-1], "wb") as f:
+            f.write(b"%PDF")
+    trabajo.errores.extend({"cliente": cliente, "error": "falló"} for cliente in fallidos)
+    trabajo.actualizar_progreso(len(nombres), len(nombres) + len(fallidos))
+    return rutas
+
+
+def test_trabajo_finalizado_con_zip_y_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(trabajos.cache_zip, "CACHE_ZIP_DIR", str(tmp_path / "cache"))
+    administrador = trabajos.AdministradorTrabajos(workers=1, max_en_cola=2)
+    completo = administrador.encolar("upload", "a.zip", _generar, ["a.pdf", "b.pdf"], cache_clave="completo")
+    parcial = administrador.encolar("upload", "b.zip", _generar, ["a.pdf"], ["C2"], cache_clave="parcial")
+
+    estado = _esperar(completo)
+    assert (estado["estado"], estado["procesados"], estado["total"], estado["errores"]) == ("finalizado", 2, 2, [])
+    with zipfile.ZipFile(trabajos.obtener_zip(completo.id)) as zipf:
+        assert sorted(zipf.namelist()) == ["a.pdf", "b.pdf"]
+    assert not os.path.exists(os.path.join(completo.directorio, "pdfs"))
+
+    # 🔹 Con clientes fallidos el trabajo termina igual, pero su ZIP no se reutiliza
+    estado = _esperar(parcial)
+    assert (estado["estado"], estado["errores"]) == ("finalizado", [{"cliente": "C2", "error": "falló"}])
+    with trabajos.cache_zip.obtener("completo") as f:
+        assert f.read().startswith(b"PK")
+    assert trabajos.cache_zip.obtener("parcial") is None
+
+
+def test_trabajo_con_error():
+    def falla(trabajo, pdf_directory):
+        raise RuntimeError("sin conexión")
+
+    administrador = trabajos.AdministradorTrabajos(workers=1, max_en_cola=1)
+    trabajo = administrador.encolar("comprobantes-con-saldo", "a.zip", falla)
+    estado = _esperar(trabajo)
+    assert (estado["estado"], estado["error"]) == ("error", "sin conexión")
+    assert estado["finalizado"] is not None
+    assert trabajos.obtener_zip(trabajo.id) is None
+
+
+def test_cola_llena_y_ids_invalidos():
+    liberar = threading.Event()
+
+    def esperar(trabajo, pdf_directory):
+        liberar.wait(5)
+        return []
+
+    administrador = trabajos.AdministradorTrabajos(workers=1, max_en_cola=1)
+    try:
+        en_proceso = administrador.encolar("upload", "a.zip", esperar)
+        _esperar(en_proceso, (trabajos.PROCESANDO,))
+        en_cola = administrador.encolar("upload", "b.zip", esperar)
+        with pytest.raises(trabajos.ColaLlenaError):
+            administrador.encolar("upload", "c.zip", esperar)
+        assert trabajos.obtener_estado(en_cola.id)["estado"] == trabajos.EN_COLA
+        assert trabajos.obtener_zip(en_cola.id) is None
+    finally:
+        liberar.set()
+    assert _esperar(en_cola)["estado"] == trabajos.FINALIZADO
+    assert len(os.listdir(trabajos.TRABAJOS_DIR)) == 2  # 🔹 El rechazado no deja directorio
+
+    assert trabajos.obtener_estado("../../etc") is None
+    assert trabajos.obtener_zip(uuid.uuid4().hex) is None
+
+
+@pytest.mark.parametrize("abierto", [False, True])
+def test_registrar_finalizado_desde_cache(tmp_path, abierto):
+    zip_cacheado = tmp_path / "cacheado.zip"
+    with zipfile.ZipFile(zip_cacheado, "w") as zipf:
+        zipf.writestr("a.pdf", b"%PDF")
+
+    administrador = trabajos.AdministradorTrabajos()
+    if abierto:
+        # 🔹 Como lo devuelve `cache_zip.obtener`
+        with open(zip_cacheado, "rb") as f:
+            trabajo = administrador.registrar_finalizado("upload", "a.zip", f)
+    else:
+        trabajo = administrador.registrar_finalizado("upload", "a.zip", str(zip_cacheado))
+    assert trabajos.obtener_estado(trabajo.id)["estado"] == trabajos.FINALIZADO
+    with open(trabajos.obtener_zip(trabajo.id), "rb") as f:
+        assert f.read() == zip_cacheado.read_bytes()
+
+
+def test_progreso_se_guarda_cada_n_clientes_y_al_final(monkeypatch):
+    monkeypatch.setattr(trabajos, "TRABAJOS_PROGRESO_CLIENTES", 10)
+    monkeypatch.setattr(trabajos, "TRABAJOS_PROGRESO_SEGUNDOS", 3600)
+    trabajo = trabajos.Trabajo("upload", "a.zip")
+    guardados, guardar = [], trabajo.guardar
+
+    def registrar():
+        guardados.append(trabajo.procesados)
+        guardar()
+
+    monkeypatch.setattr(trabajo, "guardar", registrar)
+    for procesados in range(1, 26):
+        trabajo.actualizar_progreso(procesados, 25)
+
+    assert guardados == [10, 20, 25]
+    assert trabajos.obtener_estado(trabajo.id)["procesados"] == 25
@@ -0,0 +1,289 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import zipfile
+import logging
+import tempfile
+import threading
+import cache_zip
+from metricas import medir
+
+logger = logging.getLogger(__name__)
+
+# 📌 Configuración de los trabajos en segundo plano
+TRABAJOS_WORKERS = max(1, int(os.getenv("TRABAJOS_WORKERS", 1)))  # Trabajos en ejecución simultánea por proceso
+TRABAJOS_MAX_EN_COLA = max(1, int(os.getenv("TRABAJOS_MAX_EN_COLA", 10)))  # Trabajos esperando por proceso
+TRABAJOS_TTL_SEGUNDOS = int(os.getenv("TRABAJOS_TTL_SEGUNDOS", 3600))  # Tiempo que se conserva un trabajo terminado
+# Tiempo sin novedades tras el cual un trabajo en cola o en proceso se da por perdido (p. ej. murió su worker)
+TRABAJOS_ABANDONO_SEGUNDOS = int(os.getenv("TRABAJOS_ABANDONO_SEGUNDOS", 4 * 3600))
+# El avance se escribe en estado.json cada tantos clientes o cada tantos segundos (lo que ocurra primero)
+TRABAJOS_PROGRESO_CLIENTES = max(1, int(os.getenv("TRABAJOS_PROGRESO_CLIENTES", 100)))
+TRABAJOS_PROGRESO_SEGUNDOS = float(os.getenv("TRABAJOS_PROGRESO_SEGUNDOS", 2))
+
+# 📌 El estado se guarda en disco para que cualquier worker de gunicorn de la instancia pueda consultarlo
+TRABAJOS_DIR = os.getenv("TRABAJOS_DIR") or os.path.join(tempfile.gettempdir(), "estado_cuenta_trabajos")
+
+EN_COLA = "en_cola"
+PROCESANDO = "procesando"
+FINALIZADO = "finalizado"
+ERROR = "error"
+
+
+class ColaLlenaError(Exception):
+    """Se lanza cuando la cola de trabajos alcanzó su capacidad máxima"""
+
+
+class Trabajo:
+    """Trabajo de generación de PDFs con su progreso y su directorio propio"""
+
+    def __init__(self, tipo, nombre_zip):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.nombre_zip = nombre_zip
+        self.directorio = os.path.join(TRABAJOS_DIR, self.id)
+        self.estado = EN_COLA
+        self.procesados = 0
+        self.total = None
+        self.error = None
+        self.errores = []  # 🔹 Clientes cuyo PDF no se pudo generar (el resto del lote sigue)
+        self.creado = time.time()
+        self.iniciado = None
+        self.finalizado = None
+        self.actualizado = self.creado
+        self._procesados_guardados = 0
+        self._guardado_monotonic = time.monotonic()
+        os.makedirs(self.directorio, exist_ok=True)
+
+    @property
+    def zip_path(self):
+        return os.path.join(self.directorio, "resultado.zip")
+
+    def actualizar_progreso(self, procesados, total):
+        """
+        Callback de progreso para `procesar_excel_a_pdf` / `procesar_json_a_pdf`.
+
+        Sólo reescribe `estado.json` cada `TRABAJOS_PROGRESO_CLIENTES` clientes o
+        `TRABAJOS_PROGRESO_SEGUNDOS` segundos, y siempre con el último cliente.
+        """
+        self.procesados = procesados
+        self.total = total
+        if (procesados >= total
+                or procesados - self._procesados_guardados >= TRABAJOS_PROGRESO_CLIENTES
+                or time.monotonic() - self._guardado_monotonic >= TRABAJOS_PROGRESO_SEGUNDOS):
+            self.guardar()
+
+    def a_dict(self):
+        return {
+            "trabajoId": self.id,
+            "tipo": self.tipo,
+            "estado": self.estado,
+            "procesados": self.procesados,
+            "total": self.total,
+            "error": self.error,
+            "errores": self.errores,
+            "creado": self.creado,
+            "iniciado": self.iniciado,
+            "finalizado": self.finalizado,
+            "actualizado": self.actualizado,
+            "nombreZip": self.nombre_zip,
+        }
+
+    def guardar(self):
+        """Escribe el estado en `estado.json` de forma atómica"""
+        self.actualizado = time.time()
+        self._procesados_guardados = self.procesados
+        self._guardado_monotonic = time.monotonic()
+        destino = os.path.join(self.directorio, "estado.json")
+        temporal = f"{destino}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self.a_dict(), f, ensure_ascii=False)
+        os.replace(temporal, destino)
+
+
+def _directorio_trabajo(trabajo_id):
+    """Ruta del directorio de un trabajo, o None si el id no es válido"""
+    try:
+        trabajo_id = uuid.UUID(hex=trabajo_id).hex  # 🔹 Evita rutas arbitrarias en el id
+    except (ValueError, TypeError):
+        return None
+    return os.path.join(TRABAJOS_DIR, trabajo_id)
+
+
+def obtener_estado(trabajo_id):
+    """
+    Lee el estado de un trabajo (puede haber sido creado por otro worker).
+
+    Retorna:
+    - Diccionario con el estado, o None si el trabajo no existe o ya expiró.
+    """
+    directorio = _directorio_trabajo(trabajo_id)
+    if directorio is None:
+        return None
+    try:
+        with open(os.path.join(directorio, "estado.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def obtener_zip(trabajo_id):
+    """Ruta del ZIP de un trabajo finalizado, o None si todavía no está disponible"""
+    estado = obtener_estado(trabajo_id)
+    if not estado or estado["estado"] != FINALIZADO:
+        return None
+    return os.path.join(_directorio_trabajo(trabajo_id), "resultado.zip")
+
+
+class AdministradorTrabajos:
+    """
+    Cola local de trabajos con un número fijo de hilos de ejecución.
+
+    La cola es acotada (`max_en_cola`) y sólo `workers` trabajos corren a la vez,
+    así un lote grande no acapara el proceso que atiende los endpoints interactivos.
+    """
+
+    def __init__(self, workers=TRABAJOS_WORKERS, max_en_cola=TRABAJOS_MAX_EN_COLA):
+        self.workers = workers
+        self._cola = queue.Queue(maxsize=max_en_cola)
+        self._hilos = []
+        self._lock = threading.Lock()
+
+    def encolar(self, tipo, nombre_zip, funcion, *args, cache_clave=None):
+        """
+        Crea un trabajo y lo pone en la cola.
+
+        `funcion(trabajo, pdf_directory, *args)` debe generar los PDFs en
+        `pdf_directory` y devolver la lista de rutas generadas.
+        Puede usar `trabajo.actualizar_progreso` para informar el avance y anotar
+        en `trabajo.errores` los clientes que no pudo generar.
+        Si se indica `cache_clave`, el ZIP resultante se guarda en `cache_zip`
+        (salvo que falte algún PDF).
+
+        Lanza `ColaLlenaError` si la cola está completa.
+        """
+        self._iniciar_hilos()
+        limpiar_vencidos()
+
+        trabajo = Trabajo(tipo, nombre_zip)
+        try:
+            trabajo.guardar()
+            self._cola.put_nowait((trabajo, funcion, args, cache_clave))
+        except queue.Full:
+            shutil.rmtree(trabajo.directorio, ignore_errors=True)
+            raise ColaLlenaError("La cola de trabajos está llena, intente nuevamente en unos minutos.")
+        except Exception:
+            shutil.rmtree(trabajo.directorio, ignore_errors=True)
+            raise
+
+        logger.info("🗂️ Trabajo %s (%s) encolado. En cola: %s", trabajo.id, tipo, self._cola.qsize())
+        return trabajo
+
+    def registrar_finalizado(self, tipo, nombre_zip, zip_origen):
+        """
+        Crea un trabajo ya finalizado a partir de un ZIP existente (p. ej. uno del cache).
+
+        `zip_origen` es una ruta o un archivo abierto en modo binario (ver `cache_zip.obtener`).
+        """
+        limpiar_vencidos()
+
+        trabajo = Trabajo(tipo, nombre_zip)
+        try:
+            if isinstance(zip_origen, (str, os.PathLike)):
+                shutil.copyfile(zip_origen, trabajo.zip_path)
+            else:
+                with open(trabajo.zip_path, "wb") as destino:
+                    shutil.copyfileobj(zip_origen, destino)
+            trabajo.estado = FINALIZADO
+            trabajo.iniciado = trabajo.finalizado = time.time()
+            trabajo.guardar()
+        except Exception:
+            shutil.rmtree(trabajo.directorio, ignore_errors=True)
+            raise
+
+        logger.info("♻️ Trabajo %s (%s) resuelto desde el cache", trabajo.id, tipo)
+        return trabajo
+
+    def _iniciar_hilos(self):
+        # 🔹 Los hilos se crean al primer uso, nunca al importar (gunicorn hace fork de los workers)
+        with self._lock:
+            if self._hilos:
+                return
+            for i in range(self.workers):
+                hilo = threading.Thread(target=self._ejecutar, name=f"trabajos-{i}", daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+
+    def _ejecutar(self):
+        while True:
+            trabajo, funcion, args, cache_clave = self._cola.get()
+            try:
+                self._procesar(trabajo, funcion, args, cache_clave)
+            except Exception as e:
+                # 🔹 P. ej. el directorio del trabajo ya no existe: el hilo sigue atendiendo la cola
+                logger.error("❌ No se pudo registrar el trabajo %s: %s", trabajo.id, e)
+            finally:
+                self._cola.task_done()
+
+    def _procesar(self, trabajo, funcion, args, cache_clave):
+        trabajo.estado = PROCESANDO
+        trabajo.iniciado = time.time()
+        trabajo.guardar()
+        logger.info("🚀 Iniciando trabajo %s (%s)", trabajo.id, trabajo.tipo)
+
+        pdf_directory = os.path.join(trabajo.directorio, "pdfs")
+        try:
+            archivos_pdf = funcion(trabajo, pdf_directory, *args)
+
+            with medir("zip"), zipfile.ZipFile(trabajo.zip_path, "w") as zipf:
+                for pdf_file in archivos_pdf:
+                    zipf.write(pdf_file, os.path.basename(pdf_file))
+
+            if cache_clave and not trabajo.errores:
+                cache_zip.guardar_archivo(cache_clave, trabajo.zip_path)
+
+            trabajo.estado = FINALIZADO
+            logger.info("🎉 Trabajo %s finalizado: %s PDFs, %s con error", trabajo.id, len(archivos_pdf),
+                        len(trabajo.errores))
+        except Exception as e:
+            trabajo.estado = ERROR
+            trabajo.error = str(e)
+            logger.error("❌ Error en el trabajo %s: %s", trabajo.id, e, exc_info=True)
+        finally:
+            shutil.rmtree(pdf_directory, ignore_errors=True)
+            trabajo.finalizado = time.time()
+            trabajo.guardar()
+
+
+def limpiar_vencidos():
+    """
+    Elimina los trabajos terminados hace más de `TRABAJOS_TTL_SEGUNDOS` y los que
+    quedaron en cola o en proceso sin novedades por más de `TRABAJOS_ABANDONO_SEGUNDOS`
+    (su worker murió y nadie más los va a terminar).
+    """
+    if not os.path.isdir(TRABAJOS_DIR):
+        return
+    ahora = time.time()
+    for trabajo_id in os.listdir(TRABAJOS_DIR):
+        directorio = _directorio_trabajo(trabajo_id)
+        if directorio is None:
+            continue
+        estado = obtener_estado(trabajo_id)
+        if estado is None:
+            # 🔹 Sin estado.json legible: se usa la última modificación del directorio
+            try:
+                vencido = os.path.getmtime(directorio) < ahora - TRABAJOS_ABANDONO_SEGUNDOS
+            except FileNotFoundError:
+                continue
+        elif estado["finalizado"]:
+            vencido = estado["finalizado"] < ahora - TRABAJOS_TTL_SEGUNDOS
+        else:
+            vencido = (estado.get("actualizado") or estado["creado"]) < ahora - TRABAJOS_ABANDONO_SEGUNDOS
+        if vencido:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+# 📌 Administrador compartido por todas las rutas del proceso
+administrador = AdministradorTrabajos()
@@ -0,0 +1,56 @@
+import zipfile
+from metricas import medir
+
+
+class _SalidaZip:
+    """
+    Destino de escritura para `zipfile.ZipFile` que acumula los bytes en memoria
+    hasta que se vacían. No implementa `seek`, por lo que `zipfile` escribe cada
+    entrada con "data descriptor" y nunca vuelve atrás sobre lo ya enviado.
+    """
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def generar_zip_stream(archivos):
+    """
+    Arma un ZIP a medida que llegan los archivos y lo devuelve en bloques.
+
+    Parámetros:
+    - archivos (iterable): Pares (nombre, bytes) con el contenido de cada archivo.
+
+    Retorna:
+    - Generador de bloques de bytes listos para enviarse como respuesta HTTP.
+      Cada archivo se envía apenas se agrega, sin esperar al resto del lote.
+    """
+    salida = _SalidaZip()
+    with zipfile.ZipFile(salida, "w") as zipf:
+        for nombre, contenido in archivos:
+            with medir("zip"):  # 🔹 Sólo la compresión: el PDF ya llegó renderizado
+                zipf.writestr(nombre, contenido)
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+
+    # 📌 Directorio central del ZIP (se escribe al cerrar el archivo)
+    datos = salida.vaciar()
+    if datos:
+        yield datos